@@ -0,0 +1,104 @@
+# uv run python -m benchmarks.bench_gpx_generator [rows ...]
+"""Benchmarks create_gpx_file against the previous row-wise implementation.
+
+Prints rows/sec for the old iterrows-based waypoint construction and the
+current column-wise one, both including the GPX serialization.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import gpxpy
+import gpxpy.gpx
+import numpy as np
+import pandas as pd
+
+from src.gpx_generator import create_gpx_file
+
+
+def create_gpx_file_iterrows(hotels, output_file):
+    """The previous create_gpx_file, kept as the baseline for comparison."""
+    gpx = gpxpy.gpx.GPX()
+
+    for index, hotel in hotels.iterrows():
+        if pd.notna(hotel["Latitude"]) and pd.notna(hotel["Longitude"]):
+            description_parts = []
+            if pd.notna(hotel["Straße"]):
+                description_parts.append(f"Straße: {hotel['Straße']}")
+            if pd.notna(hotel["Telefon"]):
+                description_parts.append(f"Telefon: {hotel['Telefon']}")
+            if pd.notna(hotel["Website"]):
+                description_parts.append(f"Website: {hotel['Website']}")
+            if pd.notna(hotel["Entfernung"]):
+                description_parts.append(f"Entfernung: {hotel['Entfernung']}")
+            if pd.notna(hotel["Hm"]):
+                description_parts.append(f"Hm: {hotel['Hm']}")
+
+            description_str = ", ".join(description_parts)
+
+            gpx.waypoints.append(
+                gpxpy.gpx.GPXWaypoint(
+                    latitude=hotel["Latitude"],
+                    longitude=hotel["Longitude"],
+                    name=hotel["Betrieb"],
+                    description=description_str,
+                    symbol="friends-home",
+                )
+            )
+
+    with open(output_file, "w") as f:
+        f.write(gpx.to_xml())
+
+
+def synthetic_hotels(rows, seed=0):
+    """Returns a DataFrame of rows hotels in the hotelswithcoor.csv schema."""
+    rng = np.random.default_rng(seed)
+    numbers = np.arange(rows)
+
+    def sometimes_missing(values, share):
+        return pd.Series(values, dtype=object).where(rng.random(rows) >= share)
+
+    return pd.DataFrame(
+        {
+            "Betrieb": [f"Hotel {i}" for i in numbers],
+            "Straße": sometimes_missing([f"Hauptstraße {i % 200}" for i in numbers], 0.05),
+            "Telefon": sometimes_missing([f"07361 {i:05d}" for i in numbers], 0.1),
+            "Website": sometimes_missing([f"hotel{i}.de" for i in numbers], 0.3),
+            "Entfernung": sometimes_missing(
+                np.where(numbers % 2, "direkt", "1,5 km"), 0.2
+            ),
+            "Hm": sometimes_missing(np.where(numbers % 3, "50", "120"), 0.7),
+            "Latitude": np.where(rng.random(rows) < 0.02, np.nan, rng.uniform(47.5, 49.8, rows)),
+            "Longitude": rng.uniform(8.0, 10.5, rows),
+        }
+    )
+
+
+def measure(func, hotels, output_file):
+    """Returns rows/sec for one call of func."""
+    start = time.perf_counter()
+    func(hotels, output_file)
+    return len(hotels) / (time.perf_counter() - start)
+
+
+def main(sizes):
+    with tempfile.TemporaryDirectory() as directory:
+        old_file = os.path.join(directory, "old.gpx")
+        new_file = os.path.join(directory, "new.gpx")
+        print(f"{'rows':>8} {'iterrows rows/s':>16} {'columnar rows/s':>16} {'speedup':>8}")
+        for rows in sizes:
+            hotels = synthetic_hotels(rows)
+            old_rate = measure(create_gpx_file_iterrows, hotels, old_file)
+            new_rate = measure(create_gpx_file, hotels, new_file)
+            with open(old_file) as old, open(new_file) as new:
+                identical = old.read() == new.read()
+            print(
+                f"{rows:>8} {old_rate:>16.0f} {new_rate:>16.0f} {new_rate / old_rate:>7.1f}x"
+                + ("" if identical else "  OUTPUT DIFFERS")
+            )
+
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or [1000, 10000, 50000])
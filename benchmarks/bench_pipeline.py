@@ -0,0 +1,255 @@
+# uv run python -m benchmarks.bench_pipeline [rows ...] [--latency-ms 2] [--results benchmarks/results.jsonl]
+"""Benchmarks every pipeline stage on synthetic hotel lists and tracks.
+
+For each size, a hotel CSV in the data/hotels.csv schema and a route track
+are generated. The stages load (`load_hotels_from_csv`), geocode
+(`geocode_hotels` against an in-process fake geocoder), enrich
+(`add_route_columns`), simplify (`simplify_track`) and gpx
+(`create_gpx_file`) are timed. Then each stage is run again under
+tracemalloc for its peak memory. Results can be appended to a JSON-lines
+file and compared with the previous run of the same size, so regressions
+show up over time.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import zlib
+from datetime import datetime, timezone
+
+import numpy as np
+
+from src.geocoding import GeocoderSession
+from src.gpx_generator import create_gpx_file
+from src.gpx_track_reader import Track
+from src.main import geocode_hotels, load_hotels_from_csv
+from src.route_index import RouteIndex, add_route_columns
+from src.track_simplify import simplify_track
+
+# Header of data/hotels.csv, including the merged distance/climb column.
+HOTELS_CSV_HEADER = (
+    "Etappe;Stadt;Betrieb;bett+bike;albcard.de;;Straße;Telefon;Website;"
+    '"Entfernung zum Weglänger als 500m kmHm";'
+)
+
+# A stage counts as a regression when it is this much slower than the baseline.
+REGRESSION_FACTOR = 1.2
+
+
+def synthetic_track(points, seed=0):
+    """Returns a random-walk track of `points` points with steps of about 20 m."""
+    rng = np.random.default_rng(seed)
+    heading = np.cumsum(rng.normal(0, 0.2, points))
+    return Track(
+        "Synthetic route",
+        48.4 + np.cumsum(np.sin(heading)) * 0.00018,
+        9.0 + np.cumsum(np.cos(heading)) * 0.00027,
+        rng.uniform(400, 900, points),
+        np.array([0], dtype=np.intp),
+    )
+
+
+def write_synthetic_hotels_csv(path, rows, stages=6, seed=0):
+    """Writes `rows` hotels in the data/hotels.csv schema.
+
+    Street addresses repeat every 500 rows, so the fallback templates see
+    duplicate addresses as in real lodging lists.
+    """
+    rng = np.random.default_rng(seed)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(HOTELS_CSV_HEADER + "\n")
+        for i in range(rows):
+            bike = "X" if rng.random() < 0.4 else ""
+            distance = "direkt" if i % 3 else f"{i % 9 + 1},{i % 10} km;{(i % 12) * 10} Hm"
+            if i % 3:
+                distance += ";"
+            f.write(
+                f"{i * stages // rows + 1};Stadt {i % 97};Hotel {i};{bike};;;"
+                f"Hauptstraße {i % 500};07361 {i:06d};hotel{i}.de;{distance}\n"
+            )
+
+
+class FakeGeocoder:
+    """In-process geocoder backend with a fixed latency per request.
+
+    Coordinates are derived from a hash of the address and lie within
+    about 2 km of the track; `miss_share` of the addresses are not found.
+    """
+
+    offline = True
+
+    def __init__(self, track, latency_seconds=0.0, miss_share=0.1):
+        self.track = track
+        self.latency_seconds = latency_seconds
+        self.miss_share = miss_share
+
+    def geocode(self, address):
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        digest = zlib.crc32(address.encode())
+        if digest % 1000 < self.miss_share * 1000:
+            return None
+        point = digest % len(self.track.latitudes)
+        offset = (digest >> 8) % 2000 / 2000 - 0.5
+        return (
+            float(self.track.latitudes[point] + offset * 0.03),
+            float(self.track.longitudes[point] - offset * 0.03),
+        )
+
+    def close(self):
+        pass
+
+
+def pipeline_stages(rows, track_points, latency_seconds, workers, directory):
+    """Returns (name, items, function) per stage, in pipeline order.
+
+    Each function runs its stage once on the result of the stage before it,
+    so the stages have to be run in order at least once.
+    """
+    csv_file = os.path.join(directory, "hotels.csv")
+    gpx_file = os.path.join(directory, "hotels.gpx")
+    write_synthetic_hotels_csv(csv_file, rows)
+    track = synthetic_track(track_points)
+    session = GeocoderSession(FakeGeocoder(track, latency_seconds), workers=workers)
+    state = {}
+
+    def load():
+        state["hotels"] = load_hotels_from_csv(csv_file)
+
+    def geocode():
+        state["geocoded"], _ = geocode_hotels(state["hotels"].copy(), session)
+
+    def enrich():
+        enriched = state["geocoded"].copy()
+        add_route_columns(enriched, RouteIndex(track.latitudes, track.longitudes))
+        state["enriched"] = enriched
+
+    def simplify():
+        state["simplified"], _ = simplify_track(track, max_points=3000)
+
+    def gpx():
+        create_gpx_file(state["enriched"], gpx_file, track=state["simplified"])
+
+    return [
+        ("load", rows, load),
+        ("geocode", rows, geocode),
+        ("enrich", rows, enrich),
+        ("simplify", track_points, simplify),
+        ("gpx", rows, gpx),
+    ]
+
+
+def measure(function):
+    """Returns the seconds of one call."""
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def measure_peak_memory(function):
+    """Returns the peak traced memory of one call in bytes."""
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def git_revision():
+    """Returns the current commit, or None outside a git checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_baselines(results_file):
+    """Returns the last recorded stages per (rows, latency) from a results file."""
+    baselines = {}
+    if results_file and os.path.exists(results_file):
+        with open(results_file, encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                baselines[(record["rows"], record["latency_ms"])] = record["stages"]
+    return baselines
+
+
+def run(sizes, latency_ms=0.0, workers=8, track_points=20000, memory=True, results_file=None):
+    """Benchmarks all stages for every size and prints one table row per stage."""
+    baselines = load_baselines(results_file)
+    print(f"{'rows':>8} {'stage':<9} {'items/s':>12} {'seconds':>9} {'peak MiB':>9}  vs. baseline")
+    for rows in sizes:
+        record = {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "revision": git_revision(),
+            "rows": rows,
+            "latency_ms": latency_ms,
+            "workers": workers,
+            "track_points": track_points,
+            "stages": {},
+        }
+        baseline = baselines.get((rows, latency_ms), {})
+        with tempfile.TemporaryDirectory() as directory:
+            # Keep the table readable without the progress line and stage output
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(
+                devnull
+            ), contextlib.redirect_stderr(devnull):
+                stages = pipeline_stages(
+                    rows, track_points, latency_ms / 1000, workers, directory
+                )
+                measurements = []
+                for name, items, function in stages:
+                    seconds = measure(function)
+                    peak = measure_peak_memory(function) if memory else None
+                    measurements.append((name, items, seconds, peak))
+
+        for name, items, seconds, peak in measurements:
+            rate = items / seconds if seconds else float("inf")
+            record["stages"][name] = {
+                "items_per_second": round(rate, 1),
+                "seconds": round(seconds, 6),
+                "peak_bytes": peak,
+            }
+            comparison = ""
+            if name in baseline:
+                ratio = baseline[name]["items_per_second"] / rate if rate else float("inf")
+                comparison = f"{ratio:.2f}x slower" if ratio >= 1 else f"{1 / ratio:.2f}x faster"
+                if ratio > REGRESSION_FACTOR:
+                    comparison += "  REGRESSION"
+            peak_text = f"{peak / 2**20:>9.1f}" if peak is not None else f"{'-':>9}"
+            print(f"{rows:>8} {name:<9} {rate:>12.0f} {seconds:>9.3f} {peak_text}  {comparison}")
+
+        if results_file:
+            with open(results_file, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline stages.")
+    parser.add_argument("sizes", nargs="*", type=int, default=[1000, 10000],
+                        help="hotel rows per run (1k to 1M)")
+    parser.add_argument("--latency-ms", type=float, default=0.0,
+                        help="latency of every fake geocoder request")
+    parser.add_argument("--workers", type=int, default=8, help="geocoding worker threads")
+    parser.add_argument("--track-points", type=int, default=20000,
+                        help="points of the synthetic route track")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="skip the tracemalloc pass that measures peak memory")
+    parser.add_argument("--results", help="JSON-lines file to compare with and append to")
+    args = parser.parse_args(argv)
+    os.environ.update({"GEOCODE_JOURNAL_FILE": "", "GEOCODE_INCREMENTAL": "", "ADDRESS_TEMPLATES": ""})
+    run(args.sizes, args.latency_ms, args.workers, args.track_points,
+        not args.no_memory, args.results)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+# uv run python -m src.batch "data/tours/*.csv" data/tours_gpx
+
+import argparse
+import glob
+import logging
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from dotenv import load_dotenv
+
+from src.geocoding import get_default_session
+from src.geocoding_engine import GeocodingUnavailableError
+from src.main import load_hotels_from_csv
+from src.reporting import configure_logging
+
+# Named explicitly, since __name__ is "__main__" under `python -m src.batch`
+logger = logging.getLogger("src.batch")
+
+
+def find_input_files(inputs):
+    """Returns the CSV files in a directory, or matching a glob pattern, sorted."""
+    if os.path.isdir(inputs):
+        inputs = os.path.join(inputs, "*.csv")
+    return sorted(glob.glob(inputs))
+
+
+def geocode_tables(tables, session, templates, batch_size=None):
+    """Geocodes the hotels of several tables as one deduplicated query plan.
+
+    Addresses shared by several tables are requested once. Latitude,
+    Longitude and Geocode Template columns are added to every table.
+    Returns the number of distinct addresses sent to the session.
+    """
+    import numpy as np
+
+    from src.query_plan import build_query_plan, execute_query_plan
+
+    plan = [addresses for table in tables for addresses in build_query_plan(table, templates)]
+    requested = set()
+
+    def geocode_many(addresses):
+        requested.update(addresses)
+        return session.geocode_many(addresses)
+
+    results = execute_query_plan(plan, geocode_many, batch_size=batch_size)
+    offset = 0
+    for table in tables:
+        rows = results[offset:offset + len(table)]
+        table["Latitude"] = [c[0] if c else np.nan for c, _, _ in rows]
+        table["Longitude"] = [c[1] if c else np.nan for c, _, _ in rows]
+        table["Geocode Template"] = [None if t is None else templates[t] for _, t, _ in rows]
+        offset += len(table)
+    return len(requested)
+
+
+def get_batch_workers():
+    """Returns the number of GPX worker processes from BATCH_WORKERS (default: CPU count)."""
+    return max(1, int(os.getenv("BATCH_WORKERS", os.cpu_count() or 1)))
+
+
+def run_batch(inputs, output_dir, session=None, workers=None):
+    """Geocodes many hotel CSVs together and writes one CSV and GPX file per input.
+
+    `inputs` is a directory or glob pattern. For every input file
+    `<name>.csv`, `<name>withcoor.csv` and `<name>.gpx` are written to
+    `output_dir`. Route columns, corridor mode and the route track are
+    applied as in `run_main`; the GPX files are written in a pool of
+    `workers` processes (default: BATCH_WORKERS). Returns a list of
+    (input file, GPX file, waypoints written) in input order.
+    """
+    from src.gpx_split import write_gpx_task
+    from src.query_plan import get_address_templates
+    from src.route_index import (
+        add_route_columns,
+        filter_corridor,
+        get_corridor_buffer_km,
+        load_route_index_from_env,
+    )
+    from src.track_simplify import load_simplified_track_from_env
+
+    files = find_input_files(inputs)
+    if not files:
+        raise FileNotFoundError(f"No CSV files found for '{inputs}'.")
+    if workers is None:
+        workers = get_batch_workers()
+
+    tables = [load_hotels_from_csv(path) for path in files]
+    if session is None:
+        session = get_default_session()
+    requested = geocode_tables(
+        tables,
+        session,
+        get_address_templates(),
+        batch_size=int(os.getenv("GEOCODE_BATCH_SIZE", 50)),
+    )
+    total = sum(len(table) for table in tables)
+    logger.info(
+        "Geocoded %d hotels from %d files with %d distinct address requests.",
+        total,
+        len(files),
+        requested,
+    )
+    if session.cache is not None:
+        logger.info(session.cache.stats_summary())
+
+    route_index = load_route_index_from_env()
+    buffer_km = get_corridor_buffer_km()
+    if buffer_km is not None and route_index is None:
+        raise ValueError("CORRIDOR_BUFFER_KM requires ROUTE_GPX_FILE.")
+    simplified = load_simplified_track_from_env()
+    track = simplified[0] if simplified is not None else None
+
+    os.makedirs(output_dir, exist_ok=True)
+    tasks = []
+    for path, table in zip(files, tables):
+        name = os.path.splitext(os.path.basename(path))[0]
+        if route_index is not None:
+            add_route_columns(table, route_index)
+        table.to_csv(
+            os.path.join(output_dir, f"{name}withcoor.csv"), sep=";", index=False, encoding="utf-8"
+        )
+        gpx_hotels = table
+        if buffer_km is not None:
+            gpx_hotels, _ = filter_corridor(table, route_index, buffer_km)
+        tasks.append((gpx_hotels, os.path.join(output_dir, f"{name}.gpx"), None, track, None))
+
+    # GPX files are independent of each other, so they are written in parallel
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+            results = list(executor.map(write_gpx_task, *zip(*tasks)))
+    else:
+        results = [write_gpx_task(*task) for task in tasks]
+
+    for path, table, (gpx_file, written) in zip(files, tables, results):
+        logger.info("  %s: %d of %d hotels written to '%s'", path, written, len(table), gpx_file)
+    return [(path, gpx_file, written) for path, (gpx_file, written) in zip(files, results)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Geocode many hotel CSVs together and create one GPX file per CSV."
+    )
+    parser.add_argument("inputs", help="directory or glob pattern of hotel CSV files")
+    parser.add_argument("output_dir", help="directory for the geocoded CSV and GPX files")
+    parser.add_argument("--workers", type=int, help="GPX worker processes (default: BATCH_WORKERS)")
+    parser.add_argument("--log-level", help="DEBUG, INFO, WARNING or ERROR (default: LOG_LEVEL or INFO)")
+    args = parser.parse_args()
+    load_dotenv()
+    configure_logging(args.log_level)
+    try:
+        run_batch(args.inputs, args.output_dir, workers=args.workers)
+    except GeocodingUnavailableError as e:
+        logger.error(e)
+        sys.exit(1)
@@ -0,0 +1,104 @@
+import json
+import os
+
+
+def get_journal_path(csv_w_coor_file):
+    """Returns GEOCODE_JOURNAL_FILE, or '<CSV_W_COOR_FILE>.journal' by default."""
+    path = os.getenv("GEOCODE_JOURNAL_FILE")
+    if path:
+        return path
+    return f"{csv_w_coor_file}.journal" if csv_w_coor_file else None
+
+
+def _truncate_partial_line(path, chunk_size=4096):
+    """Cuts a journal back to its last newline, dropping a line cut off by a crash."""
+    if not os.path.exists(path):
+        return
+    with open(path, "rb+") as f:
+        end = f.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            start = max(0, position - chunk_size)
+            f.seek(start)
+            newline = f.read(position - start).rfind(b"\n")
+            if newline >= 0:
+                position = start + newline + 1
+                break
+            position = start
+        if position < end:
+            f.truncate(position)
+
+
+class CheckpointJournal:
+    """Append-only JSON-lines journal of resolved rows.
+
+    Records are buffered and flushed to disk every `flush_every` rows, so an
+    interrupted run loses at most that many resolved rows.
+    """
+
+    def __init__(self, path, flush_every=10, resume=False):
+        self.path = path
+        self.flush_every = max(1, flush_every)
+        self._pending = []
+        if resume:
+            _truncate_partial_line(path)
+        self._file = open(path, "a" if resume else "w", encoding="utf-8")
+
+    def record(self, key, coordinates, template, address):
+        """Records a resolved row; coordinates None means "not found"."""
+        latitude, longitude = coordinates if coordinates else (None, None)
+        self._pending.append(
+            json.dumps(
+                {
+                    "key": key,
+                    "latitude": latitude,
+                    "longitude": longitude,
+                    "template": template,
+                    "address": address,
+                },
+                ensure_ascii=False,
+            )
+        )
+        if len(self._pending) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if self._pending:
+            self._file.write("\n".join(self._pending) + "\n")
+            self._pending = []
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+    def remove(self):
+        """Closes and deletes the journal once the run has completed."""
+        self.close()
+        os.remove(self.path)
+
+
+def load_journal(path):
+    """Loads a checkpoint journal into a dict keyed by row key.
+
+    Values are (latitude, longitude, template, address); latitude and
+    longitude are None for rows that could not be geocoded. A truncated last
+    line from an interrupted write is ignored.
+    """
+    results = {}
+    if not path or not os.path.exists(path):
+        return results
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            results[entry["key"]] = (
+                entry["latitude"],
+                entry["longitude"],
+                entry["template"],
+                entry["address"],
+            )
+    return results
@@ -0,0 +1,201 @@
+# uv run python -m src.cli --from-stage geocode --to-stage gpx
+
+import argparse
+import logging
+import os
+import sys
+
+# The stage modules pull in pandas, numpy, geopy, gpxpy or tabula. They are
+# imported by the stages that use them, so --help and argument errors start
+# instantly and a run only loads what its stages need.
+
+# Pipeline stages in the order they run.
+STAGES = ("extract", "clean", "geocode", "enrich", "gpx")
+
+# .env variable naming the file each stage's output is persisted to.
+STAGE_FILES = {
+    "extract": "CSV_FILE",
+    "clean": "CSV_FILE",
+    "geocode": "CSV_W_COOR_FILE",
+    "enrich": "CSV_W_COOR_FILE",
+    "gpx": "GPX_FILE",
+}
+
+# Named explicitly, since __name__ is "__main__" under `python -m src.cli`
+logger = logging.getLogger("src.cli")
+
+
+def load_stage_input(stage):
+    """Reads the input of `stage` from the file persisted by the stage before it."""
+    if stage == "extract":
+        return None
+    from src.main import load_hotels_from_csv
+    from src.schema import read_raw_table
+
+    path = os.getenv(STAGE_FILES[STAGES[STAGES.index(stage) - 1]])
+    if stage == "clean":
+        return read_raw_table(path)
+    hotels = load_hotels_from_csv(path)
+    if hotels is None:
+        raise FileNotFoundError(path)
+    return hotels
+
+
+def save_stage_output(stage, table):
+    """Writes the table produced by `stage` to its file from STAGE_FILES.
+
+    The raw extract has no header row of its own; it is read back with
+    `read_raw_table`.
+    """
+    path = os.getenv(STAGE_FILES[stage])
+    table.to_csv(path, sep=";", index=False, header=stage != "extract", encoding="utf-8")
+    logger.info("Saved the %s output to '%s'.", stage, path)
+
+
+class Pipeline:
+    """Runs PDF → clean table → geocode → enrich → GPX in one process.
+
+    Every stage takes the DataFrame of the stage before it in memory. Files
+    are only read for the first stage and written for the last one, plus
+    intermediates on request.
+    """
+
+    def __init__(self, session=None, resume=False):
+        self.session = session
+        self.resume = resume
+        self.route_index = None
+
+    def extract(self, _):
+        """Reads the tables of PDF_FILE into one raw text table."""
+        from src.pdf2csv import extract_pdf_tables
+        from src.schema import tables_to_raw
+
+        return tables_to_raw(extract_pdf_tables(os.getenv("PDF_FILE")))
+
+    def clean(self, raw):
+        """Normalizes the raw table to the hotel schema."""
+        from src.schema import normalize_hotel_table
+
+        return normalize_hotel_table(raw)
+
+    def geocode(self, hotels):
+        """Adds the coordinates of the hotels."""
+        from src.main import geocode_hotels
+
+        hotels, _ = geocode_hotels(
+            hotels, self.session, self.resume, os.getenv("CSV_W_COOR_FILE")
+        )
+        return hotels
+
+    def enrich(self, hotels):
+        """Adds the route columns, if a route track is configured."""
+        from src.main import enrich_hotels
+
+        self.route_index = enrich_hotels(hotels)
+        return hotels
+
+    def gpx(self, hotels):
+        """Writes the GPX files."""
+        from src.main import write_gpx_outputs
+        from src.route_index import get_corridor_buffer_km, load_route_index_from_env
+
+        route_index = self.route_index
+        if route_index is None and get_corridor_buffer_km() is not None:
+            route_index = load_route_index_from_env()
+        write_gpx_outputs(hotels, os.getenv("GPX_FILE"), route_index)
+        return hotels
+
+    def run(self, from_stage="extract", to_stage="gpx", save_intermediates=False):
+        """Runs the stages from `from_stage` to `to_stage` and returns the last table.
+
+        The output of `to_stage` is always persisted. With
+        `save_intermediates`, so is the output of every earlier stage,
+        unless the next stage overwrites the same file. In incremental mode
+        (GEOCODE_INCREMENTAL), CSV_W_COOR_FILE is always written, since the
+        next run reuses its coordinates.
+        """
+        stages = STAGES[STAGES.index(from_stage):STAGES.index(to_stage) + 1]
+        if not stages:
+            raise ValueError(f"Stage '{from_stage}' comes after '{to_stage}'.")
+
+        from src.incremental import is_incremental_enabled
+
+        always_saved = set()
+        if "geocode" in stages and is_incremental_enabled():
+            always_saved = {stage for stage in stages if STAGE_FILES[stage] == STAGE_FILES["geocode"]}
+
+        from src.instrumentation import get_profiler
+
+        profiler = get_profiler()
+        with profiler.stage(f"{from_stage}.load_input"):
+            table = load_stage_input(from_stage)
+        for position, stage in enumerate(stages):
+            with profiler.stage(stage):
+                table = getattr(self, stage)(table)
+            if stage == "gpx":
+                continue
+            is_last = position == len(stages) - 1
+            overwritten = not is_last and STAGE_FILES[stages[position + 1]] == STAGE_FILES[stage]
+            if is_last or ((save_intermediates or stage in always_saved) and not overwritten):
+                with profiler.stage(f"{stage}.save_output"):
+                    save_stage_output(stage, table)
+
+        # The geocoded output is complete, so the checkpoint journal is no longer needed
+        if "geocode" in stages:
+            from src.main import remove_journal
+
+            remove_journal(os.getenv("CSV_W_COOR_FILE"))
+        return table
+
+
+def main(argv=None):
+    """Command line entry point of the pipeline.
+
+    Returns 1 if geocoding stopped because the service stayed unavailable.
+    """
+    parser = argparse.ArgumentParser(
+        description="Create GPX waypoints from the hotel PDF in one process."
+    )
+    parser.add_argument("--from-stage", choices=STAGES, default="extract",
+                        help="first stage to run; its input is read from .env files")
+    parser.add_argument("--to-stage", choices=STAGES, default="gpx",
+                        help="last stage to run; its output is always written")
+    parser.add_argument("--save-intermediates", action="store_true",
+                        help="also write CSV_FILE and CSV_W_COOR_FILE between stages")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue an interrupted geocoding run from its checkpoint journal")
+    parser.add_argument("--verbose", action="store_true",
+                        help="log every row and the full hotel table (same as --log-level DEBUG)")
+    parser.add_argument("--log-level",
+                        help="DEBUG, INFO, WARNING or ERROR (default: LOG_LEVEL or INFO)")
+    parser.add_argument("--log-format", choices=("text", "json"),
+                        help="format of the log lines (default: LOG_FORMAT or text)")
+    parser.add_argument("--profile", metavar="REPORT_JSON",
+                        help="write stage timers, request timings and counters to this JSON file")
+    parser.add_argument("--cprofile", metavar="STATS_FILE",
+                        help="also write a cProfile dump, readable with python -m pstats")
+    args = parser.parse_args(argv)
+    if STAGES.index(args.from_stage) > STAGES.index(args.to_stage):
+        parser.error(f"--from-stage {args.from_stage} comes after --to-stage {args.to_stage}")
+
+    from dotenv import load_dotenv
+
+    from src.geocoding_engine import GeocodingUnavailableError
+    from src.instrumentation import profiled
+    from src.reporting import configure_logging
+
+    load_dotenv()
+    configure_logging("DEBUG" if args.verbose else args.log_level, args.log_format)
+    with profiled(args.profile, args.cprofile):
+        try:
+            Pipeline(resume=args.resume).run(
+                args.from_stage, args.to_stage, args.save_intermediates
+            )
+        except GeocodingUnavailableError as e:
+            logger.error("%s. Run again with --resume once the service is back.", e)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+
+
+def normalize_address(address):
+    """Normalizes an address string so equivalent spellings share a cache key."""
+    return re.sub(r"\s*,\s*", ", ", re.sub(r"\s+", " ", str(address))).strip(" ,").casefold()
+
+
+class GeocodeCache:
+    """Persistent SQLite cache of geocoding results, including negative results.
+
+    The connection is shared between geocoding worker threads behind a lock.
+    """
+
+    def __init__(self, path, ttl_seconds=None, negative_ttl_seconds=None, max_entries=None):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS geocode_cache ("
+            " address_key TEXT PRIMARY KEY,"
+            " latitude REAL,"
+            " longitude REAL,"
+            " created_at REAL NOT NULL,"
+            " last_used_at REAL NOT NULL)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS geocode_cache_last_used"
+            " ON geocode_cache (last_used_at)"
+        )
+        self._connection.commit()
+
+    def lookup(self, address):
+        """Returns (True, coordinates) on a cache hit and (False, None) on a miss.
+
+        A cached negative result is a hit whose coordinates are None.
+        """
+        with self._lock:
+            key = normalize_address(address)
+            row = self._connection.execute(
+                "SELECT latitude, longitude, created_at FROM geocode_cache"
+                " WHERE address_key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return False, None
+
+            latitude, longitude, created_at = row
+            coordinates = None if latitude is None else (latitude, longitude)
+            ttl = self.ttl_seconds if coordinates else self.negative_ttl_seconds
+            now = time.time()
+            if ttl is not None and now - created_at > ttl:
+                self._connection.execute(
+                    "DELETE FROM geocode_cache WHERE address_key = ?", (key,)
+                )
+                self._connection.commit()
+                self.evictions += 1
+                self.misses += 1
+                return False, None
+
+            self._connection.execute(
+                "UPDATE geocode_cache SET last_used_at = ? WHERE address_key = ?",
+                (now, key),
+            )
+            self._connection.commit()
+            self.hits += 1
+            return True, coordinates
+
+    def store(self, address, coordinates):
+        """Stores coordinates (or None for "not found") for an address."""
+        with self._lock:
+            latitude, longitude = coordinates if coordinates else (None, None)
+            now = time.time()
+            self._connection.execute(
+                "INSERT OR REPLACE INTO geocode_cache"
+                " (address_key, latitude, longitude, created_at, last_used_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (normalize_address(address), latitude, longitude, now, now),
+            )
+            self._evict_overflow()
+            self._connection.commit()
+
+    def _evict_overflow(self):
+        """Drops the least recently used entries beyond max_entries."""
+        if not self.max_entries:
+            return
+        (count,) = self._connection.execute(
+            "SELECT COUNT(*) FROM geocode_cache"
+        ).fetchone()
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._connection.execute(
+                "DELETE FROM geocode_cache WHERE address_key IN ("
+                " SELECT address_key FROM geocode_cache"
+                " ORDER BY last_used_at LIMIT ?)",
+                (overflow,),
+            )
+            self.evictions += overflow
+
+    def __len__(self):
+        with self._lock:
+            (count,) = self._connection.execute(
+                "SELECT COUNT(*) FROM geocode_cache"
+            ).fetchone()
+            return count
+
+    def stats_summary(self):
+        """Returns a one-line summary of the cache statistics."""
+        return (
+            f"Geocode cache: {self.hits} hits, {self.misses} misses,"
+            f" {self.evictions} evictions, {len(self)} entries"
+        )
+
+    def close(self):
+        self._connection.close()
+
+
+def _days_to_seconds(value):
+    return float(value) * 86400 if value not in (None, "") else None
+
+
+def open_cache_from_env():
+    """Opens the cache configured by GEOCODE_CACHE_FILE, or returns None if unset."""
+    path = os.getenv("GEOCODE_CACHE_FILE")
+    if not path:
+        return None
+    max_entries = os.getenv("GEOCODE_CACHE_MAX_ENTRIES")
+    return GeocodeCache(
+        path,
+        ttl_seconds=_days_to_seconds(os.getenv("GEOCODE_CACHE_TTL_DAYS")),
+        negative_ttl_seconds=_days_to_seconds(
+            os.getenv("GEOCODE_CACHE_NEGATIVE_TTL_DAYS")
+        ),
+        max_entries=int(max_entries) if max_entries else None,
+    )
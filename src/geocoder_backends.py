@@ -0,0 +1,213 @@
+import csv
+import functools
+import os
+import sqlite3
+import sys
+
+from src.geocode_cache import normalize_address
+from src.geocoding_engine import TransientGeocodingError
+
+
+def _pooled_adapter_factory(workers):
+    """Returns a geopy adapter factory with a keep-alive pool sized for the workers."""
+    from geopy.adapters import RequestsAdapter
+
+    return functools.partial(
+        RequestsAdapter, pool_connections=1, pool_maxsize=max(1, workers)
+    )
+
+
+def _is_server_error(error):
+    """Whether a geopy error was caused by an HTTP 5xx response."""
+    status_code = getattr(error.__cause__, "status_code", None)
+    return status_code is not None and status_code >= 500
+
+
+class GeopyBackend:
+    """Base class for backends that wrap a remote geopy geocoder."""
+
+    offline = False
+
+    def __init__(self, geolocator):
+        self.geolocator = geolocator
+
+    def geocode(self, address):
+        """Returns (latitude, longitude) for an address, or None if not found.
+
+        Timeouts, unreachable or overloaded servers, HTTP 5xx and HTTP 429
+        raise TransientGeocodingError, so they are not mistaken for "not found".
+        """
+        from geopy.exc import (
+            GeocoderRateLimited,
+            GeocoderServiceError,
+            GeocoderTimedOut,
+            GeocoderUnavailable,
+        )
+
+        try:
+            location = self.geolocator.geocode(address)
+        except GeocoderRateLimited as e:
+            raise TransientGeocodingError(str(e), retry_after=e.retry_after) from e
+        except (GeocoderTimedOut, GeocoderUnavailable) as e:
+            raise TransientGeocodingError(str(e)) from e
+        except GeocoderServiceError as e:
+            # geopy raises the base class for 500, 502 and other unmapped statuses
+            if type(e) is GeocoderServiceError and _is_server_error(e):
+                raise TransientGeocodingError(str(e)) from e
+            raise
+        return (location.latitude, location.longitude) if location else None
+
+    def close(self):
+        adapter = getattr(self.geolocator, "adapter", None)
+        if hasattr(adapter, "session"):
+            adapter.session.close()
+
+
+class NominatimBackend(GeopyBackend):
+    """Public nominatim.openstreetmap.org or a self-hosted Nominatim server."""
+
+    def __init__(self, user_agent="gpx-project", timeout=10, domain=None, scheme=None, workers=1):
+        from geopy.geocoders import Nominatim
+
+        options = {}
+        if domain:
+            options["domain"] = domain
+        if scheme:
+            options["scheme"] = scheme
+        super().__init__(
+            Nominatim(
+                user_agent=user_agent,
+                timeout=timeout,
+                adapter_factory=_pooled_adapter_factory(workers),
+                **options,
+            )
+        )
+
+
+class PhotonBackend(GeopyBackend):
+    """A Photon server (photon.komoot.io or self-hosted)."""
+
+    def __init__(self, user_agent="gpx-project", timeout=10, domain=None, scheme=None, workers=1):
+        from geopy.geocoders import Photon
+
+        super().__init__(
+            Photon(
+                user_agent=user_agent,
+                timeout=timeout,
+                domain=domain or "photon.komoot.io",
+                scheme=scheme or "https",
+                adapter_factory=_pooled_adapter_factory(workers),
+            )
+        )
+
+
+class GazetteerBackend:
+    """Offline backend resolving addresses from a local gazetteer.
+
+    The gazetteer is either a semicolon-separated CSV file with the columns
+    Address, Latitude and Longitude, which is loaded into memory, or an
+    SQLite index built from such a file with `build_gazetteer_index`.
+    Addresses are matched on their normalized form.
+    """
+
+    offline = True
+
+    def __init__(self, path):
+        self.path = path
+        self._entries = None
+        self._connection = None
+        if path.lower().endswith(".csv"):
+            self._entries = dict(_read_gazetteer_csv(path))
+        else:
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"Gazetteer index '{path}' not found.")
+            self._connection = sqlite3.connect(path, check_same_thread=False)
+
+    def geocode(self, address):
+        """Returns (latitude, longitude) for an address, or None if not found."""
+        key = normalize_address(address)
+        if self._entries is not None:
+            return self._entries.get(key)
+        row = self._connection.execute(
+            "SELECT latitude, longitude FROM gazetteer WHERE address_key = ?", (key,)
+        ).fetchone()
+        return tuple(row) if row else None
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+
+
+def _read_gazetteer_csv(path):
+    """Yields (normalized address, (latitude, longitude)) pairs from a gazetteer CSV."""
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f, delimiter=";"):
+            if row.get("Latitude") and row.get("Longitude"):
+                yield normalize_address(row["Address"]), (
+                    float(row["Latitude"]),
+                    float(row["Longitude"]),
+                )
+
+
+def build_gazetteer_index(csv_path, index_path):
+    """Builds an SQLite gazetteer index from a gazetteer CSV file.
+
+    Returns the number of addresses in the index.
+    """
+    if os.path.exists(index_path):
+        os.remove(index_path)
+    connection = sqlite3.connect(index_path)
+    try:
+        connection.execute(
+            "CREATE TABLE gazetteer ("
+            " address_key TEXT PRIMARY KEY,"
+            " latitude REAL NOT NULL,"
+            " longitude REAL NOT NULL)"
+        )
+        connection.executemany(
+            "INSERT OR REPLACE INTO gazetteer VALUES (?, ?, ?)",
+            ((key, lat, lon) for key, (lat, lon) in _read_gazetteer_csv(csv_path)),
+        )
+        connection.commit()
+        (count,) = connection.execute("SELECT COUNT(*) FROM gazetteer").fetchone()
+    finally:
+        connection.close()
+    return count
+
+
+def create_backend_from_env(workers=1):
+    """Creates the backend selected by GEOCODER_BACKEND (nominatim, photon or gazetteer)."""
+    name = os.getenv("GEOCODER_BACKEND", "nominatim").strip().lower()
+    user_agent = os.getenv("NOMINATIM_USER_AGENT", "gpx-project")
+    timeout = float(os.getenv("NOMINATIM_TIMEOUT_SECONDS", 10))
+    if name == "nominatim":
+        return NominatimBackend(
+            user_agent=user_agent,
+            timeout=timeout,
+            domain=os.getenv("NOMINATIM_DOMAIN"),
+            scheme=os.getenv("NOMINATIM_SCHEME"),
+            workers=workers,
+        )
+    if name == "photon":
+        return PhotonBackend(
+            user_agent=user_agent,
+            timeout=timeout,
+            domain=os.getenv("PHOTON_DOMAIN"),
+            scheme=os.getenv("PHOTON_SCHEME"),
+            workers=workers,
+        )
+    if name == "gazetteer":
+        path = os.getenv("GAZETTEER_FILE")
+        if not path:
+            raise ValueError("GEOCODER_BACKEND=gazetteer requires GAZETTEER_FILE.")
+        return GazetteerBackend(path)
+    raise ValueError(f"Unknown GEOCODER_BACKEND '{name}'.")
+
+
+if __name__ == "__main__":
+    # Builds an SQLite gazetteer index: python -m src.geocoder_backends <csv> <index>
+    if len(sys.argv) != 3:
+        print("Usage: python -m src.geocoder_backends <gazetteer.csv> <gazetteer.sqlite>")
+        sys.exit(1)
+    count = build_gazetteer_index(sys.argv[1], sys.argv[2])
+    print(f"Indexed {count} addresses into '{sys.argv[2]}'.")
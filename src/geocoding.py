@@ -1,26 +1,184 @@
 #!/usr/bin/env python3
-from geopy.geocoders import Nominatim
-import os
+import logging
+import threading
 import time
+
 from dotenv import load_dotenv
 
+from src.geocode_cache import open_cache_from_env
+from src.geocoder_backends import create_backend_from_env
+from src.instrumentation import get_profiler
+from src.geocoding_engine import (
+    GeocodingUnavailableError,
+    TransientGeocodingError,
+    create_circuit_breaker_from_env,
+    create_rate_limiter_from_env,
+    create_retry_policy_from_env,
+    get_worker_count,
+    run_concurrently,
+)
+
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+
+class GeocoderSession:
+    """A long-lived geocoding client shared by all requests of a run.
+
+    The session holds one geocoder backend (for remote backends a single
+    client on a pooled keep-alive HTTP connection), the rate limiter and the
+    optional persistent cache, so the configuration is parsed once instead
+    of on every address.
+
+    Transient errors are retried according to `retry_policy`, and
+    `circuit_breaker` pauses all workers while the service keeps failing.
+    """
+
+    def __init__(self, backend, rate_limiter=None, cache=None, workers=1, retry_policy=None,
+                 circuit_breaker=None, sleep=time.sleep):
+        self.backend = backend
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        self.workers = workers
+        self.retry_policy = retry_policy
+        self.circuit_breaker = circuit_breaker
+        self._sleep = sleep
+
+    @classmethod
+    def from_env(cls):
+        """Creates a session configured from the environment (.env).
+
+        Offline backends are neither rate limited, cached nor retried.
+        """
+        workers = get_worker_count()
+        backend = create_backend_from_env(workers=workers)
+        if getattr(backend, "offline", False):
+            return cls(backend, workers=workers)
+        return cls(
+            backend,
+            rate_limiter=create_rate_limiter_from_env(),
+            cache=open_cache_from_env(),
+            workers=workers,
+            retry_policy=create_retry_policy_from_env(),
+            circuit_breaker=create_circuit_breaker_from_env(),
+        )
+
+    def geocode(self, address):
+        """Gets GPS coordinates for a given address, or None if not found.
+
+        Raises GeocodingUnavailableError if the address still fails with
+        transient errors after all retries; such failures are not cached.
+        """
+        profiler = get_profiler()
+        if self.cache is not None:
+            hit, coordinates = self.cache.lookup(address)
+            if hit:
+                profiler.count("cache_hits")
+                return coordinates
+
+        retries = self.retry_policy.retries if self.retry_policy is not None else 0
+        for retry in range(retries + 1):
+            try:
+                return self._request(address)
+            except TransientGeocodingError as e:
+                profiler.count("transient_errors")
+                if self.circuit_breaker is not None:
+                    self.circuit_breaker.record_failure(e.retry_after)
+                if retry == retries:
+                    raise GeocodingUnavailableError(
+                        f"Geocoding '{address}' failed after {retries + 1} attempts: {e}"
+                    ) from e
+                delay = self.retry_policy.delay(retry + 1, e.retry_after)
+                logger.warning(
+                    "Transient error geocoding %s (%s), retrying in %.1f s", address, e, delay
+                )
+                profiler.count("retries")
+                profiler.add_time("geocode.backoff_wait", delay)
+                self._sleep(delay)
+            except Exception as e:
+                profiler.count("errors")
+                logger.warning("Error geocoding %s: %s", address, e)
+                return None
+
+    def _request(self, address):
+        """Sends one request once the circuit breaker and the rate limiter allow it."""
+        profiler = get_profiler()
+        if self.circuit_breaker is not None:
+            profiler.add_time("geocode.circuit_wait", self.circuit_breaker.wait())
+        # Rate limit to respect the geocoding service's usage policy
+        if self.rate_limiter is not None:
+            profiler.add_time("geocode.rate_limit_wait", self.rate_limiter.acquire() or 0.0)
+        profiler.count("requests")
+        start = time.perf_counter()
+        try:
+            coordinates = self.backend.geocode(address)
+        except TransientGeocodingError:
+            raise
+        except Exception:
+            # Permanent errors prove the service is reachable
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.record_success()
+            raise
+        finally:
+            profiler.record_request(time.perf_counter() - start)
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.record_success()
+        if coordinates is None:
+            profiler.count("not_found")
+        # Errors are not cached so that the address is retried on the next run
+        if self.cache is not None:
+            self.cache.store(address, coordinates)
+        return coordinates
+
+    def geocode_many(self, addresses):
+        """Geocodes a batch of addresses concurrently.
+
+        Duplicate addresses are only requested once. Returns the coordinates
+        (or None) for every address in input order.
+        """
+        addresses = list(addresses)
+        unique_addresses = list(dict.fromkeys(addresses))
+        results = dict(
+            zip(
+                unique_addresses,
+                run_concurrently(self.geocode, unique_addresses, workers=self.workers),
+            )
+        )
+        return [results[address] for address in addresses]
+
+    def close(self):
+        """Releases the backend's connections and the cache."""
+        self.backend.close()
+        if self.cache is not None:
+            self.cache.close()
+
+
+_default_session = None
+_session_lock = threading.Lock()
+
+
+def get_default_session():
+    """Returns the module-level session, creating it from .env on first use."""
+    global _default_session
+    with _session_lock:
+        if _default_session is None:
+            _default_session = GeocoderSession.from_env()
+    return _default_session
+
+
+def reset_default_session():
+    """Closes the module-level session so the next call re-reads .env."""
+    global _default_session
+    with _session_lock:
+        if _default_session is not None:
+            _default_session.close()
+        _default_session = None
+
 
 def get_gps_coordinates(address):
     """Gets GPS coordinates for a given address."""
-    user_agent = os.getenv("NOMINATIM_USER_AGENT", "gpx-project")
-    geolocator = Nominatim(user_agent=user_agent)
-    try:
-        # Delay to respect Nominatim's usage policy
-        delay_seconds = int(os.getenv("NOMINATIM_DELAY_SECONDS", 3))
-        time.sleep(delay_seconds)
-        location = geolocator.geocode(address)
-        if location:
-            return (location.latitude, location.longitude)
-    except Exception as e:
-        print(f"Error geocoding {address}: {e}")
-    return None
+    return get_default_session().geocode(address)
 
 
 if __name__ == "__main__":
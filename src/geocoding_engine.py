@@ -0,0 +1,190 @@
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TransientGeocodingError(Exception):
+    """A geocoding request failed for a reason that may go away, e.g. a timeout.
+
+    `retry_after` holds the seconds requested by the service (HTTP 429
+    Retry-After), if any.
+    """
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class GeocodingUnavailableError(Exception):
+    """An address still failed with transient errors after all retries."""
+
+
+class TokenBucket:
+    """Thread-safe token-bucket rate limiter shared by all geocoding workers.
+
+    `rate` tokens are added per second up to `burst`; a rate of 0 or None
+    disables limiting. Callers that find the bucket empty reserve the next
+    token and sleep until it is due, so waiting workers are served in order.
+    """
+
+    def __init__(self, rate, burst=1, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(self.capacity)
+        self._updated_at = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Takes one token, sleeping if necessary. Returns the seconds waited."""
+        if not self.rate:
+            return 0.0
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated_at) * self.rate
+            )
+            self._updated_at = now
+            self._tokens -= 1
+            wait_seconds = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait_seconds > 0:
+            self._sleep(wait_seconds)
+        return wait_seconds
+
+
+def create_rate_limiter_from_env():
+    """Builds the limiter from GEOCODE_RATE_PER_SECOND/GEOCODE_BURST.
+
+    Without an explicit rate, one request per NOMINATIM_DELAY_SECONDS is allowed.
+    """
+    rate = os.getenv("GEOCODE_RATE_PER_SECOND")
+    if rate:
+        rate = float(rate)
+    else:
+        delay_seconds = float(os.getenv("NOMINATIM_DELAY_SECONDS", 3))
+        rate = 1 / delay_seconds if delay_seconds > 0 else 0
+    return TokenBucket(rate, burst=int(os.getenv("GEOCODE_BURST", 1)))
+
+
+class RetryPolicy:
+    """Retries of transient errors with jittered exponential backoff.
+
+    Retry `n` waits a random time between 0 and `base_seconds * 2**(n-1)`,
+    capped at `max_seconds` ("full jitter"), so workers that failed together
+    do not retry together. A Retry-After from the service is honored instead.
+    """
+
+    def __init__(self, retries=3, base_seconds=1.0, max_seconds=60.0, jitter=random.random):
+        self.retries = retries
+        self.base_seconds = base_seconds
+        self.max_seconds = max_seconds
+        self._jitter = jitter
+
+    def delay(self, retry, retry_after=None):
+        """Returns the seconds to wait before retry number `retry` (from 1)."""
+        if retry_after is not None:
+            return max(0.0, float(retry_after))
+        return self._jitter() * min(self.max_seconds, self.base_seconds * 2 ** (retry - 1))
+
+
+class CircuitBreaker:
+    """Pauses all geocoding workers while the service is degraded.
+
+    After `threshold` consecutive transient failures the circuit opens for
+    `cooldown_seconds`, and `wait` blocks every worker until then. Next, a
+    single trial request is let through: success closes the circuit, another
+    failure opens it again. A Retry-After pauses the workers in the same way.
+    """
+
+    def __init__(self, threshold=5, cooldown_seconds=30.0, clock=time.monotonic, sleep=time.sleep):
+        self.threshold = threshold
+        self.cooldown_seconds = cooldown_seconds
+        self._clock = clock
+        self._sleep = sleep
+        self._failures = 0
+        self._open_until = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        """Whether requests are currently paused."""
+        with self._lock:
+            return self._open_until is not None
+
+    def wait(self):
+        """Blocks while the circuit is open. Returns the seconds waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                if self._open_until is None:
+                    return waited
+                remaining = self._open_until - self._clock()
+                if remaining <= 0 and not self._trial_running:
+                    self._trial_running = True
+                    return waited
+                # Other workers wait for the outcome of the trial request
+                pause = remaining if remaining > 0 else 0.05
+            self._sleep(pause)
+            waited += pause
+
+    def record_success(self):
+        """Closes the circuit."""
+        with self._lock:
+            self._failures = 0
+            self._open_until = None
+            self._trial_running = False
+
+    def record_failure(self, retry_after=None):
+        """Counts a transient failure and opens the circuit if needed."""
+        with self._lock:
+            self._failures += 1
+            pause = 0.0
+            if self._trial_running or self._failures >= self.threshold:
+                pause = self.cooldown_seconds
+            if retry_after is not None:
+                pause = max(pause, float(retry_after))
+            self._trial_running = False
+            if pause > 0:
+                open_until = self._clock() + pause
+                if self._open_until is None or open_until > self._open_until:
+                    self._open_until = open_until
+
+
+def create_retry_policy_from_env():
+    """Builds the retry policy from GEOCODE_RETRIES and GEOCODE_BACKOFF_(MAX_)SECONDS."""
+    return RetryPolicy(
+        retries=max(0, int(os.getenv("GEOCODE_RETRIES", 3))),
+        base_seconds=float(os.getenv("GEOCODE_BACKOFF_SECONDS", 1)),
+        max_seconds=float(os.getenv("GEOCODE_BACKOFF_MAX_SECONDS", 60)),
+    )
+
+
+def create_circuit_breaker_from_env():
+    """Builds the breaker from GEOCODE_BREAKER_THRESHOLD/GEOCODE_BREAKER_COOLDOWN_SECONDS.
+
+    A threshold of 0 disables the breaker.
+    """
+    threshold = int(os.getenv("GEOCODE_BREAKER_THRESHOLD", 5))
+    if threshold <= 0:
+        return None
+    return CircuitBreaker(
+        threshold, cooldown_seconds=float(os.getenv("GEOCODE_BREAKER_COOLDOWN_SECONDS", 30))
+    )
+
+
+def get_worker_count():
+    """Returns the number of concurrent geocoding workers (GEOCODE_WORKERS)."""
+    return max(1, int(os.getenv("GEOCODE_WORKERS", 4)))
+
+
+def run_concurrently(func, items, workers=1):
+    """Applies func to every item in a thread pool and returns the results in input order."""
+    items = list(items)
+    if workers <= 1 or len(items) <= 1:
+        return [func(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(workers, len(items))) as executor:
+        return list(executor.map(func, items))
@@ -1,51 +1,190 @@
-# uv run python src/gpx_generator.py
+# uv run python -m src.gpx_generator
 
+import logging
 import os
+from xml.sax.saxutils import escape as xml_escape
 
+import numpy as np
 import pandas as pd
 
 import gpxpy
 import gpxpy.gpx
+from gpxpy.utils import make_str
 
 from dotenv import load_dotenv
 
+from src.schema import read_hotel_csv
 
-def create_gpx_file(hotels, output_file):
-    """Creates a GPX file with waypoints for the given hotels."""
-    gpx = gpxpy.gpx.GPX()
+logger = logging.getLogger(__name__)
 
-    for index, hotel in hotels.iterrows():
-        if pd.notna(hotel["Latitude"]) and pd.notna(hotel["Longitude"]):
-            description_parts = []
-            if pd.notna(hotel["Straße"]):
-                description_parts.append(f"Straße: {hotel['Straße']}")
-            if pd.notna(hotel["Telefon"]):
-                description_parts.append(f"Telefon: {hotel['Telefon']}")
-            if pd.notna(hotel["Website"]):
-                description_parts.append(f"Website: {hotel['Website']}")
-            if pd.notna(hotel["Entfernung"]):
-                description_parts.append(f"Entfernung: {hotel['Entfernung']}")
-            if pd.notna(hotel["Hm"]):
-                description_parts.append(f"Hm: {hotel['Hm']}")
-
-            description_str = ", ".join(description_parts)
-
-            gpx.waypoints.append(
-                gpxpy.gpx.GPXWaypoint(
-                    latitude=hotel["Latitude"],
-                    longitude=hotel["Longitude"],
-                    name=hotel["Betrieb"],
-                    description=description_str,
-                    symbol="friends-home",
-                )
+
+# Columns shown in the waypoint description, with the label printed before each value.
+DESCRIPTION_FIELDS = [
+    ("Straße", "Straße"),
+    ("Telefon", "Telefon"),
+    ("Website", "Website"),
+    ("Entfernung", "Entfernung"),
+    ("Hm", "Hm"),
+    ("Route Distance km", "Route Distance km"),
+    ("Route km", "Route km"),
+]
+
+
+def build_descriptions(hotels, description_fields=None):
+    """Builds the waypoint description for every row column-wise.
+
+    Each present value becomes "<label>: <value>"; the parts are joined with
+    ", ". Missing values and columns absent from the DataFrame are skipped.
+    """
+    if description_fields is None:
+        description_fields = DESCRIPTION_FIELDS
+    descriptions = pd.Series("", index=hotels.index, dtype=object)
+    for column, label in description_fields:
+        if column not in hotels:
+            continue
+        values = hotels[column]
+        present = values.notna().to_numpy()
+        parts = (f"{label}: " + values.astype(str)).where(present, "")
+        separators = np.where(present & (descriptions != "").to_numpy(), ", ", "")
+        descriptions = descriptions + separators + parts
+    return descriptions
+
+
+def _waypoint_values(hotels, description_fields=None):
+    """Returns latitudes, longitudes, names and descriptions of the rows with coordinates.
+
+    Rows without coordinates are logged and skipped.
+    """
+    if len(hotels) == 0:
+        return [], [], [], []
+    valid = (hotels["Latitude"].notna() & hotels["Longitude"].notna()).to_numpy()
+    names = hotels["Betrieb"].to_numpy()
+
+    for name in names[~valid]:
+        logger.debug("Skipping hotel %s due to missing coordinates.", name)
+
+    valid_hotels = hotels[valid]
+    descriptions = build_descriptions(valid_hotels, description_fields)
+    return (
+        valid_hotels["Latitude"].to_numpy(dtype=float).tolist(),
+        valid_hotels["Longitude"].to_numpy(dtype=float).tolist(),
+        names[valid].tolist(),
+        descriptions.to_numpy().tolist(),
+    )
+
+
+def _gpx_track(track):
+    """Converts a track from `src.gpx_track_reader` into a gpxpy track."""
+    gpx_track = gpxpy.gpx.GPXTrack(name=track.name)
+    bounds = np.append(track.segment_starts, len(track.latitudes))
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        segment = gpxpy.gpx.GPXTrackSegment()
+        segment.points.extend(
+            gpxpy.gpx.GPXTrackPoint(
+                latitude, longitude, elevation=None if np.isnan(elevation) else elevation
             )
-        else:
-            print(f"Skipping hotel {hotel['Betrieb']} due to missing coordinates.")
+            for latitude, longitude, elevation in zip(
+                track.latitudes[start:end].tolist(),
+                track.longitudes[start:end].tolist(),
+                track.elevations[start:end].tolist(),
+            )
+        )
+        gpx_track.segments.append(segment)
+    return gpx_track
+
+
+def create_gpx_file(hotels, output_file, description_fields=None, streaming=False, track=None):
+    """Creates a GPX file with waypoints for the given hotels.
+
+    `description_fields` is a list of (column, label) pairs for the waypoint
+    description and defaults to DESCRIPTION_FIELDS. An optional `track` (see
+    `src.gpx_track_reader`) is written after the waypoints, so one file holds
+    the route and the hotels. With streaming=True the file is written by
+    `write_gpx_stream` instead of building a gpxpy document.
+    """
+    if streaming:
+        write_gpx_stream([hotels], output_file, description_fields, track)
+        return
+
+    gpx = gpxpy.gpx.GPX()
+
+    gpx.waypoints.extend(
+        gpxpy.gpx.GPXWaypoint(
+            latitude=latitude,
+            longitude=longitude,
+            name=name,
+            description=description,
+            symbol="friends-home",
+        )
+        for latitude, longitude, name, description in zip(
+            *_waypoint_values(hotels, description_fields)
+        )
+    )
+    if track is not None:
+        gpx.tracks.append(_gpx_track(track))
 
     with open(output_file, "w") as f:
         f.write(gpx.to_xml())
 
 
+def _gpx_document_parts():
+    """Returns the document header and footer exactly as gpxpy writes them."""
+    empty_document = gpxpy.gpx.GPX().to_xml()
+    split_at = empty_document.rindex("\n</gpx>")
+    return empty_document[:split_at], empty_document[split_at:]
+
+
+def _waypoint_xml(latitude, longitude, name, description):
+    """Serializes one waypoint the same way gpxpy's to_xml() does."""
+    # gpxpy stores a coordinate of exactly 0 as the integer 0
+    parts = [
+        f'\n  <wpt lat="{make_str(latitude or 0)}" lon="{make_str(longitude or 0)}">'
+    ]
+    if name is not None:
+        parts.append(f"\n    <name>{xml_escape(make_str(name))}</name>")
+    if description is not None:
+        parts.append(f"\n    <desc>{xml_escape(make_str(description))}</desc>")
+    parts.append("\n    <sym>friends-home</sym>\n  </wpt>")
+    return "".join(parts)
+
+
+def _track_xml(track):
+    """Serializes a track exactly as it appears in gpxpy's to_xml() output."""
+    gpx = gpxpy.gpx.GPX()
+    gpx.tracks.append(_gpx_track(track))
+    header, footer = _gpx_document_parts()
+    return gpx.to_xml()[len(header):-len(footer)]
+
+
+def write_gpx_stream(chunks, output_file, description_fields=None, track=None):
+    """Writes a GPX file from an iterable of hotel DataFrames, one chunk at a time.
+
+    Only the current chunk is held in memory, so the memory use does not grow
+    with the number of waypoints. The output is identical to create_gpx_file.
+    Returns the number of waypoints written.
+    """
+    header, footer = _gpx_document_parts()
+    count = 0
+    with open(output_file, "w", encoding="utf-8") as f:
+        f.write(header)
+        for chunk in chunks:
+            values = _waypoint_values(chunk, description_fields)
+            f.write("".join(_waypoint_xml(*waypoint) for waypoint in zip(*values)))
+            count += len(values[0])
+        if track is not None:
+            f.write(_track_xml(track))
+        f.write(footer)
+    return count
+
+
+def create_gpx_file_from_csv(
+    csv_file, output_file, description_fields=None, chunksize=10000, track=None
+):
+    """Streams a geocoded hotel CSV into a GPX file in chunks of `chunksize` rows."""
+    chunks = read_hotel_csv(csv_file, chunksize=chunksize)
+    return write_gpx_stream(chunks, output_file, description_fields, track)
+
+
 if __name__ == "__main__":
     load_dotenv()
     csv_file = os.getenv("CSV_W_COOR_FILE")
@@ -53,8 +192,15 @@ if __name__ == "__main__":
 
     if csv_file:
         try:
-            hotels_df = pd.read_csv(csv_file, delimiter=";")
-            create_gpx_file(hotels_df, gpx_file)
+            if os.getenv("GPX_STREAMING", "").strip().lower() in ("1", "true", "yes"):
+                create_gpx_file_from_csv(
+                    csv_file,
+                    gpx_file,
+                    chunksize=int(os.getenv("GPX_CHUNK_SIZE", 10000)),
+                )
+            else:
+                hotels_df = read_hotel_csv(csv_file)
+                create_gpx_file(hotels_df, gpx_file)
             print(f"GPX file '{gpx_file}' created successfully.")
         except FileNotFoundError:
             print(f"Error: CSV file not found at {csv_file}")
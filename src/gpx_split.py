@@ -0,0 +1,128 @@
+# uv run python -m src.gpx_split
+
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from dotenv import load_dotenv
+
+from src.gpx_generator import create_gpx_file
+from src.gpx_track_reader import read_track
+from src.route_index import (
+    ROUTE_KM_COLUMN,
+    add_route_columns,
+    load_route_index_from_env,
+    slice_track,
+)
+from src.schema import read_hotel_csv
+from src.track_simplify import get_track_limits, simplify_track
+
+
+def partition_file_name(output_file, column, value):
+    """Returns the GPX file name for one partition, e.g. data/hotels_Etappe_3.gpx."""
+    root, extension = os.path.splitext(output_file)
+    label = re.sub(r"[^\w.-]+", "_", f"{column}_{value}").strip("_")
+    return f"{root}_{label}{extension or '.gpx'}"
+
+
+def write_gpx_task(hotels, output_file, description_fields, track, track_limits):
+    """Writes one GPX file, with the track simplified to `track_limits`; runs in a worker process.
+
+    Returns the file name and the number of waypoints written.
+    """
+    if track is not None and track_limits is not None:
+        track, _ = simplify_track(track, *track_limits)
+    create_gpx_file(hotels, output_file, description_fields, track=track)
+    written = int((hotels["Latitude"].notna() & hotels["Longitude"].notna()).sum())
+    return output_file, written
+
+
+def write_partitioned_gpx_files(
+    hotels,
+    output_file,
+    column="Etappe",
+    track=None,
+    track_limits=None,
+    description_fields=None,
+    workers=1,
+):
+    """Writes one GPX file per value of `column`, in parallel worker processes.
+
+    With a `track`, every file also gets the part of the track between the
+    lowest and highest "Route km" of its hotels, simplified per file to
+    `track_limits` ((tolerance_m, max_points), see `simplify_track`). Rows
+    without a value in `column` are not written. Returns a list of
+    (value, file name, number of waypoints) in the order of the values.
+    """
+    if column not in hotels:
+        raise ValueError(f"Split column '{column}' not found.")
+
+    values = []
+    tasks = []
+    for value, partition in hotels.groupby(column, sort=True):
+        partition_track = None
+        if track is not None and ROUTE_KM_COLUMN in partition:
+            route_km = partition[ROUTE_KM_COLUMN].dropna()
+            if len(route_km):
+                partition_track = slice_track(
+                    track, route_km.min(), route_km.max(), name=f"{track.name} ({column} {value})"
+                )
+        values.append(value)
+        tasks.append((
+            partition,
+            partition_file_name(output_file, column, value),
+            description_fields,
+            partition_track,
+            track_limits,
+        ))
+
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+            results = list(executor.map(write_gpx_task, *zip(*tasks)))
+    else:
+        results = [write_gpx_task(*task) for task in tasks]
+    return [(value, name, written) for value, (name, written) in zip(values, results)]
+
+
+def get_split_workers():
+    """Returns the number of worker processes from GPX_SPLIT_WORKERS (default: CPU count)."""
+    return max(1, int(os.getenv("GPX_SPLIT_WORKERS", os.cpu_count() or 1)))
+
+
+def write_partitions_from_env(hotels, output_file):
+    """Writes per-partition GPX files if GPX_SPLIT_COLUMN is set.
+
+    The route track from ROUTE_GPX_FILE is included when the GPX output
+    contains a track (see `get_track_limits`). Returns the result of
+    `write_partitioned_gpx_files`, or None if splitting is disabled.
+    """
+    column = os.getenv("GPX_SPLIT_COLUMN")
+    if not column:
+        return None
+    route_file = os.getenv("ROUTE_GPX_FILE")
+    track_limits = get_track_limits()
+    track = None
+    if route_file and track_limits is not None:
+        track = read_track(route_file, dedupe=True)
+    return write_partitioned_gpx_files(
+        hotels,
+        output_file,
+        column,
+        track=track,
+        track_limits=track_limits,
+        workers=get_split_workers(),
+    )
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    csv_file = os.getenv("CSV_W_COOR_FILE")
+    gpx_file = os.getenv("GPX_FILE")
+    os.environ.setdefault("GPX_SPLIT_COLUMN", "Etappe")
+
+    hotels_df = read_hotel_csv(csv_file)
+    route_index = load_route_index_from_env()
+    if route_index is not None and ROUTE_KM_COLUMN not in hotels_df:
+        add_route_columns(hotels_df, route_index)
+    for value, name, written in write_partitions_from_env(hotels_df, gpx_file):
+        print(f"{name}: {written} waypoints")
@@ -0,0 +1,102 @@
+# uv run python -m src.gpx_track_reader data/alb-crossing-gesamtroute.gpx
+
+import sys
+from array import array
+from collections import namedtuple
+from xml.etree.ElementTree import iterparse
+
+import numpy as np
+
+# Track points as parallel NumPy arrays. `segment_starts` holds the index of
+# the first point of every <trkseg>; elevations are NaN where <ele> is missing.
+Track = namedtuple(
+    "Track", ["name", "latitudes", "longitudes", "elevations", "segment_starts"]
+)
+
+
+def _local_name(tag):
+    """Strips the XML namespace from an element tag."""
+    return tag.rsplit("}", 1)[-1]
+
+
+def read_track(path, dedupe=False):
+    """Reads all track points of a GPX file into NumPy arrays.
+
+    The file is parsed incrementally and every processed <trkpt> element is
+    discarded, so memory use is bounded by the output arrays and no gpxpy
+    objects are created. Empty segments are left out. With dedupe=True, consecutive points with the same
+    latitude and longitude are collapsed into the first of them.
+    """
+    latitudes = array("d")
+    longitudes = array("d")
+    elevations = array("d")
+    segment_starts = []
+    name = None
+    in_track = False
+    segment = None
+
+    for event, element in iterparse(path, events=("start", "end")):
+        tag = _local_name(element.tag)
+        if event == "start":
+            if tag == "trk":
+                in_track = True
+            elif tag == "trkseg":
+                segment = element
+                segment_starts.append(len(latitudes))
+            continue
+
+        if tag == "trkpt":
+            latitudes.append(float(element.get("lat")))
+            longitudes.append(float(element.get("lon")))
+            elevation = np.nan
+            for child in element:
+                if _local_name(child.tag) == "ele" and child.text:
+                    elevation = float(child.text)
+                    break
+            elevations.append(elevation)
+            # Drop the parsed points so the tree does not grow with the file
+            segment.clear()
+        elif tag == "name" and in_track and segment is None and name is None:
+            name = element.text
+        elif tag == "trk":
+            in_track = False
+
+    # Empty <trkseg> elements hold no points, so they start no segment
+    segment_starts = np.unique(np.array(segment_starts, dtype=np.intp))
+    track = Track(
+        name,
+        np.frombuffer(latitudes, dtype=float),
+        np.frombuffer(longitudes, dtype=float),
+        np.frombuffer(elevations, dtype=float),
+        segment_starts[segment_starts < len(latitudes)],
+    )
+    return dedupe_track(track) if dedupe else track
+
+
+def dedupe_track(track):
+    """Removes consecutive points with identical latitude and longitude."""
+    keep = np.ones(len(track.latitudes), dtype=bool)
+    keep[1:] = (np.diff(track.latitudes) != 0) | (np.diff(track.longitudes) != 0)
+    # The first point of a segment is always kept
+    keep[track.segment_starts[track.segment_starts < len(keep)]] = True
+    kept_before = np.concatenate(([0], np.cumsum(keep)))
+    return Track(
+        track.name,
+        track.latitudes[keep],
+        track.longitudes[keep],
+        track.elevations[keep],
+        kept_before[track.segment_starts].astype(np.intp),
+    )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python -m src.gpx_track_reader <track.gpx>")
+        sys.exit(1)
+    track = read_track(sys.argv[1])
+    deduped = dedupe_track(track)
+    print(
+        f"Track '{track.name}': {len(track.latitudes)} points"
+        f" ({len(deduped.latitudes)} after removing consecutive duplicates)"
+        f" in {len(track.segment_starts)} segment(s)."
+    )
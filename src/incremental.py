@@ -0,0 +1,56 @@
+import hashlib
+import os
+
+import pandas as pd
+
+from src.schema import read_hotel_csv
+
+# Columns that identify a hotel row; a change in any of them means a new row.
+ROW_KEY_COLUMNS = ["Betrieb", "Straße", "Stadt"]
+
+
+def is_incremental_enabled():
+    """Returns True if GEOCODE_INCREMENTAL is set to a truthy value."""
+    return os.getenv("GEOCODE_INCREMENTAL", "").strip().lower() in ("1", "true", "yes")
+
+
+def row_keys(hotels_df):
+    """Returns a stable hash of the Betrieb, Straße and Stadt columns for every row."""
+    parts = [
+        hotels_df[column].fillna("").astype(str).str.strip()
+        if column in hotels_df
+        else pd.Series("", index=hotels_df.index)
+        for column in ROW_KEY_COLUMNS
+    ]
+    joined = parts[0].str.cat(parts[1:], sep="\x1f")
+    return joined.map(lambda value: hashlib.sha1(value.encode("utf-8")).hexdigest())
+
+
+def load_previous_results(file_path):
+    """Loads geocoded rows from a previous CSV_W_COOR_FILE, keyed by row key.
+
+    Returns a dict mapping row keys to (latitude, longitude, template);
+    rows without coordinates are left out so they are geocoded again.
+    """
+    if not file_path or not os.path.exists(file_path):
+        return {}
+    previous_df = read_hotel_csv(file_path)
+    if not {"Latitude", "Longitude"}.issubset(previous_df.columns):
+        return {}
+    previous_df = previous_df[
+        previous_df["Latitude"].notna() & previous_df["Longitude"].notna()
+    ]
+    templates = (
+        previous_df["Geocode Template"]
+        if "Geocode Template" in previous_df
+        else pd.Series(None, index=previous_df.index, dtype=object)
+    )
+    return {
+        key: (latitude, longitude, template if pd.notna(template) else None)
+        for key, latitude, longitude, template in zip(
+            row_keys(previous_df),
+            previous_df["Latitude"],
+            previous_df["Longitude"],
+            templates,
+        )
+    }
@@ -0,0 +1,111 @@
+import cProfile
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+
+def _percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+class Profiler:
+    """Collects stage timers, request timings and counters of one run.
+
+    All methods are thread-safe; stage times of concurrent workers add up,
+    so they can exceed the wall time of the run.
+    """
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.stages = {}
+        self.counters = {}
+        self.request_seconds = []
+        self._lock = threading.Lock()
+
+    def add_time(self, name, seconds):
+        """Adds `seconds` to the timer `name`."""
+        with self._lock:
+            total, calls = self.stages.get(name, (0.0, 0))
+            self.stages[name] = (total + seconds, calls + 1)
+
+    @contextmanager
+    def stage(self, name):
+        """Times the enclosed block as the stage `name`."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def count(self, name, amount=1):
+        """Increments the counter `name`."""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def record_request(self, seconds):
+        """Records the duration of one remote geocoding request."""
+        with self._lock:
+            self.request_seconds.append(seconds)
+
+    def report(self):
+        """Returns the collected measurements as a JSON-serializable dict."""
+        with self._lock:
+            durations = sorted(self.request_seconds)
+            return {
+                "total_seconds": round(time.perf_counter() - self.started_at, 6),
+                "stages": {
+                    name: {"seconds": round(total, 6), "calls": calls}
+                    for name, (total, calls) in self.stages.items()
+                },
+                "counters": dict(self.counters),
+                "requests": {
+                    "count": len(durations),
+                    "total_seconds": round(sum(durations), 6),
+                    "mean_seconds": round(sum(durations) / len(durations), 6) if durations else 0.0,
+                    "p50_seconds": round(_percentile(durations, 0.5), 6),
+                    "p95_seconds": round(_percentile(durations, 0.95), 6),
+                    "max_seconds": round(durations[-1], 6) if durations else 0.0,
+                },
+            }
+
+
+_profiler = Profiler()
+
+
+def get_profiler():
+    """Returns the profiler of the current run."""
+    return _profiler
+
+
+def reset_profiler():
+    """Starts a new run with empty measurements and returns its profiler."""
+    global _profiler
+    _profiler = Profiler()
+    return _profiler
+
+
+@contextmanager
+def profiled(report_file=None, cprofile_file=None):
+    """Profiles the enclosed run.
+
+    The JSON report of `get_profiler()` is written to `report_file` and a
+    cProfile dump (readable with `python -m pstats`) to `cprofile_file`,
+    if given. Both are also written when the run fails.
+    """
+    profiler = reset_profiler()
+    python_profiler = cProfile.Profile() if cprofile_file else None
+    if python_profiler is not None:
+        python_profiler.enable()
+    try:
+        yield profiler
+    finally:
+        if python_profiler is not None:
+            python_profiler.disable()
+            python_profiler.dump_stats(cprofile_file)
+        if report_file:
+            with open(report_file, "w", encoding="utf-8") as f:
+                json.dump(profiler.report(), f, indent=2)
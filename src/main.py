@@ -1,142 +1,402 @@
 # uv run python -m src.main
 
+import argparse
+import logging
 import os
+import sys
+import time
 
-import pandas as pd
-import numpy as np
 from dotenv import load_dotenv
 
-from src.geocoding import get_gps_coordinates
-from src.gpx_generator import create_gpx_file
+from src.geocoding import get_default_session
+from src.geocoding_engine import GeocodingUnavailableError
+from src.checkpoint import CheckpointJournal, get_journal_path, load_journal
+from src.instrumentation import get_profiler, profiled
+from src.reporting import (
+    NotFoundReport,
+    ProgressIndicator,
+    configure_logging,
+    get_not_found_report_path,
+)
+
+# Named explicitly, since __name__ is "__main__" under `python -m src.main`
+logger = logging.getLogger("src.main")
 
 
 def load_hotels_from_csv(file_path):
-    """Loads hotel addresses from a CSV file."""
+    """Loads hotel addresses from a CSV file, normalized to the hotel schema."""
+    from src.schema import normalize_hotel_table, read_raw_table
+
     try:
-        return pd.read_csv(file_path, sep=";")
+        return normalize_hotel_table(read_raw_table(file_path, sep=";"))
     except FileNotFoundError:
-        print(f"Error: The file {file_path} was not found.")
+        logger.error("The file %s was not found.", file_path)
         return None
 
 
-def run_main():
+class GeocodeSummary:
+    """Counters of a geocoding run.
+
+    The addresses that were not found go to `not_found`, a NotFoundReport.
+    """
+
+    def __init__(self, total, templates, not_found=None):
+        self.total = total
+        self.by_template = dict.fromkeys(templates, 0)
+        self.reused = 0
+        self.resumed = 0
+        self.skipped = 0
+        self.not_found = not_found if not_found is not None else NotFoundReport(None)
+        self.reused_from = None
+        self.resumed_from = None
+
+    @property
+    def found(self):
+        """Number of hotels with coordinates."""
+        return self.reused + self.resumed + sum(self.by_template.values())
+
+    def lines(self):
+        """The summary logged after geocoding."""
+        lines = [f"Hotels with GPS coordinates:{self.found} out of {self.total}"]
+        if self.reused:
+            lines.append(f"  {self.reused} reused from '{self.reused_from}'")
+        if self.resumed:
+            lines.append(f"  {self.resumed} resumed from '{self.resumed_from}'")
+        lines.extend(f"  {count} via '{template}'" for template, count in self.by_template.items())
+        if self.not_found.count:
+            where = f", listed in '{self.not_found.path}'" if self.not_found.path else ""
+            lines.append(f"Hotels not found: {self.not_found.count}{where}")
+        return lines
+
+
+def geocode_hotels(hotels_df, session=None, resume=False, csv_w_coor_file=None):
+    """Adds Latitude, Longitude and Geocode Template columns to the hotels.
+
+    Rows are reused from `csv_w_coor_file` in incremental mode and from the
+    checkpoint journal with resume=True. The results are collected in
+    arrays and attached as columns once. Progress is shown on one status
+    line, per-row messages are logged at DEBUG and the addresses that were
+    not found are written to the report of `get_not_found_report_path`.
+    Returns the hotels and a GeocodeSummary.
+    """
+    from src.query_plan import get_address_templates
+
+    templates = get_address_templates()
+    not_found = NotFoundReport(get_not_found_report_path(csv_w_coor_file))
+    try:
+        return _geocode_hotels(hotels_df, session, resume, csv_w_coor_file, templates, not_found)
+    finally:
+        not_found.close()
+
+
+def _geocode_hotels(hotels_df, session, resume, csv_w_coor_file, templates, not_found):
+    import numpy as np
+    import pandas as pd
+
+    from src.incremental import is_incremental_enabled, load_previous_results, row_keys
+    from src.query_plan import build_query_plan, execute_query_plan
+
+    summary = GeocodeSummary(len(hotels_df), templates, not_found)
+    latitudes = np.full(len(hotels_df), np.nan)
+    longitudes = np.full(len(hotels_df), np.nan)
+    winning_templates = np.full(len(hotels_df), None, dtype=object)
+
+    def assign(positions, coordinates_and_templates):
+        for position, (latitude, longitude, template) in zip(
+            positions, coordinates_and_templates
+        ):
+            latitudes[position] = latitude
+            longitudes[position] = longitude
+            winning_templates[position] = template
+
+    def report_not_found(address):
+        summary.not_found.add(address)
+        logger.debug("%d) Could absolutely not geocode: %s", summary.not_found.count, address)
+
+    keys = row_keys(hotels_df).to_numpy()
+    pending = np.ones(len(hotels_df), dtype=bool)
+
+    # In incremental mode, reuse the coordinates of unchanged rows from
+    # the previous output and only geocode new or modified rows.
+    if is_incremental_enabled():
+        previous_results = load_previous_results(csv_w_coor_file)
+        reusable = np.flatnonzero([key in previous_results for key in keys])
+        assign(reusable, (previous_results[keys[position]] for position in reusable))
+        summary.reused = len(reusable)
+        summary.reused_from = csv_w_coor_file
+        pending[reusable] = False
+        logger.info(
+            "Reused coordinates for %d unchanged hotels, geocoding %d new or changed hotels.",
+            summary.reused,
+            int(pending.sum()),
+        )
+
+    # When resuming, rows recorded in the checkpoint journal of the
+    # interrupted run are taken from the journal without new requests.
+    journal_path = get_journal_path(csv_w_coor_file)
+    if resume:
+        journal_results = load_journal(journal_path)
+        resumable = np.flatnonzero(pending & [key in journal_results for key in keys])
+        found = []
+        for position in resumable:
+            latitude, longitude, template, address = journal_results[keys[position]]
+            if latitude is None:
+                report_not_found(address)
+            else:
+                found.append(position)
+                latitudes[position], longitudes[position] = latitude, longitude
+                winning_templates[position] = template
+        summary.resumed = len(found)
+        summary.resumed_from = journal_path
+        pending[resumable] = False
+        logger.info(
+            "Resumed %d hotels from '%s', geocoding %d remaining hotels.",
+            len(resumable),
+            journal_path,
+            int(pending.sum()),
+        )
+
+    journal = None
+    if journal_path:
+        journal = CheckpointJournal(
+            journal_path,
+            flush_every=int(os.getenv("GEOCODE_CHECKPOINT_EVERY", 10)),
+            resume=resume,
+        )
+    pending_positions = np.flatnonzero(pending)
+    pending_keys = keys[pending_positions]
+    profiler = get_profiler()
+    progress = ProgressIndicator(len(pending_positions))
+
+    def checkpoint(row_index, coordinates, template_index, attempts):
+        progress.update(
+            cache_hits=profiler.counters.get("cache_hits", 0),
+            lookups=profiler.counters.get("cache_hits", 0) + profiler.counters.get("requests", 0),
+        )
+        if journal is not None:
+            journal.record(
+                pending_keys[row_index],
+                coordinates,
+                templates[template_index] if template_index is not None else None,
+                attempts[-1] if coordinates else (attempts[0] if attempts else ""),
+            )
+
+    # Resolve the rows with one deduplicated batch per address template;
+    # the session geocodes each batch concurrently behind the rate limiter.
+    if session is None:
+        session = get_default_session()
+    plan = build_query_plan(hotels_df.iloc[pending_positions], templates)
+    try:
+        with profiler.stage("geocode.requests"):
+            results = execute_query_plan(
+                plan,
+                session.geocode_many,
+                on_row_resolved=checkpoint,
+                batch_size=int(os.getenv("GEOCODE_BATCH_SIZE", 50)),
+            )
+    finally:
+        progress.close()
+        if journal is not None:
+            journal.close()
+
+    assign_start = time.perf_counter()
+    counter_geocodes = 0
+    for position, (coordinates, template_index, attempts) in zip(pending_positions, results):
+        for failed_address in attempts[:-1]:
+            logger.debug("Could not geocode: %s", failed_address)
+
+        if coordinates:
+            template = templates[template_index]
+            latitudes[position], longitudes[position] = coordinates
+            winning_templates[position] = template
+            summary.by_template[template] += 1
+            counter_geocodes += 1
+            logger.debug("%d) Geocoded: %s %s", counter_geocodes, attempts[-1], coordinates)
+        elif attempts:
+            # The first, most specific address, as recorded in the journal
+            report_not_found(attempts[0])
+        else:
+            summary.skipped += 1
+            report_not_found(f"row {hotels_df.index[position]} (missing address fields)")
+
+    # Attach the results as whole columns instead of writing cell by cell
+    hotels_df["Latitude"] = latitudes
+    hotels_df["Longitude"] = longitudes
+    hotels_df["Geocode Template"] = pd.Series(winning_templates, index=hotels_df.index, dtype=object)
+    profiler.add_time("geocode.assign_results", time.perf_counter() - assign_start)
+    profiler.count("rows_reused", summary.reused)
+    profiler.count("rows_resumed", summary.resumed)
+    profiler.count("rows_geocoded", sum(summary.by_template.values()))
+    profiler.count("rows_not_found", summary.not_found.count)
+    profiler.count("rows_skipped", summary.skipped)
+
+    if logger.isEnabledFor(logging.DEBUG):
+        with pd.option_context("display.max_rows", None):
+            logger.debug("Geocoded hotels:\n%s", hotels_df)
+    for line in summary.lines():
+        logger.info(line)
+    if session.cache is not None:
+        logger.info(session.cache.stats_summary())
+
+    return hotels_df, summary
+
+
+def enrich_hotels(hotels_df):
+    """Adds the route columns if ROUTE_GPX_FILE is set; returns the route index or None."""
+    from src.route_index import add_route_columns, load_route_index_from_env
+
+    # Distance to the route and along-route km, if a route track is configured
+    route_index = load_route_index_from_env()
+    if route_index is not None:
+        add_route_columns(hotels_df, route_index)
+        logger.info(
+            "Route: %.1f km, %d hotels placed along it",
+            route_index.length_km,
+            hotels_df["Route Distance km"].notna().sum(),
+        )
+    return route_index
+
+
+def write_gpx_outputs(hotels_df, gpx_file, route_index=None):
+    """Writes GPX_FILE and, if configured, one GPX file per partition.
+
+    `route_index` is needed in corridor mode (see `enrich_hotels`).
+    """
+    from src.gpx_generator import create_gpx_file
+    from src.gpx_split import write_partitions_from_env
+    from src.route_index import filter_corridor, get_corridor_buffer_km
+    from src.track_simplify import load_simplified_track_from_env
+
+    profiler = get_profiler()
+
+    # In corridor mode, only hotels near the route become waypoints
+    gpx_hotels = hotels_df
+    buffer_km = get_corridor_buffer_km()
+    if buffer_km is not None:
+        if route_index is None:
+            raise ValueError("CORRIDOR_BUFFER_KM requires ROUTE_GPX_FILE.")
+        with profiler.stage("gpx.corridor"):
+            gpx_hotels, dropped = filter_corridor(hotels_df, route_index, buffer_km)
+        logger.info(
+            "Corridor of %g km: kept %d out of %d hotels", buffer_km, len(gpx_hotels), len(hotels_df)
+        )
+        for reason, count in dropped.items():
+            if count:
+                logger.info("  %d dropped: %s", count, reason)
+
+    # Simplified route track written alongside the waypoints, if configured
+    track = None
+    with profiler.stage("gpx.track"):
+        simplified = load_simplified_track_from_env()
+    if simplified is not None:
+        track, original_points, deviation_m = simplified
+        logger.info(
+            "Track simplified from %d to %d points (max deviation %.1f m)",
+            original_points,
+            len(track.latitudes),
+            deviation_m,
+        )
+
+    # Create GPX file
+    with profiler.stage("gpx.write"):
+        create_gpx_file(gpx_hotels, gpx_file, track=track)
+    logger.info("GPX file '%s' created successfully.", gpx_file)
+
+    # Optionally one more GPX file per stage (or other GPX_SPLIT_COLUMN value)
+    with profiler.stage("gpx.partitions"):
+        partitions = write_partitions_from_env(gpx_hotels, gpx_file)
+    if partitions is not None:
+        logger.info(
+            "Created %d GPX files split by '%s':", len(partitions), os.getenv("GPX_SPLIT_COLUMN")
+        )
+        for _, name, written in partitions:
+            logger.info("  %s: %d waypoints", name, written)
+
+
+def remove_journal(csv_w_coor_file):
+    """Removes the checkpoint journal once the geocoded output is complete."""
+    journal_path = get_journal_path(csv_w_coor_file)
+    if journal_path and os.path.exists(journal_path):
+        os.remove(journal_path)
+
+
+def run_main(session=None, resume=False):
+    """Geocodes the hotels from CSV_FILE and writes CSV_W_COOR_FILE and GPX_FILE.
+
+    A GeocoderSession can be injected; by default the session configured
+    in .env is used. Resolved rows are checkpointed to a journal; with
+    resume=True, rows from the journal of an interrupted run are reused.
+    At DEBUG level, the hotel table is logged in full before and after
+    geocoding.
+    """
+    import pandas as pd
+
     load_dotenv()
 
     gpx_file = os.getenv("GPX_FILE")
     csv_file = os.getenv("CSV_FILE")
     csv_w_coor_file = os.getenv("CSV_W_COOR_FILE")
 
-    hotels_df = load_hotels_from_csv(csv_file)
+    profiler = get_profiler()
+    with profiler.stage("load"):
+        hotels_df = load_hotels_from_csv(csv_file)
     if hotels_df is not None:
-        print("Hotels loaded from CSV:")
-        pd.set_option("display.max_rows", None)
-        print(hotels_df)
-
-        # Add Latitude and Longitude columns
-        hotels_df["Latitude"] = np.nan
-        hotels_df["Longitude"] = np.nan
-        hotels_df["Latitude"] = hotels_df["Latitude"].astype(float)
-        hotels_df["Longitude"] = hotels_df["Longitude"].astype(float)
-
-        counter_Betrieb_Strasse_Stadt_geocodes = 0
-        counter_Strasse_Stadt_geocodes = 0
-        counter_Betrieb_Stadt_geocodes = 0
-        counter_geocodes = 0
-        counter_not_geocodes = 0
-
-        hotels_not_found = ""
-
-        for index, row in hotels_df.iterrows():
-            address = f"{row['Betrieb']}, {row['Straße']}, {row['Stadt']}, Germany"
-            full_address = address
-
-            coordinates = get_gps_coordinates(address)
-
-            if coordinates:
-                hotels_df.loc[index, "Latitude"] = coordinates[0]
-                hotels_df.loc[index, "Longitude"] = coordinates[1]
-
-                counter_geocodes += 1
-                counter_Betrieb_Strasse_Stadt_geocodes += 1
-
-                print(
-                    str(counter_geocodes)
-                    + ") Geocoded: "
-                    + address
-                    + " "
-                    + str(coordinates)
-                )
-            else:
-                print(f"Could not geocode: {address}")
-
-                address = f"{row['Straße']}, {row['Stadt']}, Germany"
-                coordinates = get_gps_coordinates(address)
-
-                if coordinates:
-                    hotels_df.loc[index, "Latitude"] = coordinates[0]
-                    hotels_df.loc[index, "Longitude"] = coordinates[1]
-
-                    counter_geocodes += 1
-                    counter_Strasse_Stadt_geocodes += 1
-
-                    print(
-                        str(counter_geocodes)
-                        + ") Geocoded: "
-                        + address
-                        + " "
-                        + str(coordinates)
-                    )
-                else:
-                    print(f"Could not geocode: {address}")
-
-                    address = f"{row['Betrieb']}, {row['Stadt']}, Germany"
-                    coordinates = get_gps_coordinates(address)
-
-                    if coordinates:
-                        hotels_df.loc[index, "Latitude"] = coordinates[0]
-                        hotels_df.loc[index, "Longitude"] = coordinates[1]
-
-                        counter_geocodes += 1
-                        counter_Betrieb_Stadt_geocodes += 1
-
-                        print(
-                            str(counter_geocodes)
-                            + ") Geocoded: "
-                            + address
-                            + " "
-                            + str(coordinates)
-                        )
-                    else:
-                        counter_not_geocodes += 1
-                        print(
-                            str(counter_not_geocodes)
-                            + ") Could absolutely not geocode: "
-                            + full_address
-                        )
-                        hotels_not_found += address + "\n"
-
-        total_geocodes = (
-            counter_Betrieb_Strasse_Stadt_geocodes
-            + counter_Strasse_Stadt_geocodes
-            + counter_Betrieb_Stadt_geocodes
-        )
+        logger.info("Hotels loaded from CSV: %d", len(hotels_df))
+        if logger.isEnabledFor(logging.DEBUG):
+            with pd.option_context("display.max_rows", None):
+                logger.debug("Loaded hotels:\n%s", hotels_df)
 
-        pd.set_option("display.max_rows", None)
-        print(hotels_df)
-        print(
-            "Hotels with GPS coordinates:"
-            + str(total_geocodes)
-            + " out of "
-            + str(len(hotels_df))
-        )
+        with profiler.stage("geocode"):
+            hotels_df, _ = geocode_hotels(hotels_df, session, resume, csv_w_coor_file)
+        with profiler.stage("enrich"):
+            route_index = enrich_hotels(hotels_df)
 
-        hotels_df.to_csv(csv_w_coor_file, sep=";", index=False, encoding="utf-8")
+        with profiler.stage("write_csv"):
+            hotels_df.to_csv(csv_w_coor_file, sep=";", index=False, encoding="utf-8")
+        # The output is complete, so the checkpoint journal is no longer needed
+        remove_journal(csv_w_coor_file)
 
-        print(f"Hotels not found:\n{hotels_not_found}")
+        with profiler.stage("gpx"):
+            write_gpx_outputs(hotels_df, gpx_file, route_index)
 
-        # Create GPX file
-        create_gpx_file(hotels_df, gpx_file)
-        print(f"GPX file '{gpx_file}' created successfully.")
 
 if __name__ == "__main__":
-    run_main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Geocode hotels and create a GPX file.")
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="continue an interrupted run from its checkpoint journal",
+    )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="log every row and the full hotel table (same as --log-level DEBUG)",
+    )
+    parser.add_argument(
+        "--log-level",
+        help="DEBUG, INFO, WARNING or ERROR (default: LOG_LEVEL or INFO)",
+    )
+    parser.add_argument(
+        "--log-format",
+        choices=("text", "json"),
+        help="format of the log lines (default: LOG_FORMAT or text)",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="REPORT_JSON",
+        help="write stage timers, request timings and counters to this JSON file",
+    )
+    parser.add_argument(
+        "--cprofile",
+        metavar="STATS_FILE",
+        help="also write a cProfile dump, readable with python -m pstats",
+    )
+    args = parser.parse_args()
+    load_dotenv()
+    configure_logging("DEBUG" if args.verbose else args.log_level, args.log_format)
+    with profiled(args.profile, args.cprofile):
+        try:
+            run_main(resume=args.resume)
+        except GeocodingUnavailableError as e:
+            logger.error("%s. Run again with --resume once the service is back.", e)
+            sys.exit(1)
\ No newline at end of file
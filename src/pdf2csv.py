@@ -1,33 +1,209 @@
-import tabula
+import io
+import logging
 import os
+from concurrent.futures import ProcessPoolExecutor
+from importlib import metadata
+from importlib.util import find_spec
+from itertools import repeat
+
 from dotenv import load_dotenv
-import pandas as pd  # Import pandas
+
+from src.pdf_cache import file_digest, get_pdf_cache, page_digests
+from src.reporting import configure_logging
+from src.schema import find_header_row, normalize_hotel_table, tables_to_raw
 
 load_dotenv()
 
+# Named explicitly, since __name__ is "__main__" under `python -m src.pdf2csv`
+logger = logging.getLogger("src.pdf2csv")
+
+# Pages per tabula call when a PDF is sharded across worker processes.
+PAGES_PER_SHARD = 10
+
+# Options of every tabula call; part of the PDF table cache keys.
+EXTRACT_OPTIONS = {"multiple_tables": True}
+
+
+def count_pdf_pages(pdf_path):
+    """Returns the number of pages of a PDF, or None if it cannot be determined.
 
-def convert_pdf_to_csv(pdf_path, csv_path):
-    """Converts a PDF file containing tabular data into a CSV file."""
+    Counting pages needs the optional pypdf package.
+    """
+    if not os.path.exists(pdf_path):
+        raise FileNotFoundError(pdf_path)
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        return None
+    try:
+        return len(PdfReader(pdf_path).pages)
+    except Exception:
+        return None
+
+
+def page_shards(page_count, pages_per_shard=PAGES_PER_SHARD):
+    """Splits pages 1..page_count into tabula page ranges like "1-10"."""
+    return [
+        f"{start}-{min(start + pages_per_shard - 1, page_count)}"
+        for start in range(1, page_count + 1, pages_per_shard)
+    ]
+
+
+def _read_tables(pdf_path, pages):
+    """Reads the tables on the given pages; runs in a worker process.
+
+    tabula is imported here, as it loads pandas and probes for Java; cached
+    extractions never pay for it.
+    """
+    import tabula
+
+    return tabula.read_pdf(pdf_path, pages=pages, **EXTRACT_OPTIONS)
+
+
+def _extract_tables(pdf_path, workers, pages_per_shard):
+    """Extracts all tables of a PDF, sharded by page range (see `read_pdf_tables`)."""
+    page_count = count_pdf_pages(pdf_path)
+    if workers <= 1 or page_count is None or page_count <= pages_per_shard:
+        return _read_tables(pdf_path, "all")
+    shards = page_shards(page_count, pages_per_shard)
+    with ProcessPoolExecutor(max_workers=min(workers, len(shards))) as executor:
+        return [
+            table
+            for tables in executor.map(_read_tables, repeat(pdf_path), shards)
+            for table in tables
+        ]
+
+
+def _shares_jvm():
+    """Returns True if tabula can run in one JVM per process (jpype, `pdf` extra).
+
+    Without jpype, every tabula call starts a JVM of its own.
+    """
+    return find_spec("jpype") is not None
+
+
+def _read_pages(pdf_path, pages):
+    """Reads the tables of each page with one call per page; runs in a worker process.
+
+    With jpype, all calls of the process share its JVM.
+    """
+    return [_read_tables(pdf_path, str(page)) for page in pages]
+
+
+def _extract_pages(pdf_path, pages, workers, pages_per_shard):
+    """Extracts the tables of each of the given pages; returns one list per page.
+
+    The pages are read in chunks of `pages_per_shard` by up to `workers`
+    processes.
+    """
+    chunks = [pages[start:start + pages_per_shard] for start in range(0, len(pages), pages_per_shard)]
+    if workers <= 1 or len(chunks) <= 1:
+        return _read_pages(pdf_path, pages)
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+        return [
+            tables
+            for chunk in executor.map(_read_pages, repeat(pdf_path), chunks)
+            for tables in chunk
+        ]
+
+
+def read_pdf_tables(pdf_path, workers=1, pages_per_shard=PAGES_PER_SHARD, cache=None):
+    """Reads all tables of a PDF in page order.
+
+    PDFs with more than `pages_per_shard` pages are split into page ranges
+    that are extracted by up to `workers` processes, each with its own JVM.
+    If the page count is unknown, all pages are read in a single call.
+
+    With a `PdfTableCache`, tables are cached per page digest, so only
+    changed pages are extracted again. Without pypdf the whole file is
+    one cache entry. Without jpype, each page would start a JVM, so when
+    most pages are missing the whole file is extracted and cached instead.
+    """
+    if cache is None:
+        return _extract_tables(pdf_path, workers, pages_per_shard)
+
+    digests = page_digests(pdf_path)
+    if digests is not None:
+        keys = [cache.key(digest, scope="page") for digest in digests]
+        pages = [cache.get(key) for key in keys]
+        missing = [index for index, tables in enumerate(pages) if tables is None]
+        if _shares_jvm() or 2 * len(missing) <= len(pages):
+            extracted = _extract_pages(
+                pdf_path, [index + 1 for index in missing], workers, pages_per_shard
+            )
+            for index, tables in zip(missing, extracted):
+                cache.put(keys[index], tables)
+                pages[index] = tables
+            return [table for tables in pages for table in tables]
+
+    key = cache.key(file_digest(pdf_path))
+    tables = cache.get(key)
+    if tables is None:
+        tables = _extract_tables(pdf_path, workers, pages_per_shard)
+        cache.put(key, tables)
+    return tables
+
+
+def get_pdf_workers():
+    """Returns the number of extraction processes from PDF_WORKERS (default: CPU count)."""
+    return max(1, int(os.getenv("PDF_WORKERS", os.cpu_count() or 1)))
+
+
+def _tabula_version():
+    """Returns the installed tabula-py version without importing it."""
+    try:
+        return metadata.version("tabula-py")
+    except metadata.PackageNotFoundError:
+        return ""
+
+
+def extract_pdf_tables(pdf_path, workers=None, pages_per_shard=None, cache=None):
+    """Reads all tables of a PDF with the settings from .env.
+
+    `workers` and `pages_per_shard` default to PDF_WORKERS and
+    PDF_PAGES_PER_SHARD (see `read_pdf_tables`). `cache` defaults to the
+    PDF table cache in PDF_CACHE_DIR, if set.
+    """
+    if cache is None:
+        cache = get_pdf_cache({**EXTRACT_OPTIONS, "tabula": _tabula_version()})
+    if workers is None:
+        workers = get_pdf_workers()
+    if pages_per_shard is None:
+        pages_per_shard = int(os.getenv("PDF_PAGES_PER_SHARD", PAGES_PER_SHARD))
+    tables = read_pdf_tables(pdf_path, workers, pages_per_shard, cache)
+    if cache is not None:
+        logger.info(cache.stats_summary())
+    return tables
+
+
+def convert_pdf_to_csv(pdf_path, csv_path, workers=None, pages_per_shard=None, cache=None):
+    """Converts a PDF file containing tabular data into a CSV file.
+
+    The tables are read with `extract_pdf_tables`.
+    """
     try:
         # Read PDF into a list of DataFrames
-        dfs = tabula.read_pdf(pdf_path, pages="all", multiple_tables=True)
+        dfs = extract_pdf_tables(pdf_path, workers, pages_per_shard, cache)
+
+        # Serialize all tables with semicolon delimiter into one buffer.
+        # Hotel tables are repaired into a single table; any other tables
+        # are concatenated with the header of the first DataFrame only
+        buffer = io.StringIO()
+        raw = tables_to_raw(dfs)
+        if find_header_row(raw) is not None:
+            normalize_hotel_table(raw).to_csv(buffer, sep=";", index=False)
+        else:
+            for i, df in enumerate(dfs):
+                df.to_csv(buffer, sep=";", index=False, header=i == 0)
 
         # If the CSV file already exists, remove it to ensure a clean start
         if os.path.exists(csv_path):
             os.remove(csv_path)
 
-        # Write each DataFrame to the CSV file with semicolon delimiter
-        for i, df in enumerate(dfs):
-            # Write header only for the first DataFrame
-            header = i == 0
-            df.to_csv(
-                csv_path,
-                sep=";",
-                index=False,
-                mode="a",
-                header=header,
-                encoding="utf-8",
-            )
+        # Write the CSV file in one go
+        if dfs:
+            with open(csv_path, "w", encoding="utf-8", newline="") as f:
+                f.write(buffer.getvalue())
 
         print(f"Successfully converted '{pdf_path}' to '{csv_path}'.")
     except FileNotFoundError:
@@ -37,6 +213,7 @@ def convert_pdf_to_csv(pdf_path, csv_path):
 
 
 if __name__ == "__main__":
+    configure_logging()
     input_pdf_file = os.getenv("PDF_FILE")
     output_csv_file = os.getenv("CSV_FILE")
 
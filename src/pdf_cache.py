@@ -0,0 +1,120 @@
+import hashlib
+import json
+import os
+import pickle
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """Returns the SHA-256 hex digest of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _hash_pdf_object(digest, obj, seen):
+    """Feeds a PDF object into digest, with its stream data and resolved references."""
+    from pypdf.generic import DictionaryObject, IndirectObject
+
+    if isinstance(obj, IndirectObject):
+        reference = (obj.idnum, obj.generation)
+        if reference in seen:
+            digest.update(b"R")
+            return
+        seen.add(reference)
+        obj = obj.get_object()
+    if isinstance(obj, DictionaryObject):
+        digest.update(b"<<")
+        for name in sorted(obj):
+            if name != "/Parent":
+                digest.update(name.encode())
+                _hash_pdf_object(digest, obj.raw_get(name), seen)
+        digest.update(b">>")
+        if hasattr(obj, "get_data"):
+            digest.update(obj.get_data())
+    elif isinstance(obj, list):
+        digest.update(b"[")
+        for item in obj:
+            _hash_pdf_object(digest, item, seen)
+        digest.update(b"]")
+    else:
+        digest.update(repr(obj).encode())
+
+
+def page_digests(pdf_path):
+    """Returns one SHA-256 hex digest per page of a PDF, or None without pypdf.
+
+    A page digest covers the page's media box, its content stream and its
+    resolved resources (fonts, images and form XObjects), so a page only
+    gets a new digest when what is drawn on it changes.
+    """
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        return None
+    try:
+        digests = []
+        for page in PdfReader(pdf_path).pages:
+            digest = hashlib.sha256(repr(list(page.mediabox)).encode())
+            contents = page.get_contents()
+            if contents is not None:
+                digest.update(contents.get_data())
+            _hash_pdf_object(digest, page.get("/Resources"), set())
+            digests.append(digest.hexdigest())
+        return digests
+    except Exception:
+        return None
+
+
+class PdfTableCache:
+    """Content-addressed cache of extracted PDF tables, one pickle file per entry.
+
+    Keys combine a content digest (of the whole PDF or of one page) with
+    the extraction options, so changed options never return stale tables.
+    """
+
+    def __init__(self, directory, options=None):
+        self.directory = directory
+        self.options = json.dumps(options or {}, sort_keys=True, default=str)
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, content_digest, scope="file"):
+        """Returns the cache key of a file or page digest under the current options."""
+        return hashlib.sha256(f"{scope}:{content_digest}:{self.options}".encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    def get(self, key):
+        """Returns the cached list of tables, or None on a miss or unreadable entry."""
+        try:
+            with open(self._path(key), "rb") as f:
+                tables = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return tables
+
+    def put(self, key, tables):
+        """Stores a list of tables; the file is replaced atomically."""
+        path = self._path(key)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as f:
+            pickle.dump(list(tables), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, path)
+
+    def stats_summary(self):
+        """Returns a one-line summary of the cache hits and misses."""
+        return f"PDF table cache: {self.hits} hits, {self.misses} misses"
+
+
+def get_pdf_cache(options=None):
+    """Returns a PdfTableCache in PDF_CACHE_DIR, or None if the variable is unset."""
+    directory = os.getenv("PDF_CACHE_DIR")
+    if not directory:
+        return None
+    return PdfTableCache(directory, options)
@@ -0,0 +1,118 @@
+import os
+import string
+
+import pandas as pd
+
+# Address templates tried in order for every hotel row; fields refer to CSV columns.
+DEFAULT_ADDRESS_TEMPLATES = [
+    "{Betrieb}, {Straße}, {Stadt}, Germany",
+    "{Straße}, {Stadt}, Germany",
+    "{Betrieb}, {Stadt}, Germany",
+]
+
+
+def get_address_templates():
+    """Returns the address templates from ADDRESS_TEMPLATES ("|"-separated) or the defaults."""
+    templates = os.getenv("ADDRESS_TEMPLATES")
+    if not templates:
+        return list(DEFAULT_ADDRESS_TEMPLATES)
+    return [template.strip() for template in templates.split("|") if template.strip()]
+
+
+def _template_fields(template):
+    return [field for _, field, _, _ in string.Formatter().parse(template) if field]
+
+
+def build_query_plan(hotels_df, templates):
+    """Formats every template for every row.
+
+    Returns one list per row holding an address per template, or None where
+    the row lacks a field the template needs.
+    """
+    fields = {template: _template_fields(template) for template in templates}
+    plan = []
+    for row in hotels_df.to_dict("records"):
+        addresses = []
+        for template in templates:
+            if all(pd.notna(row.get(field)) for field in fields[template]):
+                addresses.append(template.format(**row))
+            else:
+                addresses.append(None)
+        plan.append(addresses)
+    return plan
+
+
+def execute_query_plan(plan, geocode_many, on_row_resolved=None, batch_size=None):
+    """Resolves every row with the first template whose address geocodes.
+
+    The plan is executed in one round per template. Each round collects the
+    next address of all still unresolved rows, drops addresses that were
+    already answered in an earlier round, and sends the rest as deduplicated
+    batches of up to `batch_size` addresses (all at once by default) to
+    `geocode_many`.
+
+    `on_row_resolved(row_index, coordinates, template_index, attempts)` is
+    called as soon as a row is final, i.e. it geocoded or has no templates
+    left, which allows progress to be checkpointed during a round.
+
+    Returns, per row, the coordinates (or None), the index of the winning
+    template (or None) and the list of addresses tried in order.
+    """
+    answers = {}
+    winners = [None] * len(plan)
+    attempts = [[] for _ in plan]
+    template_count = max((len(addresses) for addresses in plan), default=0)
+    last_template = [
+        max((i for i, address in enumerate(addresses) if address is not None), default=-1)
+        for addresses in plan
+    ]
+
+    def finish(row_index):
+        if on_row_resolved is not None:
+            coordinates = answers[attempts[row_index][-1]] if attempts[row_index] else None
+            on_row_resolved(row_index, coordinates, winners[row_index], attempts[row_index])
+
+    for row_index in range(len(plan)):
+        if last_template[row_index] < 0:
+            finish(row_index)
+
+    for template_index in range(template_count):
+        pending = [
+            row_index
+            for row_index, addresses in enumerate(plan)
+            if winners[row_index] is None and addresses[template_index] is not None
+        ]
+        batch = list(
+            dict.fromkeys(
+                plan[row_index][template_index]
+                for row_index in pending
+                if plan[row_index][template_index] not in answers
+            )
+        )
+        step = batch_size or max(1, len(batch))
+        position = 0
+        for start in range(0, max(1, len(batch)), step):
+            chunk = batch[start:start + step]
+            answers.update(zip(chunk, geocode_many(chunk) if chunk else []))
+
+            # Rows whose address has been answered are settled for this round
+            while position < len(pending):
+                row_index = pending[position]
+                address = plan[row_index][template_index]
+                if address not in answers:
+                    break
+                attempts[row_index].append(address)
+                if answers[address]:
+                    winners[row_index] = template_index
+                if answers[address] or last_template[row_index] == template_index:
+                    finish(row_index)
+                position += 1
+
+    return [
+        (
+            answers[attempts[row_index][-1]] if winners[row_index] is not None else None,
+            winners[row_index],
+            attempts[row_index],
+        )
+        for row_index in range(len(plan))
+    ]
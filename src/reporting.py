@@ -0,0 +1,145 @@
+import json
+import logging
+import os
+import sys
+import time
+
+# Format of the log lines with LOG_FORMAT=text (the default).
+TEXT_FORMAT = "%(asctime)s %(levelname)-7s %(name)s: %(message)s"
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats every log record as one JSON object per line."""
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class _StderrHandler(logging.StreamHandler):
+    """Writes to the current sys.stderr, even if it is replaced after setup."""
+
+    def __init__(self):
+        logging.Handler.__init__(self)
+
+    @property
+    def stream(self):
+        return sys.stderr
+
+
+def configure_logging(level=None, log_format=None, stream=None):
+    """Sends the log records of the `src` package to stderr.
+
+    `level` and `log_format` ("text" or "json") default to LOG_LEVEL
+    (INFO) and LOG_FORMAT (text). Calling it again replaces the handler.
+    """
+    level = (level or os.getenv("LOG_LEVEL") or "INFO").upper()
+    log_format = (log_format or os.getenv("LOG_FORMAT") or "text").lower()
+    handler = logging.StreamHandler(stream) if stream is not None else _StderrHandler()
+    handler.setFormatter(JsonFormatter() if log_format == "json" else logging.Formatter(TEXT_FORMAT))
+    handler.is_src_handler = True
+
+    logger = logging.getLogger("src")
+    for old_handler in [h for h in logger.handlers if getattr(h, "is_src_handler", False)]:
+        logger.removeHandler(old_handler)
+    logger.addHandler(handler)
+    logger.setLevel(level)
+    return logger
+
+
+class ProgressIndicator:
+    """A single, redrawn status line with rows/sec, ETA and cache hit rate.
+
+    The line is only drawn on an interactive stream (or with enabled=True)
+    and at most every `interval` seconds, so it costs nothing in job logs.
+    """
+
+    def __init__(self, total, label="Geocoding", stream=None, enabled=None, interval=0.2,
+                 clock=time.monotonic):
+        self.total = total
+        self.label = label
+        self.stream = stream or sys.stderr
+        if enabled is None:
+            enabled = self.stream.isatty() and not logging.getLogger("src").isEnabledFor(
+                logging.DEBUG
+            )
+        self.enabled = enabled
+        self.interval = interval
+        self.done = 0
+        self.cache_hits = 0
+        self.lookups = 0
+        self._clock = clock
+        self._started_at = clock()
+        self._drawn_at = None
+
+    def update(self, rows=1, cache_hits=None, lookups=None):
+        """Adds finished rows and, optionally, the cache hits out of all lookups so far."""
+        self.done += rows
+        if cache_hits is not None:
+            self.cache_hits = cache_hits
+        if lookups is not None:
+            self.lookups = lookups
+        now = self._clock()
+        if self.enabled and (
+            self._drawn_at is None or now - self._drawn_at >= self.interval or self.done >= self.total
+        ):
+            self._drawn_at = now
+            self.stream.write("\r" + self.status_line(now) + "\x1b[K")
+            self.stream.flush()
+
+    def status_line(self, now=None):
+        """Returns the status line, e.g. "Geocoding 500/1000 rows, 50 rows/s, ETA 0:10"."""
+        elapsed = (now if now is not None else self._clock()) - self._started_at
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        line = f"{self.label} {self.done}/{self.total} rows, {rate:.0f} rows/s"
+        if rate > 0 and self.done < self.total:
+            remaining = int((self.total - self.done) / rate)
+            line += f", ETA {remaining // 3600}:{remaining // 60 % 60:02d}:{remaining % 60:02d}"
+        if self.lookups:
+            line += f", cache {100 * self.cache_hits / self.lookups:.0f}% hits"
+        return line
+
+    def close(self):
+        """Ends the status line."""
+        if self.enabled and self._drawn_at is not None:
+            self.stream.write("\n")
+            self.stream.flush()
+
+
+def get_not_found_report_path(csv_w_coor_file):
+    """Returns NOT_FOUND_REPORT_FILE, or '<CSV_W_COOR_FILE>.not_found.txt' by default."""
+    path = os.getenv("NOT_FOUND_REPORT_FILE")
+    if path:
+        return path
+    return f"{csv_w_coor_file}.not_found.txt" if csv_w_coor_file else None
+
+
+class NotFoundReport:
+    """Writes the addresses that could not be geocoded to a file, one per line.
+
+    Without a path only the addresses are counted.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._file = open(path, "w", encoding="utf-8") if path else None
+
+    def add(self, address):
+        """Counts the address and appends it to the report file."""
+        self.count += 1
+        if self._file is not None:
+            self._file.write(f"{address}\n")
+
+    def close(self):
+        """Closes the report file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,501 @@
+import math
+import os
+
+import numpy as np
+
+from src.gpx_track_reader import Track, read_track
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Grid cell edge length of the segment index; about a dozen track segments
+# fall into one cell for typical hiking and cycling tracks.
+DEFAULT_CELL_SIZE_KM = 0.25
+
+# Points processed per vectorized batch, bounding the size of the candidate arrays.
+QUERY_CHUNK_SIZE = 20000
+
+# Upper bound for points x searched cells per vectorized grid lookup.
+MAX_CELL_LOOKUPS = 4_000_000
+
+# Search radius (in cells) of the grid search; points not settled within it
+# are searched in the bounding-box tree, which is faster for farther points.
+MAX_SEARCH_RADIUS_CELLS = 1
+
+# Child boxes per node of the bounding-box tree over consecutive segments.
+TREE_FANOUT = 16
+
+# Grid cells per corridor buffer in the index searched by RouteIndex.within.
+CORRIDOR_CELLS_PER_BUFFER = 4
+
+# Output columns added by add_route_columns.
+ROUTE_DISTANCE_COLUMN = "Route Distance km"
+ROUTE_KM_COLUMN = "Route km"
+
+# Decimals of the ROUTE_DISTANCE_COLUMN values; 2 rounds to 10 m.
+ROUTE_DISTANCE_DECIMALS = 2
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in km between arrays of coordinates in degrees."""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def _expand_ranges(starts, counts):
+    """Returns the concatenation of arange(start, start + count) for every pair."""
+    total = int(counts.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64)
+    offsets = np.repeat(np.cumsum(counts) - counts, counts)
+    return np.repeat(starts, counts) + (np.arange(total) - offsets)
+
+
+class RouteIndex:
+    """Spatial grid index over the segments of a route track.
+
+    Coordinates are projected onto a local equirectangular plane in km to
+    bin every segment into the grid cells its bounding box touches. Queries
+    only compare points against segments in nearby cells; reported distances
+    are great-circle distances to the nearest point on the route.
+    """
+
+    def __init__(self, latitudes, longitudes, segment_starts=None, cell_size_km=DEFAULT_CELL_SIZE_KM):
+        latitudes = np.asarray(latitudes, dtype=float)
+        longitudes = np.asarray(longitudes, dtype=float)
+        if len(latitudes) == 0:
+            raise ValueError("A route index needs at least one track point.")
+        self.cell_size_km = cell_size_km
+        self._lat0 = math.radians(float(np.mean(latitudes)))
+        self._lon0 = float(np.mean(longitudes))
+        self._latitudes = latitudes
+        self._longitudes = longitudes
+        self._track_segment_starts = segment_starts
+        x, y = self._project(latitudes, longitudes)
+
+        # Segments join consecutive points, but not across <trkseg> boundaries
+        starts = np.arange(len(latitudes) - 1)
+        if segment_starts is not None and len(segment_starts) > 1:
+            breaks = np.asarray(segment_starts[1:]) - 1
+            starts = np.setdiff1d(starts, breaks)
+        if len(starts) == 0:
+            starts = np.array([0])
+        ends = np.minimum(starts + 1, len(latitudes) - 1)
+        self._segment_starts = starts
+        self._segment_ends = ends
+        self._ax, self._ay = x[starts], y[starts]
+        self._dx, self._dy = x[ends] - self._ax, y[ends] - self._ay
+        self._length_sq = self._dx ** 2 + self._dy ** 2
+
+        # Along-route distance at the start of every segment
+        self._segment_km = haversine_km(
+            latitudes[starts], longitudes[starts], latitudes[ends], longitudes[ends]
+        )
+        self._start_km = np.concatenate(([0.0], np.cumsum(self._segment_km)[:-1]))
+        self.length_km = float(self._segment_km.sum())
+
+        self._build_grid()
+        self._build_tree()
+
+    @classmethod
+    def from_gpx(cls, path, cell_size_km=DEFAULT_CELL_SIZE_KM):
+        """Builds the index from the track of a GPX file."""
+        track = read_track(path, dedupe=True)
+        return cls(track.latitudes, track.longitudes, track.segment_starts, cell_size_km)
+
+    def _project(self, latitudes, longitudes):
+        x = EARTH_RADIUS_KM * np.radians(np.asarray(longitudes, dtype=float) - self._lon0) * math.cos(self._lat0)
+        y = EARTH_RADIUS_KM * np.radians(np.asarray(latitudes, dtype=float))
+        return x, y
+
+    def _cells(self, x, y, cell_size_km=None):
+        cell_size_km = cell_size_km or self.cell_size_km
+        return (
+            np.floor(x / cell_size_km).astype(np.int64),
+            np.floor(y / cell_size_km).astype(np.int64),
+        )
+
+    @staticmethod
+    def _cell_keys(cx, cy):
+        return (cx << 32) + cy
+
+    def _segment_cells(self, cell_size_km=None):
+        """Returns cell keys and segment ids for all cells of every segment's bounding box."""
+        bx = self._ax + self._dx
+        by = self._ay + self._dy
+        cx0, cy0 = self._cells(np.minimum(self._ax, bx), np.minimum(self._ay, by), cell_size_km)
+        cx1, cy1 = self._cells(np.maximum(self._ax, bx), np.maximum(self._ay, by), cell_size_km)
+        width = cx1 - cx0 + 1
+        counts = width * (cy1 - cy0 + 1)
+        segment_ids = np.repeat(np.arange(len(self._ax)), counts)
+        local = _expand_ranges(np.zeros(len(counts), dtype=np.int64), counts)
+        width = np.repeat(width, counts)
+        keys = self._cell_keys(
+            np.repeat(cx0, counts) + local % width, np.repeat(cy0, counts) + local // width
+        )
+        return keys, segment_ids
+
+    def _build_grid(self):
+        """Bins every segment into all cells of its bounding box (sorted by cell key)."""
+        keys, segment_ids = self._segment_cells()
+        order = np.argsort(keys, kind="stable")
+        self._grid_keys = keys[order]
+        self._grid_segments = segment_ids[order]
+        self._corridors = {}
+
+    def _build_tree(self):
+        """Builds a bounding-box tree over runs of consecutive segments.
+
+        Level 0 holds the box of every segment; each level above merges
+        TREE_FANOUT consecutive boxes of the level below, so node i of level
+        k covers the segments from i * TREE_FANOUT**k on.
+        """
+        bx = self._ax + self._dx
+        by = self._ay + self._dy
+        level = (
+            np.minimum(self._ax, bx),
+            np.minimum(self._ay, by),
+            np.maximum(self._ax, bx),
+            np.maximum(self._ay, by),
+        )
+        self._tree = [level]
+        while len(level[0]) > TREE_FANOUT:
+            starts = np.arange(0, len(level[0]), TREE_FANOUT)
+            x0, y0, x1, y1 = level
+            level = (
+                np.minimum.reduceat(x0, starts),
+                np.minimum.reduceat(y0, starts),
+                np.maximum.reduceat(x1, starts),
+                np.maximum.reduceat(y1, starts),
+            )
+            self._tree.append(level)
+
+    def _distances_sq(self, px, py, segments):
+        """Squared planar distances and segment parameters t of points to segments."""
+        dx = self._dx[segments]
+        dy = self._dy[segments]
+        length_sq = self._length_sq[segments]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            t = ((px - self._ax[segments]) * dx + (py - self._ay[segments]) * dy) / length_sq
+        t = np.clip(np.nan_to_num(t, nan=0.0), 0.0, 1.0)
+        ex = self._ax[segments] + t * dx - px
+        ey = self._ay[segments] + t * dy - py
+        return ex ** 2 + ey ** 2, t
+
+    def _nearest_in_radius(self, px, py, radius):
+        """Nearest segment among the cells within `radius` cells of every point.
+
+        Returns planar distances (inf where no segment was found), segment
+        indices and segment parameters.
+        """
+        step = max(1, MAX_CELL_LOOKUPS // (2 * radius + 1) ** 2)
+        if len(px) > step:
+            parts = [
+                self._nearest_in_radius(px[i:i + step], py[i:i + step], radius)
+                for i in range(0, len(px), step)
+            ]
+            return tuple(np.concatenate(arrays) for arrays in zip(*parts))
+        n = len(px)
+        cx, cy = self._cells(px, py)
+        offsets = np.arange(-radius, radius + 1)
+        ox, oy = np.meshgrid(offsets, offsets)
+        keys = self._cell_keys(cx[:, None] + ox.ravel(), cy[:, None] + oy.ravel())
+        lo = np.searchsorted(self._grid_keys, keys, side="left").ravel()
+        hi = np.searchsorted(self._grid_keys, keys, side="right").ravel()
+        counts = hi - lo
+        point_ids = np.repeat(np.repeat(np.arange(n), keys.shape[1]), counts)
+        segments = self._grid_segments[_expand_ranges(lo, counts)]
+
+        return self._nearest_candidate(px, py, point_ids, segments)
+
+    def _nearest_candidate(self, px, py, point_ids, segments):
+        """Nearest of the candidate segments of every point.
+
+        The candidates must be grouped by point. Returns planar distances
+        (inf for points without candidates), segment indices and segment
+        parameters.
+        """
+        n = len(px)
+        best_distance = np.full(n, np.inf)
+        best_segment = np.zeros(n, dtype=np.int64)
+        best_t = np.zeros(n)
+        if len(segments):
+            distance_sq, t = self._distances_sq(px[point_ids], py[point_ids], segments)
+            # Candidates are grouped by point, so the minima are segmented reductions
+            per_point = np.bincount(point_ids, minlength=n)
+            found = np.flatnonzero(per_point)
+            minima = np.minimum.reduceat(distance_sq, (np.cumsum(per_point) - per_point)[found])
+            ties = np.flatnonzero(distance_sq == np.repeat(minima, per_point[found]))
+            _, first = np.unique(point_ids[ties], return_index=True)
+            winners = ties[first]
+            best_distance[found] = np.sqrt(minima)
+            best_segment[found] = segments[winners]
+            best_t[found] = t[winners]
+        return best_distance, best_segment, best_t
+
+    def _nearest_in_tree(self, px, py, bound):
+        """Nearest segment by a branch-and-bound descent of the bounding-box tree.
+
+        Only boxes closer than the best known distance of a point are opened.
+        That bound starts at `bound` (planar km, may be inf) and shrinks with
+        the distance to the first vertex of every box on the way down, so a
+        point opens a few boxes per level instead of all segments. Points with
+        no segment within `bound` keep an infinite distance.
+        """
+        n = len(px)
+        # Slightly enlarged, so a bound taken from a segment never prunes that segment
+        bound_sq = (np.asarray(bound, dtype=float) * (1 + 1e-9) + 1e-9) ** 2
+        top = len(self._tree) - 1
+        top_count = len(self._tree[top][0])
+        points = np.repeat(np.arange(n), top_count)
+        nodes = np.tile(np.arange(top_count), n)
+        for level in range(top, -1, -1):
+            x0, y0, x1, y1 = self._tree[level]
+            qx, qy = px[points], py[points]
+            gap_x = np.maximum(np.maximum(x0[nodes] - qx, qx - x1[nodes]), 0.0)
+            gap_y = np.maximum(np.maximum(y0[nodes] - qy, qy - y1[nodes]), 0.0)
+            if level > 0:
+                first = nodes * TREE_FANOUT ** level
+                np.minimum.at(
+                    bound_sq, points, (self._ax[first] - qx) ** 2 + (self._ay[first] - qy) ** 2
+                )
+            keep = gap_x ** 2 + gap_y ** 2 <= bound_sq[points]
+            points, nodes = points[keep], nodes[keep]
+            if level > 0:
+                children = np.minimum(TREE_FANOUT, len(self._tree[level - 1][0]) - nodes * TREE_FANOUT)
+                points = np.repeat(points, children)
+                nodes = _expand_ranges(nodes * TREE_FANOUT, children)
+        return self._nearest_candidate(px, py, points, nodes)
+
+    def _nearest_brute_force(self, px, py):
+        """Nearest segment by comparing the points against every segment.
+
+        Only used as a reference in tests; it is O(points x segments).
+        """
+        best_distance = np.empty(len(px))
+        best_segment = np.empty(len(px), dtype=np.int64)
+        best_t = np.empty(len(px))
+        all_segments = np.arange(len(self._ax))
+        step = max(1, QUERY_CHUNK_SIZE * 100 // len(all_segments))
+        for start in range(0, len(px), step):
+            sl = slice(start, start + step)
+            distance_sq, t = self._distances_sq(px[sl, None], py[sl, None], all_segments[None, :])
+            winners = np.argmin(distance_sq, axis=1)
+            rows = np.arange(len(winners))
+            best_distance[sl] = np.sqrt(distance_sq[rows, winners])
+            best_segment[sl] = winners
+            best_t[sl] = t[rows, winners]
+        return best_distance, best_segment, best_t
+
+    def _nearest_planar(self, px, py, max_distance_km=None):
+        """Finds the nearest segment for every point.
+
+        The grid search grows up to MAX_SEARCH_RADIUS_CELLS cells; points not
+        settled by then are searched in the bounding-box tree. With
+        max_distance_km, the search stops there and farther points keep an
+        infinite distance.
+        """
+        n = len(px)
+        distance = np.full(n, np.inf)
+        segment = np.zeros(n, dtype=np.int64)
+        t = np.zeros(n)
+        max_radius = MAX_SEARCH_RADIUS_CELLS
+        if max_distance_km is not None:
+            max_radius = min(max_radius, max(1, math.ceil(max_distance_km / self.cell_size_km)))
+        pending = np.arange(n)
+        radius = 1
+        while len(pending):
+            radius = min(radius, max_radius)
+            d, s, tt = self._nearest_in_radius(px[pending], py[pending], radius)
+            # A result is exact once no unsearched cell can hold a closer segment
+            settled = d <= radius * self.cell_size_km
+            distance[pending[settled]] = d[settled]
+            segment[pending[settled]] = s[settled]
+            t[pending[settled]] = tt[settled]
+            pending = pending[~settled]
+            if radius >= max_radius:
+                break
+            radius *= 2
+        if len(pending) and (max_distance_km is None or radius * self.cell_size_km < max_distance_km):
+            # The best segment found so far bounds the tree search
+            bound = d[~settled]
+            if max_distance_km is not None:
+                bound = np.minimum(bound, max_distance_km)
+            d, s, tt = self._nearest_in_tree(px[pending], py[pending], bound)
+            distance[pending], segment[pending], t[pending] = d, s, tt
+        return distance, segment, t
+
+    def _route_positions(self, latitudes, longitudes, segment, t):
+        """Great-circle distance to the foot point and along-route km."""
+        starts = self._segment_starts[segment]
+        ends = self._segment_ends[segment]
+        foot_lat = self._latitudes[starts] + t * (self._latitudes[ends] - self._latitudes[starts])
+        foot_lon = self._longitudes[starts] + t * (self._longitudes[ends] - self._longitudes[starts])
+        distance_km = haversine_km(latitudes, longitudes, foot_lat, foot_lon)
+        route_km = self._start_km[segment] + t * self._segment_km[segment]
+        return distance_km, route_km
+
+    def nearest(self, latitudes, longitudes):
+        """Returns distance to the route and along-route km for every point.
+
+        Both are NumPy arrays in km; points with missing coordinates get NaN.
+        """
+        latitudes = np.asarray(latitudes, dtype=float)
+        longitudes = np.asarray(longitudes, dtype=float)
+        distance_km = np.full(len(latitudes), np.nan)
+        route_km = np.full(len(latitudes), np.nan)
+        valid = np.flatnonzero(~(np.isnan(latitudes) | np.isnan(longitudes)))
+        for start in range(0, len(valid), QUERY_CHUNK_SIZE):
+            rows = valid[start:start + QUERY_CHUNK_SIZE]
+            px, py = self._project(latitudes[rows], longitudes[rows])
+            _, segment, t = self._nearest_planar(px, py)
+            distance_km[rows], route_km[rows] = self._route_positions(
+                latitudes[rows], longitudes[rows], segment, t
+            )
+        return distance_km, route_km
+
+    def _corridor_reach(self, buffer_km):
+        """Planar search distance that covers a great-circle buffer.
+
+        Planar distances exceed great-circle distances by up to the ratio of
+        the cosines of the reference latitude and the latitude farthest from
+        the equator, so the buffer is enlarged by that factor.
+        """
+        max_latitude = np.abs(self._latitudes).max() + np.degrees(buffer_km / EARTH_RADIUS_KM)
+        scale = math.cos(self._lat0) / math.cos(math.radians(min(max_latitude, 89.0)))
+        return buffer_km * max(1.0, scale)
+
+    def _corridor(self, buffer_km):
+        """Returns the planar reach, cell size and corridor cell keys of a buffer.
+
+        The corridor cells are all cells within reach of a segment, on a grid
+        of a quarter of the (enlarged) buffer, but no finer than the index.
+        They are built once per buffer.
+        """
+        if buffer_km not in self._corridors:
+            reach_km = self._corridor_reach(buffer_km)
+            cell_size_km = max(reach_km / CORRIDOR_CELLS_PER_BUFFER, self.cell_size_km)
+            reach = math.ceil(reach_km / cell_size_km)
+            offsets = np.arange(-reach, reach + 1)
+            ox, oy = np.meshgrid(offsets, offsets)
+            occupied = np.unique(self._segment_cells(cell_size_km)[0])
+            keys = np.unique(occupied[:, None] + self._cell_keys(ox.ravel(), oy.ravel()))
+            self._corridors[buffer_km] = (reach_km, cell_size_km, keys)
+        return self._corridors[buffer_km]
+
+    def within(self, latitudes, longitudes, buffer_km):
+        """Returns which points lie within buffer_km of the route and their distances.
+
+        Points are first matched against the cells of the corridor, which are
+        precomputed once per buffer. Only points in those cells are searched
+        exactly, and that search never looks beyond the buffer, so its cost
+        barely grows with wide buffers. Distances are NaN for points outside
+        the corridor and for missing coordinates.
+        """
+        latitudes = np.asarray(latitudes, dtype=float)
+        longitudes = np.asarray(longitudes, dtype=float)
+        inside = np.zeros(len(latitudes), dtype=bool)
+        distance_km = np.full(len(latitudes), np.nan)
+        reach_km, cell_size_km, corridor_keys = self._corridor(buffer_km)
+
+        valid = np.flatnonzero(~(np.isnan(latitudes) | np.isnan(longitudes)))
+        px, py = self._project(latitudes[valid], longitudes[valid])
+        in_cells = np.isin(self._cell_keys(*self._cells(px, py, cell_size_km)), corridor_keys)
+        candidates, px, py = valid[in_cells], px[in_cells], py[in_cells]
+
+        for start in range(0, len(candidates), QUERY_CHUNK_SIZE):
+            sl = slice(start, start + QUERY_CHUNK_SIZE)
+            planar, segment, t = self._nearest_planar(px[sl], py[sl], max_distance_km=reach_km)
+            near = planar <= reach_km
+            rows = candidates[sl][near]
+            distance, _ = self._route_positions(
+                latitudes[rows], longitudes[rows], segment[near], t[near]
+            )
+            accepted = distance <= buffer_km
+            inside[rows[accepted]] = True
+            distance_km[rows[accepted]] = distance[accepted]
+        return inside, distance_km
+
+
+def track_km(track):
+    """Along-route km of every track point, not counting gaps between <trkseg> elements."""
+    steps = haversine_km(
+        track.latitudes[:-1], track.longitudes[:-1], track.latitudes[1:], track.longitudes[1:]
+    )
+    breaks = track.segment_starts[1:] - 1
+    steps[breaks[(breaks >= 0) & (breaks < len(steps))]] = 0.0
+    return np.concatenate(([0.0], np.cumsum(steps)))
+
+
+def slice_track(track, start_km, end_km, name=None):
+    """Returns the part of a track between two along-route km positions.
+
+    The slice starts at the last point at or before `start_km` and ends at
+    the first point at or after `end_km`, so it covers the whole range.
+    """
+    km = track_km(track)
+    first = max(int(np.searchsorted(km, start_km, side="right")) - 1, 0)
+    last = min(int(np.searchsorted(km, end_km, side="left")), len(km) - 1)
+    starts = track.segment_starts
+    segment_starts = np.concatenate(([first], starts[(starts > first) & (starts <= last)]))
+    return Track(
+        track.name if name is None else name,
+        track.latitudes[first:last + 1],
+        track.longitudes[first:last + 1],
+        track.elevations[first:last + 1],
+        (segment_starts - first).astype(np.intp),
+    )
+
+
+def add_route_columns(hotels_df, route_index):
+    """Adds the distance to the route and the along-route km of every hotel."""
+    distance_km, route_km = route_index.nearest(
+        hotels_df["Latitude"].to_numpy(dtype=float),
+        hotels_df["Longitude"].to_numpy(dtype=float),
+    )
+    hotels_df[ROUTE_DISTANCE_COLUMN] = np.round(distance_km, ROUTE_DISTANCE_DECIMALS)
+    hotels_df[ROUTE_KM_COLUMN] = np.round(route_km, 1)
+    return hotels_df
+
+
+def load_route_index_from_env():
+    """Builds the route index for ROUTE_GPX_FILE, or returns None if unset."""
+    path = os.getenv("ROUTE_GPX_FILE")
+    if not path:
+        return None
+    return RouteIndex.from_gpx(path)
+
+
+def filter_corridor(hotels_df, route_index, buffer_km):
+    """Keeps the hotels within buffer_km of the route.
+
+    If `add_route_columns` has run, its rounded distances decide every
+    hotel that is clearly inside or outside; only hotels whose rounded
+    distance is within the rounding of the buffer edge are searched again.
+    Returns the kept rows and the number of dropped rows per reason.
+    """
+    latitudes = hotels_df["Latitude"].to_numpy(dtype=float)
+    longitudes = hotels_df["Longitude"].to_numpy(dtype=float)
+    has_coordinates = ~(np.isnan(latitudes) | np.isnan(longitudes))
+    if ROUTE_DISTANCE_COLUMN in hotels_df:
+        rounded = hotels_df[ROUTE_DISTANCE_COLUMN].to_numpy(dtype=float)
+        half_step = 0.5 * 10.0 ** -ROUTE_DISTANCE_DECIMALS
+        inside = (rounded < buffer_km - half_step) & has_coordinates
+        edge = np.flatnonzero(np.abs(rounded - buffer_km) <= half_step)
+        inside[edge], _ = route_index.within(latitudes[edge], longitudes[edge], buffer_km)
+    else:
+        inside, _ = route_index.within(latitudes, longitudes, buffer_km)
+    dropped = {
+        f"more than {buffer_km:g} km from the route": int((has_coordinates & ~inside).sum()),
+        "no coordinates": int((~has_coordinates).sum()),
+    }
+    return hotels_df[inside], dropped
+
+
+def get_corridor_buffer_km():
+    """Returns the corridor buffer from CORRIDOR_BUFFER_KM, or None if unset."""
+    buffer_km = os.getenv("CORRIDOR_BUFFER_KM")
+    return float(buffer_km) if buffer_km else None
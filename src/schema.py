@@ -0,0 +1,175 @@
+# uv run python -m src.schema data/AlpCrossHotels.csv data/hotels_clean.csv --sep ,
+
+import argparse
+import logging
+import re
+
+import pandas as pd
+
+# Column that identifies the header row of a hotel table.
+HEADER_MARKER = "Betrieb"
+
+# Types of the non-text hotel columns; every other column is read as text.
+# "Etappe" stays text, since a hotel between two stages has e.g. "4 u. 5".
+HOTEL_DTYPES = {
+    "Latitude": "float64",
+    "Longitude": "float64",
+    "Route Distance km": "float64",
+    "Route km": "float64",
+}
+
+# Header cells that merge two columns, and the names of the two columns.
+MERGED_COLUMNS = [
+    (re.compile(r"^Entfernung\b.*Hm$"), ("Entfernung", "Hm")),
+]
+
+# Splits a merged "Entfernung" cell such as "5,2 km 53 Hm" into its two values.
+DISTANCE_CLIMB = r"^(?P<first>.*?km)\s*(?P<second>-?\d+\s*Hm)$"
+
+# Named explicitly, since __name__ is "__main__" under `python -m src.schema`
+logger = logging.getLogger("src.schema")
+
+
+def _clean_cell(value):
+    """Collapses whitespace in a header cell; missing cells become ""."""
+    return re.sub(r"\s+", " ", value).strip() if isinstance(value, str) else ""
+
+
+def _header_names(cells):
+    """Column names for a header row, with merged header cells split.
+
+    The empty header cell right after a merged one becomes the second
+    column. Returns the names and the (first, second) pairs of all merged
+    columns found.
+    """
+    names = []
+    merged = []
+    for position, cell in enumerate(cells):
+        if merged and cell == "" and merged[-1][1] not in names and names[-1] == merged[-1][0]:
+            names.append(merged[-1][1])
+            continue
+        for pattern, columns in MERGED_COLUMNS:
+            if pattern.match(cell):
+                names.append(columns[0])
+                merged.append(columns)
+                break
+        else:
+            names.append(cell or f"Unnamed: {position}")
+    return names, merged
+
+
+def find_header_row(raw):
+    """Index of the first row of a raw table that holds the HEADER_MARKER column, or None."""
+    for index, row in enumerate(raw.itertuples(index=False)):
+        if HEADER_MARKER in (_clean_cell(value) for value in row):
+            return index
+    return None
+
+
+def normalize_hotel_table(raw):
+    """Repairs an extracted hotel table and casts it to the hotel schema.
+
+    `raw` holds the table as read from the CSV or PDF, without a header and
+    with every cell as text. Rows before the first header row (titles, empty
+    rows) and repeated page headers are dropped. A merged header cell like
+    "Entfernung zum Weg länger als 500m km Hm" becomes the `Entfernung` and
+    `Hm` columns, also splitting values that tabula merged into one cell.
+    Empty unnamed columns are removed and rows without a `Betrieb` (legends,
+    footers) are dropped with a warning. Finally the typed columns are cast
+    once with `HOTEL_DTYPES`.
+    """
+    header_index = find_header_row(raw) or 0
+    header = [_clean_cell(value) for value in raw.iloc[header_index]] if len(raw) else []
+    names, merged = _header_names(header)
+
+    table = raw.iloc[header_index + 1:].copy()
+    table.columns = names
+    # Repeated page headers and completely empty rows carry no data
+    cleaned = table.apply(lambda column: column.map(_clean_cell))
+    repeated = (cleaned == header).all(axis=1)
+    table = table[~repeated].dropna(how="all")
+
+    for first, second in merged:
+        if second not in table:
+            table.insert(table.columns.get_loc(first) + 1, second, pd.Series(dtype=object))
+        parts = table[first].str.extract(DISTANCE_CLIMB)
+        split = parts["first"].notna() & table[second].isna()
+        table[second] = table[second].where(~split, parts["second"])
+        table[first] = table[first].where(~split, parts["first"])
+
+    unnamed = [
+        column for column in table.columns
+        if column.startswith("Unnamed: ") and table[column].isna().all()
+    ]
+    table = table.drop(columns=unnamed)
+
+    if HEADER_MARKER in table:
+        named = table[HEADER_MARKER].map(_clean_cell) != ""
+        if not named.all():
+            logger.warning(
+                "Dropped %d rows without a %s (legends, footers).", (~named).sum(), HEADER_MARKER
+            )
+        table = table[named]
+
+    typed = {column: dtype for column, dtype in HOTEL_DTYPES.items() if column in table}
+    table = table.assign(**{column: pd.to_numeric(table[column]) for column in typed})
+    return table.reset_index(drop=True).astype(typed)
+
+
+def hotel_dtypes(columns):
+    """Returns the explicit dtype of every column: HOTEL_DTYPES or text."""
+    return {column: HOTEL_DTYPES.get(column, str) for column in columns}
+
+
+def read_hotel_csv(path, sep=";", **kwargs):
+    """Reads a clean hotel CSV with the dtypes of `hotel_dtypes` instead of inferring them.
+
+    So "Hm" stays "50" next to missing values instead of becoming 50.0, and
+    every chunk of a chunked read gets the same dtypes.
+    """
+    columns = pd.read_csv(path, sep=sep, nrows=0).columns
+    return pd.read_csv(path, sep=sep, dtype=hotel_dtypes(columns), **kwargs)
+
+
+def tables_to_raw(tables):
+    """Stacks tables from tabula, including their header rows, into one raw text table."""
+    rows = []
+    for table in tables:
+        rows.append([
+            None if str(column).startswith("Unnamed: ") else str(column)
+            for column in table.columns
+        ])
+        rows.extend(
+            [None if pd.isna(value) else str(value) for value in row]
+            for row in table.itertuples(index=False)
+        )
+    return pd.DataFrame(rows, dtype=object)
+
+
+def read_raw_table(path, sep=";"):
+    """Reads a CSV without header detection or type inference, every cell as text."""
+    with open(path, encoding="utf-8") as f:
+        width = max((len(line.split(sep)) for line in f), default=0)
+    return pd.read_csv(
+        path, sep=sep, header=None, dtype=str, names=range(width), skip_blank_lines=False
+    )
+
+
+def normalize_hotels_csv(input_path, output_path, sep=";"):
+    """Normalizes a hotel CSV, e.g. straight from tabula, into a clean `;`-separated CSV.
+
+    Returns the number of hotel rows written.
+    """
+    hotels = normalize_hotel_table(read_raw_table(input_path, sep))
+    hotels.to_csv(output_path, sep=";", index=False, encoding="utf-8")
+    return len(hotels)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Normalize an extracted hotel table.")
+    parser.add_argument("input", help="CSV file as extracted from the PDF")
+    parser.add_argument("output", help="normalized CSV file (semicolon-separated)")
+    parser.add_argument("--sep", default=";", help="separator of the input file")
+    args = parser.parse_args()
+    count = normalize_hotels_csv(args.input, args.output, args.sep)
+    print(f"Wrote {count} hotels to '{args.output}'.")
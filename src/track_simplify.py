@@ -0,0 +1,196 @@
+# uv run python -m src.track_simplify data/alb-crossing-gesamtroute.gpx data/route-simplified.gpx --max-points 3000
+
+import argparse
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.gpx_track_reader import Track, read_track
+from src.route_index import EARTH_RADIUS_KM, _expand_ranges
+
+EARTH_RADIUS_M = EARTH_RADIUS_KM * 1000
+
+
+def _project_m(latitudes, longitudes):
+    """Projects coordinates onto a local equirectangular plane in metres."""
+    lat0 = math.radians(float(np.mean(latitudes)))
+    lon0 = float(np.mean(longitudes))
+    x = EARTH_RADIUS_M * np.radians(longitudes - lon0) * math.cos(lat0)
+    y = EARTH_RADIUS_M * np.radians(latitudes)
+    return x, y
+
+
+def _segment_distances(px, py, ax, ay, bx, by):
+    """Distances from points to the segments from (ax, ay) to (bx, by)."""
+    dx = bx - ax
+    dy = by - ay
+    length_sq = dx ** 2 + dy ** 2
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t = ((px - ax) * dx + (py - ay) * dy) / length_sq
+    t = np.clip(np.nan_to_num(t, nan=0.0), 0.0, 1.0)
+    return np.hypot(ax + t * dx - px, ay + t * dy - py)
+
+
+def _segment_ends(track):
+    """Index of the last point of every <trkseg>."""
+    starts = track.segment_starts
+    return np.append(starts[1:], len(track.latitudes)) - 1
+
+
+def douglas_peucker_ranks(track, tolerance_m=0.0):
+    """Ranks every track point by the Douglas-Peucker tolerance that removes it.
+
+    All open ranges are split at their farthest point in one vectorized pass
+    per tree level. A point's rank is its distance to the chord of its range
+    when it was chosen, capped by the rank of the point that split the parent
+    range, so points with a rank above a tolerance are exactly the points
+    kept by Douglas-Peucker with that tolerance. Ranges whose farthest point
+    is within `tolerance_m` are not split further. Segment end points rank
+    infinite. Returns the ranks (metres) and the tree level of every point.
+    """
+    x, y = _project_m(track.latitudes, track.longitudes)
+    ranks = np.zeros(len(x))
+    levels = np.zeros(len(x), dtype=np.int64)
+    starts = track.segment_starts
+    ends = _segment_ends(track)
+    ranks[starts] = np.inf
+    ranks[ends] = np.inf
+
+    lo, hi = starts, ends
+    cap = np.full(len(lo), np.inf)
+    level = 0
+    while True:
+        open_ranges = hi - lo >= 2
+        lo, hi, cap = lo[open_ranges], hi[open_ranges], cap[open_ranges]
+        if len(lo) == 0:
+            break
+        level += 1
+        counts = hi - lo - 1
+        points = _expand_ranges(lo + 1, counts)
+        range_ids = np.repeat(np.arange(len(lo)), counts)
+        distances = _segment_distances(
+            x[points], y[points],
+            x[lo][range_ids], y[lo][range_ids], x[hi][range_ids], y[hi][range_ids],
+        )
+        maxima = np.maximum.reduceat(distances, np.cumsum(counts) - counts)
+        ties = np.flatnonzero(distances == np.repeat(maxima, counts))
+        _, first = np.unique(range_ids[ties], return_index=True)
+        split = points[ties[first]]
+
+        ranks[split] = np.minimum(maxima, cap)
+        levels[split] = level
+        # Ranges within the tolerance keep none of their interior points
+        keep = maxima > tolerance_m
+        lo, hi, cap, split = lo[keep], hi[keep], ranks[split][keep], split[keep]
+        lo, hi, cap = (
+            np.concatenate((lo, split)),
+            np.concatenate((split, hi)),
+            np.concatenate((cap, cap)),
+        )
+    return ranks, levels
+
+
+def max_deviation_m(track, kept):
+    """Largest distance in metres of a track point from the simplified track.
+
+    `kept` holds the sorted indices of the points kept from `track`, which
+    include the first and last point of every segment.
+    """
+    if len(kept) < 2:
+        return 0.0
+    x, y = _project_m(track.latitudes, track.longitudes)
+    chord = np.searchsorted(kept, np.arange(len(x)), side="right") - 1
+    chord = np.minimum(chord, len(kept) - 2)
+    a = kept[chord]
+    b = kept[chord + 1]
+    return float(_segment_distances(x, y, x[a], y[a], x[b], y[b]).max())
+
+
+def simplify_track(track, tolerance_m=None, max_points=None):
+    """Simplifies a track with Douglas-Peucker to a tolerance and/or point budget.
+
+    With `tolerance_m`, points within that many metres of the simplified track
+    are removed. With `max_points`, the points removed last by increasing
+    tolerances are kept until the budget is reached; the first and last point
+    of every segment are always kept. Returns the simplified track and the
+    maximum deviation in metres it introduces.
+    """
+    if len(track.latitudes) == 0:
+        return track, 0.0
+    if tolerance_m is None and max_points is None:
+        raise ValueError("simplify_track needs a tolerance_m or max_points.")
+
+    ranks, levels = douglas_peucker_ranks(track, tolerance_m or 0.0)
+    keep = ranks > (tolerance_m or 0.0)
+    keep[np.isinf(ranks)] = True
+    if max_points is not None and keep.sum() > max_points:
+        # Parents rank at least as high as their children; ties go to the parent
+        order = np.lexsort((levels, -ranks))
+        keep[:] = False
+        keep[order[:max_points]] = True
+        keep[np.isinf(ranks)] = True
+
+    kept = np.flatnonzero(keep)
+    kept_before = np.concatenate(([0], np.cumsum(keep)))
+    simplified = Track(
+        track.name,
+        track.latitudes[kept],
+        track.longitudes[kept],
+        track.elevations[kept],
+        kept_before[track.segment_starts].astype(np.intp),
+    )
+    return simplified, max_deviation_m(track, kept)
+
+
+def get_track_limits():
+    """Returns (tolerance_m, max_points) from GPX_TRACK_TOLERANCE_M and GPX_TRACK_MAX_POINTS.
+
+    Returns None if neither is set, i.e. no track is written to the GPX output.
+    """
+    tolerance_m = os.getenv("GPX_TRACK_TOLERANCE_M")
+    max_points = os.getenv("GPX_TRACK_MAX_POINTS")
+    if not (tolerance_m or max_points):
+        return None
+    return (
+        float(tolerance_m) if tolerance_m else None,
+        int(max_points) if max_points else None,
+    )
+
+
+def load_simplified_track_from_env():
+    """Reads and simplifies the ROUTE_GPX_FILE track for the GPX output.
+
+    The track is simplified to the limits from `get_track_limits`. Returns
+    None if ROUTE_GPX_FILE or both limits are unset, otherwise the simplified
+    track, the original number of points and the maximum deviation in metres.
+    """
+    path = os.getenv("ROUTE_GPX_FILE")
+    limits = get_track_limits()
+    if not path or limits is None:
+        return None
+    track = read_track(path, dedupe=True)
+    simplified, deviation_m = simplify_track(track, *limits)
+    return simplified, len(track.latitudes), deviation_m
+
+
+if __name__ == "__main__":
+    from src.gpx_generator import create_gpx_file
+
+    parser = argparse.ArgumentParser(description="Simplify the track of a GPX file.")
+    parser.add_argument("input", help="GPX file with the track")
+    parser.add_argument("output", help="GPX file to write the simplified track to")
+    parser.add_argument("--max-points", type=int, help="maximum number of track points")
+    parser.add_argument("--tolerance", type=float, help="tolerance in metres")
+    args = parser.parse_args()
+    if args.max_points is None and args.tolerance is None:
+        parser.error("give --max-points and/or --tolerance")
+
+    track = read_track(args.input, dedupe=True)
+    simplified, deviation_m = simplify_track(track, args.tolerance, args.max_points)
+    create_gpx_file(pd.DataFrame(), args.output, track=simplified)
+    print(
+        f"Simplified '{track.name}' from {len(track.latitudes)} to"
+        f" {len(simplified.latitudes)} points (max deviation {deviation_m:.1f} m)."
+    )
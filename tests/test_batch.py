@@ -0,0 +1,76 @@
+"""Tests for the batch mode module.
+
+This module contains unit tests for `find_input_files` and `run_batch`
+defined in `src.batch`, covering address deduplication across input files
+and the per-input CSV and GPX outputs.
+"""
+
+import logging
+import os
+import pytest
+import pandas as pd
+import gpxpy
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch, MagicMock
+from src.batch import find_input_files, run_batch
+from src.geocoding import GeocoderSession
+
+
+def write_hotels(path, names, cities):
+    """Writes a hotel CSV as read by `load_hotels_from_csv`."""
+    pd.DataFrame({"Etappe": [1] * len(names), "Stadt": cities, "Betrieb": names}).to_csv(
+        path, sep=";", index=False
+    )
+
+
+def test_find_input_files(tmp_path):
+    """Tests that a directory means all its CSV files, in sorted order."""
+    # Arrange: Two CSV files and another file.
+    for name in ("b.csv", "a.csv", "notes.txt"):
+        (tmp_path / name).write_text("")
+
+    # Act & Assert: A directory and a glob pattern.
+    assert find_input_files(str(tmp_path)) == [str(tmp_path / "a.csv"), str(tmp_path / "b.csv")]
+    assert find_input_files(str(tmp_path / "b*.csv")) == [str(tmp_path / "b.csv")]
+
+
+@patch('src.batch.ProcessPoolExecutor', ThreadPoolExecutor)
+def test_run_batch_geocodes_shared_hotels_once(tmp_path, caplog):
+    """Tests that hotels shared by several tours are geocoded once.
+
+    Every tour still gets its own geocoded CSV and GPX file. The process
+    pool is replaced by a thread pool to keep the test fast.
+    """
+    # Arrange: Two tours sharing Hotel B, and a backend that cannot find Hotel D.
+    tours = tmp_path / "tours"
+    tours.mkdir()
+    write_hotels(tours / "north.csv", ["Hotel A", "Hotel B"], ["Aalen", "Bopfingen"])
+    write_hotels(tours / "south.csv", ["Hotel B", "Hotel C", "Hotel D"], ["Bopfingen", "Ulm", "Ulm"])
+    backend = MagicMock()
+    backend.geocode.side_effect = lambda address: None if "Hotel D" in address else (48.0, 9.0)
+    env = {"ADDRESS_TEMPLATES": "{Betrieb}, {Stadt}"}
+
+    caplog.set_level(logging.INFO, logger="src")
+
+    # Act: Run the batch over the directory.
+    with patch.dict(os.environ, env):
+        results = run_batch(str(tours), str(tmp_path / "out"), GeocoderSession(backend), workers=2)
+
+    # Assert: Verify the requests, the outputs and the summary.
+    assert sorted(call.args[0] for call in backend.geocode.call_args_list) == [
+        "Hotel A, Aalen", "Hotel B, Bopfingen", "Hotel C, Ulm", "Hotel D, Ulm",
+    ]
+    assert [(os.path.basename(gpx_file), written) for _, gpx_file, written in results] == [
+        ("north.gpx", 2), ("south.gpx", 2),
+    ]
+    south = pd.read_csv(tmp_path / "out" / "southwithcoor.csv", sep=";")
+    assert south["Latitude"].isna().tolist() == [False, False, True]
+    with open(tmp_path / "out" / "north.gpx") as f:
+        assert [w.name for w in gpxpy.parse(f).waypoints] == ["Hotel A", "Hotel B"]
+    assert "Geocoded 5 hotels from 2 files with 4 distinct address requests." in caplog.text
+
+
+def test_run_batch_without_inputs(tmp_path):
+    """Tests that a pattern without CSV files is an error."""
+    with pytest.raises(FileNotFoundError):
+        run_batch(str(tmp_path / "*.csv"), str(tmp_path / "out"), MagicMock())
@@ -0,0 +1,89 @@
+"""Tests for the checkpoint journal.
+
+This module contains unit tests for `CheckpointJournal`, `load_journal` and
+`get_journal_path` defined in `src.checkpoint`.
+"""
+
+import pytest
+import os
+from unittest.mock import patch
+from src.checkpoint import CheckpointJournal, get_journal_path, load_journal
+
+
+def test_journal_flushes_every_n_rows(tmp_path):
+    """Tests that records reach the disk in groups of flush_every rows."""
+    # Arrange: A journal flushing every two rows.
+    path = tmp_path / "journal.jsonl"
+    journal = CheckpointJournal(str(path), flush_every=2)
+
+    # Act: Record three rows without closing the journal.
+    journal.record("a", (1.0, 2.0), "{Stadt}", "City A")
+    journal.record("b", None, None, "Nowhere")
+    journal.record("c", (3.0, 4.0), "{Stadt}", "City C")
+
+    # Assert: Verify only the first two rows are on disk so far.
+    assert load_journal(str(path)) == {
+        "a": (1.0, 2.0, "{Stadt}", "City A"),
+        "b": (None, None, None, "Nowhere"),
+    }
+    journal.close()
+    assert len(load_journal(str(path))) == 3
+
+
+def test_journal_resume_appends_and_remove(tmp_path):
+    """Tests that a resumed journal appends to the existing records and can be removed."""
+    # Arrange: A journal from an interrupted run.
+    path = str(tmp_path / "journal.jsonl")
+    first = CheckpointJournal(path)
+    first.record("a", (1.0, 2.0), None, "A")
+    first.close()
+
+    # Act: Reopen it for resuming and record another row.
+    resumed = CheckpointJournal(path, resume=True)
+    resumed.record("b", (3.0, 4.0), None, "B")
+    resumed.close()
+
+    # Assert: Verify both rows are present, then remove the journal.
+    assert set(load_journal(path)) == {"a", "b"}
+    CheckpointJournal(path, resume=True).remove()
+    assert not os.path.exists(path)
+
+
+def test_load_journal_ignores_truncated_line(tmp_path):
+    """Tests that a partially written last line from a crash is skipped."""
+    path = tmp_path / "journal.jsonl"
+    path.write_text(
+        '{"key": "a", "latitude": 1.0, "longitude": 2.0, "template": null, "address": "A"}\n'
+        '{"key": "b", "latit',
+        encoding="utf-8",
+    )
+    assert load_journal(str(path)) == {"a": (1.0, 2.0, None, "A")}
+
+
+def test_journal_resume_drops_truncated_line(tmp_path):
+    """Tests that resuming after a crash mid-write does not glue new records onto the cut line."""
+    # Arrange: A journal whose last line was cut off.
+    path = tmp_path / "journal.jsonl"
+    path.write_text(
+        '{"key": "a", "latitude": 1.0, "longitude": 2.0, "template": null, "address": "A"}\n'
+        '{"key": "b", "latit',
+        encoding="utf-8",
+    )
+
+    # Act: Resume the journal and record another row.
+    resumed = CheckpointJournal(str(path), resume=True)
+    resumed.record("c", (3.0, 4.0), None, "C")
+    resumed.close()
+
+    # Assert: The new row is readable and the cut line is gone.
+    assert load_journal(str(path)) == {"a": (1.0, 2.0, None, "A"), "c": (3.0, 4.0, None, "C")}
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 2
+
+
+def test_get_journal_path():
+    """Tests the default journal path next to CSV_W_COOR_FILE and its override."""
+    with patch.dict(os.environ, {"GEOCODE_JOURNAL_FILE": ""}):
+        assert get_journal_path("data/out.csv") == "data/out.csv.journal"
+        assert get_journal_path(None) is None
+    with patch.dict(os.environ, {"GEOCODE_JOURNAL_FILE": "run.journal"}):
+        assert get_journal_path("data/out.csv") == "run.journal"
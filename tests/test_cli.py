@@ -0,0 +1,141 @@
+"""Tests for the pipeline command line module.
+
+This module contains unit tests for `Pipeline` and `main` defined in
+`src.cli`, covering an in-memory run from the PDF to the GPX file,
+persisted intermediates, incremental mode, starting at a later stage and
+invalid stage ranges.
+"""
+
+import json
+import os
+import pytest
+import pandas as pd
+import gpxpy
+from unittest.mock import patch, MagicMock
+from src.cli import Pipeline, main
+from src.geocoding import GeocoderSession
+
+
+@pytest.fixture
+def pipeline_env(tmp_path):
+    """Environment with all pipeline files in tmp_path and optional features off."""
+    pdf_file = tmp_path / "hotels.pdf"
+    pdf_file.write_text("dummy pdf content")
+    env = {
+        "PDF_FILE": str(pdf_file),
+        "CSV_FILE": str(tmp_path / "hotels.csv"),
+        "CSV_W_COOR_FILE": str(tmp_path / "hotelswithcoor.csv"),
+        "GPX_FILE": str(tmp_path / "hotels.gpx"),
+        "PDF_WORKERS": "1",
+        "PDF_CACHE_DIR": "",
+        "ADDRESS_TEMPLATES": "{Betrieb}, {Stadt}",
+        "GEOCODE_JOURNAL_FILE": "",
+        "GEOCODE_INCREMENTAL": "",
+    }
+    with patch.dict(os.environ, env):
+        yield env
+
+
+def make_session():
+    """A session whose backend finds every address."""
+    backend = MagicMock()
+    backend.geocode.return_value = (48.0, 9.0)
+    return GeocoderSession(backend)
+
+
+PDF_TABLES = [
+    pd.DataFrame({"Etappe": [1, 2], "Stadt": ["Aalen", "Bopfingen"], "Betrieb": ["Hotel A", "Hotel B"]}),
+]
+
+
+@patch('tabula.read_pdf', return_value=PDF_TABLES)
+def test_pipeline_runs_in_memory(mock_read_pdf, pipeline_env):
+    """Tests that a full run writes only the GPX file.
+
+    The tables are handed from stage to stage without intermediate CSV files.
+    """
+    # Act: Run all stages.
+    hotels = Pipeline(session=make_session()).run()
+
+    # Assert: Verify the GPX waypoints and that no CSV was written.
+    with open(pipeline_env["GPX_FILE"]) as f:
+        gpx = gpxpy.parse(f)
+    assert [waypoint.name for waypoint in gpx.waypoints] == ["Hotel A", "Hotel B"]
+    assert list(hotels["Latitude"]) == [48.0, 48.0]
+    assert not os.path.exists(pipeline_env["CSV_FILE"])
+    assert not os.path.exists(pipeline_env["CSV_W_COOR_FILE"])
+
+
+@patch('tabula.read_pdf', return_value=PDF_TABLES)
+def test_pipeline_saves_intermediates(mock_read_pdf, pipeline_env):
+    """Tests that intermediates are written on request and the last stage is always written."""
+    # Act: Run up to the geocoding stage, saving intermediates.
+    Pipeline(session=make_session()).run(to_stage="geocode", save_intermediates=True)
+
+    # Assert: Verify the clean and geocoded tables, and that no GPX file was written.
+    cleaned = pd.read_csv(pipeline_env["CSV_FILE"], sep=";")
+    assert list(cleaned.columns) == ["Etappe", "Stadt", "Betrieb"]
+    geocoded = pd.read_csv(pipeline_env["CSV_W_COOR_FILE"], sep=";")
+    assert list(geocoded["Longitude"]) == [9.0, 9.0]
+    assert not os.path.exists(pipeline_env["GPX_FILE"])
+
+
+@patch('tabula.read_pdf', return_value=PDF_TABLES)
+def test_pipeline_incremental_mode_writes_geocoded_table(mock_read_pdf, pipeline_env):
+    """Tests that incremental mode persists CSV_W_COOR_FILE, so the next run can reuse it."""
+    # Arrange: Enable incremental mode for two full runs.
+    os.environ["GEOCODE_INCREMENTAL"] = "1"
+    first_session = make_session()
+    second_session = make_session()
+
+    # Act: Run all stages twice.
+    Pipeline(session=first_session).run()
+    Pipeline(session=second_session).run()
+
+    # Assert: The geocoded table was written and the second run reused it.
+    geocoded = pd.read_csv(pipeline_env["CSV_W_COOR_FILE"], sep=";")
+    assert list(geocoded["Latitude"]) == [48.0, 48.0]
+    assert first_session.backend.geocode.call_count == 2
+    second_session.backend.geocode.assert_not_called()
+    assert not os.path.exists(pipeline_env["CSV_FILE"])
+
+
+def test_pipeline_starts_at_gpx_stage(pipeline_env):
+    """Tests that a later start reads the persisted output of the stage before it."""
+    # Arrange: A geocoded CSV, and a session that must not be used.
+    pd.DataFrame({
+        "Etappe": [1], "Betrieb": ["Hotel A"], "Latitude": [48.5], "Longitude": [9.5],
+    }).to_csv(pipeline_env["CSV_W_COOR_FILE"], sep=";", index=False)
+    session = make_session()
+
+    # Act: Run only the GPX stage.
+    Pipeline(session=session).run(from_stage="gpx")
+
+    # Assert: Verify the waypoint and that nothing was geocoded.
+    with open(pipeline_env["GPX_FILE"]) as f:
+        gpx = gpxpy.parse(f)
+    assert [(w.latitude, w.longitude) for w in gpx.waypoints] == [(48.5, 9.5)]
+    session.backend.geocode.assert_not_called()
+
+
+def test_main_rejects_reversed_stages():
+    """Tests that a start stage after the end stage is a usage error."""
+    with pytest.raises(SystemExit):
+        main(["--from-stage", "gpx", "--to-stage", "clean"])
+
+
+def test_main_profile_report(pipeline_env, tmp_path):
+    """Tests that --profile writes a JSON report with the stages that ran."""
+    # Arrange: A geocoded CSV for the GPX stage.
+    pd.DataFrame({
+        "Etappe": [1], "Betrieb": ["Hotel A"], "Latitude": [48.5], "Longitude": [9.5],
+    }).to_csv(pipeline_env["CSV_W_COOR_FILE"], sep=";", index=False)
+    report_file = tmp_path / "report.json"
+
+    # Act: Run the GPX stage with profiling.
+    with patch('dotenv.load_dotenv'):
+        main(["--from-stage", "gpx", "--profile", str(report_file)])
+
+    # Assert: Verify the timed stages.
+    report = json.loads(report_file.read_text())
+    assert {"gpx.load_input", "gpx", "gpx.write"} <= set(report["stages"])
@@ -0,0 +1,112 @@
+"""Tests for the persistent geocode cache.
+
+This module contains unit tests for `GeocodeCache` and `normalize_address`
+defined in `src.geocode_cache`, covering hits, negative results, TTL expiry,
+size-bounded eviction and persistence across instances.
+"""
+
+import pytest
+import os
+from unittest.mock import patch
+from src.geocode_cache import GeocodeCache, normalize_address, open_cache_from_env
+
+
+def test_normalize_address():
+    """Tests that spacing and case differences map to the same cache key."""
+    assert normalize_address("Hotel A ,  Main  St, City, Germany") == normalize_address(
+        "hotel a, main st,city, GERMANY"
+    )
+
+
+def test_cache_hit_miss_and_negative_result(tmp_path):
+    """Tests that stored coordinates and negative results are returned as hits.
+
+    It verifies that an unknown address is a miss, that both found and
+    not-found results are served from the cache, and that the counters match.
+    """
+    # Arrange: Create a cache in a temporary directory.
+    cache = GeocodeCache(str(tmp_path / "cache.sqlite"))
+
+    # Act: Look up an unknown address, then store a hit and a negative result.
+    first = cache.lookup("Hotel A, City A")
+    cache.store("Hotel A, City A", (10.0, 20.0))
+    cache.store("Nowhere, City B", None)
+
+    # Assert: Verify the lookups and the statistics.
+    assert first == (False, None)
+    assert cache.lookup("hotel a,  city a") == (True, (10.0, 20.0))
+    assert cache.lookup("Nowhere, City B") == (True, None)
+    assert (cache.hits, cache.misses, cache.evictions) == (2, 1, 0)
+
+
+def test_cache_persists_across_instances(tmp_path):
+    """Tests that a reopened cache file still serves earlier results."""
+    # Arrange: Store a result and close the cache.
+    path = str(tmp_path / "cache.sqlite")
+    cache = GeocodeCache(path)
+    cache.store("Hotel A, City A", (10.0, 20.0))
+    cache.close()
+
+    # Act: Reopen the cache from the same file.
+    reopened = GeocodeCache(path)
+
+    # Assert: Verify the stored result is a hit.
+    assert reopened.lookup("Hotel A, City A") == (True, (10.0, 20.0))
+
+
+@patch("src.geocode_cache.time.time")
+def test_cache_ttl_expiry(mock_time, tmp_path):
+    """Tests that entries older than their TTL are evicted and reported as misses.
+
+    It verifies that positive and negative results use their own TTLs.
+    """
+    # Arrange: Create a cache with a long positive and a short negative TTL.
+    mock_time.return_value = 1000.0
+    cache = GeocodeCache(
+        str(tmp_path / "cache.sqlite"), ttl_seconds=100, negative_ttl_seconds=10
+    )
+    cache.store("Hotel A, City A", (10.0, 20.0))
+    cache.store("Nowhere, City B", None)
+
+    # Act: Advance the clock past the negative TTL only.
+    mock_time.return_value = 1050.0
+
+    # Assert: Verify the negative result expired while the hit is still cached.
+    assert cache.lookup("Nowhere, City B") == (False, None)
+    assert cache.lookup("Hotel A, City A") == (True, (10.0, 20.0))
+    assert cache.evictions == 1
+
+
+@patch("src.geocode_cache.time.time")
+def test_cache_size_bounded_eviction(mock_time, tmp_path):
+    """Tests that the least recently used entries are evicted beyond max_entries."""
+    # Arrange: Create a cache that holds two entries.
+    cache = GeocodeCache(str(tmp_path / "cache.sqlite"), max_entries=2)
+    mock_time.return_value = 1.0
+    cache.store("A", (1.0, 1.0))
+    mock_time.return_value = 2.0
+    cache.store("B", (2.0, 2.0))
+    mock_time.return_value = 3.0
+    cache.lookup("A")  # A is now more recently used than B.
+
+    # Act: Store a third entry.
+    mock_time.return_value = 4.0
+    cache.store("C", (3.0, 3.0))
+
+    # Assert: Verify B was evicted and the others remain.
+    assert len(cache) == 2
+    assert cache.evictions == 1
+    assert cache.lookup("B") == (False, None)
+    assert cache.lookup("A") == (True, (1.0, 1.0))
+    assert cache.lookup("C") == (True, (3.0, 3.0))
+
+
+def test_open_cache_from_env(tmp_path):
+    """Tests that the cache is only enabled when GEOCODE_CACHE_FILE is set."""
+    path = str(tmp_path / "cache.sqlite")
+    with patch.dict(os.environ, {"GEOCODE_CACHE_FILE": "", "GEOCODE_CACHE_TTL_DAYS": "2"}):
+        assert open_cache_from_env() is None
+    with patch.dict(os.environ, {"GEOCODE_CACHE_FILE": path, "GEOCODE_CACHE_TTL_DAYS": "2"}):
+        cache = open_cache_from_env()
+        assert cache.ttl_seconds == 2 * 86400
+        assert cache.negative_ttl_seconds is None
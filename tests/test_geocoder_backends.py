@@ -0,0 +1,170 @@
+"""Tests for the pluggable geocoder backends.
+
+This module contains unit tests for the backends defined in
+`src.geocoder_backends`, covering backend selection from the environment,
+self-hosted Nominatim settings, the offline gazetteer in CSV and SQLite form
+and the mapping of geopy errors.
+"""
+
+import pytest
+import os
+from unittest.mock import patch, MagicMock
+from src.geocoder_backends import (
+    GazetteerBackend,
+    NominatimBackend,
+    PhotonBackend,
+    build_gazetteer_index,
+    create_backend_from_env,
+)
+from src.geocoding import GeocoderSession
+from src.geocoding_engine import TransientGeocodingError
+
+
+@pytest.fixture
+def gazetteer_csv(tmp_path):
+    """Writes a small gazetteer CSV file and returns its path."""
+    path = tmp_path / "gazetteer.csv"
+    path.write_text(
+        "Address;Latitude;Longitude\n"
+        "Hotel A, Street A, City A, Germany;48.1;9.1\n"
+        "Street B, City B, Germany;48.2;9.2\n"
+        "Incomplete, City C, Germany;;\n",
+        encoding="utf-8",
+    )
+    return str(path)
+
+
+def test_gazetteer_backend_csv(gazetteer_csv):
+    """Tests that the CSV gazetteer resolves normalized addresses offline."""
+    # Arrange: Load the gazetteer CSV.
+    backend = GazetteerBackend(gazetteer_csv)
+
+    # Act/Assert: Verify known, differently spaced, and unknown addresses.
+    assert backend.geocode("Hotel A, Street A, City A, Germany") == (48.1, 9.1)
+    assert backend.geocode("street b ,city b,  germany") == (48.2, 9.2)
+    assert backend.geocode("Incomplete, City C, Germany") is None
+    assert backend.geocode("Unknown, Germany") is None
+
+
+def test_gazetteer_backend_sqlite_index(gazetteer_csv, tmp_path):
+    """Tests that a prebuilt SQLite index returns the same results as the CSV."""
+    # Arrange: Build the index from the CSV file.
+    index_path = str(tmp_path / "gazetteer.sqlite")
+    count = build_gazetteer_index(gazetteer_csv, index_path)
+
+    # Act: Open the index as a backend.
+    backend = GazetteerBackend(index_path)
+
+    # Assert: Verify the index content and lookups.
+    assert count == 2
+    assert backend.geocode("Hotel A, Street A, City A, Germany") == (48.1, 9.1)
+    assert backend.geocode("Unknown, Germany") is None
+    backend.close()
+
+
+def test_gazetteer_backend_missing_index(tmp_path):
+    """Tests that a missing gazetteer index raises FileNotFoundError."""
+    with pytest.raises(FileNotFoundError):
+        GazetteerBackend(str(tmp_path / "missing.sqlite"))
+
+
+@patch('geopy.geocoders.Nominatim')
+def test_create_backend_self_hosted_nominatim(mock_nominatim):
+    """Tests that NOMINATIM_DOMAIN and NOMINATIM_SCHEME select a self-hosted server."""
+    env = {
+        "GEOCODER_BACKEND": "nominatim",
+        "NOMINATIM_DOMAIN": "nominatim.local:8080",
+        "NOMINATIM_SCHEME": "http",
+    }
+    with patch.dict(os.environ, env):
+        backend = create_backend_from_env()
+
+    assert isinstance(backend, NominatimBackend)
+    _, kwargs = mock_nominatim.call_args
+    assert kwargs["domain"] == "nominatim.local:8080"
+    assert kwargs["scheme"] == "http"
+
+
+@patch('geopy.geocoders.Photon')
+def test_create_backend_photon(mock_photon):
+    """Tests that GEOCODER_BACKEND=photon creates a Photon backend."""
+    mock_location = MagicMock(latitude=1.0, longitude=2.0)
+    mock_photon.return_value.geocode.return_value = mock_location
+    with patch.dict(os.environ, {"GEOCODER_BACKEND": "photon", "PHOTON_DOMAIN": "photon.local"}):
+        backend = create_backend_from_env()
+
+    assert isinstance(backend, PhotonBackend)
+    assert mock_photon.call_args.kwargs["domain"] == "photon.local"
+    assert backend.geocode("Somewhere") == (1.0, 2.0)
+
+
+def test_create_backend_gazetteer_session_is_offline(gazetteer_csv):
+    """Tests that an offline session has no rate limiter and no cache."""
+    env = {"GEOCODER_BACKEND": "gazetteer", "GAZETTEER_FILE": gazetteer_csv}
+    with patch.dict(os.environ, env):
+        session = GeocoderSession.from_env()
+
+    assert isinstance(session.backend, GazetteerBackend)
+    assert session.rate_limiter is None
+    assert session.cache is None
+    assert session.geocode_many(["Street B, City B, Germany", "Nowhere"]) == [(48.2, 9.2), None]
+
+
+def test_create_backend_invalid_configuration():
+    """Tests that unknown backends and a gazetteer without a file are rejected."""
+    with patch.dict(os.environ, {"GEOCODER_BACKEND": "bing"}):
+        with pytest.raises(ValueError):
+            create_backend_from_env()
+    with patch.dict(os.environ, {"GEOCODER_BACKEND": "gazetteer", "GAZETTEER_FILE": ""}):
+        with pytest.raises(ValueError):
+            create_backend_from_env()
+
+
+@patch('geopy.geocoders.Nominatim')
+def test_geopy_backend_raises_transient_errors(mock_nominatim):
+    """Tests that timeouts and HTTP 429 are raised as transient errors.
+
+    Other geopy errors, such as an invalid query, are passed on unchanged.
+    """
+    from geopy.exc import GeocoderQueryError, GeocoderRateLimited, GeocoderTimedOut
+
+    # Arrange: A Nominatim backend whose requests fail in three ways.
+    mock_nominatim.return_value.geocode.side_effect = [
+        GeocoderTimedOut("timed out"),
+        GeocoderRateLimited("too many requests", retry_after=30),
+        GeocoderQueryError("bad query"),
+    ]
+    backend = NominatimBackend()
+
+    # Act & Assert: Verify the mapped errors and the Retry-After.
+    with pytest.raises(TransientGeocodingError) as timed_out:
+        backend.geocode("Somewhere")
+    with pytest.raises(TransientGeocodingError) as rate_limited:
+        backend.geocode("Somewhere")
+    with pytest.raises(GeocoderQueryError):
+        backend.geocode("Somewhere")
+    assert timed_out.value.retry_after is None
+    assert rate_limited.value.retry_after == 30
+
+
+@pytest.mark.parametrize("status_code, transient", [(500, True), (502, True), (404, False)])
+@patch('geopy.geocoders.Nominatim')
+def test_geopy_backend_raises_server_errors_as_transient(mock_nominatim, status_code, transient):
+    """Tests that HTTP 5xx, which geopy raises as GeocoderServiceError, is transient.
+
+    Other statuses raised as GeocoderServiceError are passed on unchanged.
+    """
+    from geopy.adapters import AdapterHTTPError
+    from geopy.exc import GeocoderServiceError
+
+    # Arrange: The error geopy raises for an unmapped HTTP status.
+    error = GeocoderServiceError(f"Non-successful status code {status_code}")
+    error.__cause__ = AdapterHTTPError("error", status_code=status_code, headers={}, text="")
+    mock_nominatim.return_value.geocode.side_effect = error
+    backend = NominatimBackend()
+
+    # Act & Assert: Verify the raised error.
+    expected = TransientGeocodingError if transient else GeocoderServiceError
+    with pytest.raises(expected) as raised:
+        backend.geocode("Somewhere")
+    assert isinstance(raised.value, TransientGeocodingError) == transient
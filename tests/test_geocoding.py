@@ -1,17 +1,36 @@
 """Tests for the geocoding module.
 
-This module contains unit tests for the `get_gps_coordinates` function
-defined in `src.geocoding`, covering successful geocoding, handling of
-not-found addresses, and exceptions during the geocoding process.
+This module contains unit tests for the `get_gps_coordinates` function and
+the `GeocoderSession` class defined in `src.geocoding`, covering successful
+geocoding, handling of not-found addresses, exceptions during the geocoding
+process, client reuse, caching, batch geocoding and the retries of
+transient errors.
 """
 
 import pytest
-from unittest.mock import patch, MagicMock
-from src.geocoding import get_gps_coordinates
+from unittest.mock import patch, MagicMock, ANY
+from src.geocoding import GeocoderSession, get_gps_coordinates, reset_default_session
+from src.geocode_cache import GeocodeCache
+from src.geocoding_engine import (
+    CircuitBreaker,
+    GeocodingUnavailableError,
+    RetryPolicy,
+    TransientGeocodingError,
+)
 import os
 
+
+@pytest.fixture(autouse=True)
+def fresh_default_session():
+    """Ensures every test builds its own module-level session from the environment."""
+    reset_default_session()
+    with patch.dict(os.environ, {"GEOCODE_CACHE_FILE": "", "GEOCODER_BACKEND": "nominatim"}):
+        yield
+    reset_default_session()
+
+
 @patch.dict(os.environ, {"NOMINATIM_USER_AGENT": "gpx-project"})
-@patch('src.geocoding.Nominatim')
+@patch('geopy.geocoders.Nominatim')
 def test_get_gps_coordinates_success(mock_nominatim):
     """Tests that get_gps_coordinates successfully retrieves GPS coordinates.
 
@@ -34,13 +53,13 @@ def test_get_gps_coordinates_success(mock_nominatim):
     
     # Assert: Verify the returned coordinates and that mocks were called correctly.
     assert coordinates == (48.8584, 2.2945)
-    # Verify Nominatim was initialized with the correct user agent.
-    mock_nominatim.assert_called_once_with(user_agent="gpx-project")
+    # Verify Nominatim was initialized with the correct user agent and a pooled adapter.
+    mock_nominatim.assert_called_once_with(user_agent="gpx-project", timeout=10.0, adapter_factory=ANY)
     # Verify the geocode method was called with the correct address.
     mock_geolocator.geocode.assert_called_once_with("Eiffel Tower")
 
 @patch.dict(os.environ, {"NOMINATIM_USER_AGENT": "gpx-project"})
-@patch('src.geocoding.Nominatim')
+@patch('geopy.geocoders.Nominatim')
 def test_get_gps_coordinates_not_found(mock_nominatim):
     """Tests that get_gps_coordinates returns None when an address is not found.
 
@@ -57,11 +76,11 @@ def test_get_gps_coordinates_not_found(mock_nominatim):
     
     # Assert: Verify that the function returns None and mocks were called correctly.
     assert coordinates is None
-    mock_nominatim.assert_called_once_with(user_agent="gpx-project")
+    mock_nominatim.assert_called_once_with(user_agent="gpx-project", timeout=10.0, adapter_factory=ANY)
     mock_geolocator.geocode.assert_called_once_with("nonexistent place")
 
 @patch.dict(os.environ, {"NOMINATIM_USER_AGENT": "gpx-project"})
-@patch('src.geocoding.Nominatim')
+@patch('geopy.geocoders.Nominatim')
 def test_get_gps_coordinates_exception(mock_nominatim):
     """Tests that get_gps_coordinates handles exceptions during geocoding.
 
@@ -78,5 +97,127 @@ def test_get_gps_coordinates_exception(mock_nominatim):
     
     # Assert: Verify that the function returns None and mocks were called correctly.
     assert coordinates is None
-    mock_nominatim.assert_called_once_with(user_agent="gpx-project")
-    mock_geolocator.geocode.assert_called_once_with("any address")
\ No newline at end of file
+    mock_nominatim.assert_called_once_with(user_agent="gpx-project", timeout=10.0, adapter_factory=ANY)
+    mock_geolocator.geocode.assert_called_once_with("any address")
+
+
+@patch.dict(os.environ, {"NOMINATIM_DELAY_SECONDS": "0"})
+@patch('geopy.geocoders.Nominatim')
+def test_get_gps_coordinates_reuses_client(mock_nominatim):
+    """Tests that repeated calls share a single Nominatim client.
+
+    It verifies that the client (and therefore its HTTP connection pool) is
+    constructed once for the whole run instead of once per address.
+    """
+    # Arrange: A geolocator that finds nothing.
+    mock_nominatim.return_value.geocode.return_value = None
+
+    # Act: Geocode three addresses.
+    for address in ["A", "B", "C"]:
+        get_gps_coordinates(address)
+
+    # Assert: Verify one client served all three requests.
+    mock_nominatim.assert_called_once()
+    assert mock_nominatim.return_value.geocode.call_count == 3
+
+
+def test_geocoder_session_uses_cache(tmp_path):
+    """Tests that a session serves repeated addresses from the cache.
+
+    It verifies that a warm lookup performs no network call and no rate-limit wait, and
+    that exceptions are not cached as negative results.
+    """
+    # Arrange: Use a temporary cache and a backend that succeeds once.
+    cache = GeocodeCache(str(tmp_path / "cache.sqlite"))
+    rate_limiter = MagicMock()
+    mock_backend = MagicMock()
+    mock_backend.geocode.return_value = (48.8584, 2.2945)
+    session = GeocoderSession(mock_backend, rate_limiter=rate_limiter, cache=cache)
+
+    # Act: Geocode the same address twice.
+    first = session.geocode("Eiffel Tower")
+    second = session.geocode("Eiffel Tower")
+
+    # Arrange/Act: A failing lookup must not be stored.
+    mock_backend.geocode.side_effect = Exception("Timeout")
+    failed = session.geocode("Louvre")
+
+    # Assert: Verify only the first and the failing call reached the geocoder.
+    assert first == second == (48.8584, 2.2945)
+    assert failed is None
+    assert mock_backend.geocode.call_count == 2
+    assert rate_limiter.acquire.call_count == 2
+    assert cache.lookup("Louvre") == (False, None)
+
+
+def test_geocoder_session_geocode_many():
+    """Tests that geocode_many deduplicates addresses and keeps the input order."""
+    # Arrange: A fake backend resolving addresses by their length.
+    mock_backend = MagicMock()
+    mock_backend.geocode.side_effect = lambda address: (
+        (float(len(address)), 0.0) if address != "x" else None
+    )
+    session = GeocoderSession(mock_backend, workers=3)
+
+    # Act: Geocode a batch containing duplicates and a not-found address.
+    results = session.geocode_many(["ab", "x", "abc", "ab"])
+
+    # Assert: Verify the results and that the duplicate was requested once.
+    assert results == [(2.0, 0.0), None, (3.0, 0.0), (2.0, 0.0)]
+    assert mock_backend.geocode.call_count == 3
+
+
+def test_geocoder_session_retries_transient_errors(tmp_path):
+    """Tests that a timeout is retried with backoff instead of counting as not found."""
+    # Arrange: A backend that times out twice before answering.
+    mock_backend = MagicMock()
+    mock_backend.geocode.side_effect = [
+        TransientGeocodingError("timed out"),
+        TransientGeocodingError("rate limited", retry_after=7),
+        (48.8, 2.3),
+    ]
+    sleeps = []
+    cache = GeocodeCache(str(tmp_path / "cache.sqlite"))
+    session = GeocoderSession(
+        mock_backend,
+        cache=cache,
+        retry_policy=RetryPolicy(retries=3, base_seconds=2.0, jitter=lambda: 0.5),
+        sleep=sleeps.append,
+    )
+
+    # Act: Geocode the address.
+    coordinates = session.geocode("Louvre")
+
+    # Assert: Verify the backoff, the Retry-After and the cached result.
+    assert coordinates == (48.8, 2.3)
+    assert sleeps == [1.0, 7.0]
+    assert cache.lookup("Louvre") == (True, (48.8, 2.3))
+
+
+def test_geocoder_session_gives_up_without_caching(tmp_path):
+    """Tests that exhausted retries raise instead of returning "not found".
+
+    The failure must neither be cached nor let the query plan fall through
+    to the next address template.
+    """
+    # Arrange: A backend that is down and a breaker opening after three failures.
+    mock_backend = MagicMock()
+    mock_backend.geocode.side_effect = TransientGeocodingError("service unavailable")
+    cache = GeocodeCache(str(tmp_path / "cache.sqlite"))
+    breaker = CircuitBreaker(threshold=3, cooldown_seconds=30)
+    session = GeocoderSession(
+        mock_backend,
+        cache=cache,
+        retry_policy=RetryPolicy(retries=2, jitter=lambda: 0.0),
+        circuit_breaker=breaker,
+        sleep=lambda seconds: None,
+    )
+
+    # Act: Geocode the address.
+    with pytest.raises(GeocodingUnavailableError, match="after 3 attempts"):
+        session.geocode("Louvre")
+
+    # Assert: Verify the attempts, the open circuit and the empty cache.
+    assert mock_backend.geocode.call_count == 3
+    assert breaker.is_open
+    assert cache.lookup("Louvre") == (False, None)
@@ -0,0 +1,201 @@
+"""Tests for the concurrent geocoding engine.
+
+This module contains unit tests for `TokenBucket`, `create_rate_limiter_from_env`,
+`RetryPolicy`, `CircuitBreaker` and `run_concurrently` defined in
+`src.geocoding_engine`, using a fake clock and a local fake geocoder
+instead of a remote service.
+"""
+
+import pytest
+import os
+import threading
+import time
+from unittest.mock import patch
+from src.geocoding_engine import (
+    CircuitBreaker,
+    RetryPolicy,
+    TokenBucket,
+    create_circuit_breaker_from_env,
+    create_rate_limiter_from_env,
+    run_concurrently,
+)
+
+
+class FakeClock:
+    """A manual clock whose sleep advances the current time."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_token_bucket_paces_requests():
+    """Tests that the bucket allows one request immediately and then paces the rest."""
+    # Arrange: A bucket allowing two requests per second without burst.
+    clock = FakeClock()
+    bucket = TokenBucket(2, burst=1, clock=clock, sleep=clock.sleep)
+
+    # Act: Acquire three tokens back to back.
+    waits = [bucket.acquire() for _ in range(3)]
+
+    # Assert: Verify the first is immediate and the others wait half a second each.
+    assert waits == [0.0, 0.5, 0.5]
+    assert clock.now == 1.0
+
+
+def test_token_bucket_allows_bursts():
+    """Tests that a burst capacity lets several requests through without waiting."""
+    # Arrange: A bucket with a burst of three.
+    clock = FakeClock()
+    bucket = TokenBucket(1, burst=3, clock=clock, sleep=clock.sleep)
+
+    # Act: Acquire four tokens back to back.
+    waits = [bucket.acquire() for _ in range(4)]
+
+    # Assert: Verify only the fourth request had to wait.
+    assert waits == [0.0, 0.0, 0.0, 1.0]
+
+
+def test_token_bucket_does_not_wait_after_idle_time():
+    """Tests that time spent elsewhere (e.g. request latency) refills the bucket."""
+    # Arrange: A bucket with one request per second.
+    clock = FakeClock()
+    bucket = TokenBucket(1, clock=clock, sleep=clock.sleep)
+    bucket.acquire()
+
+    # Act: Simulate a request that itself took longer than the interval.
+    clock.now += 1.5
+    wait = bucket.acquire()
+
+    # Assert: Verify no additional sleep was needed.
+    assert wait == 0.0
+
+
+def test_token_bucket_disabled_without_rate():
+    """Tests that a rate of zero never waits."""
+    bucket = TokenBucket(0)
+    assert [bucket.acquire() for _ in range(5)] == [0.0] * 5
+
+
+def test_create_rate_limiter_from_env():
+    """Tests that the limiter falls back to NOMINATIM_DELAY_SECONDS."""
+    with patch.dict(os.environ, {"GEOCODE_RATE_PER_SECOND": "", "NOMINATIM_DELAY_SECONDS": "2"}):
+        assert create_rate_limiter_from_env().rate == 0.5
+    with patch.dict(os.environ, {"GEOCODE_RATE_PER_SECOND": "", "NOMINATIM_DELAY_SECONDS": "0"}):
+        assert create_rate_limiter_from_env().rate == 0
+    with patch.dict(os.environ, {"GEOCODE_RATE_PER_SECOND": "20", "GEOCODE_BURST": "5"}):
+        limiter = create_rate_limiter_from_env()
+        assert (limiter.rate, limiter.capacity) == (20.0, 5)
+
+
+def test_run_concurrently_preserves_order_with_fake_geocoder():
+    """Tests that concurrent geocoding returns results in input order.
+
+    It uses a local fake geocoder whose latency is inversely related to the
+    input position, so completion order differs from input order, and checks
+    that the requests actually overlapped.
+    """
+    # Arrange: A fake geocoder with variable latency that tracks concurrency.
+    lock = threading.Lock()
+    active = []
+    peak = []
+
+    def fake_geocoder(address):
+        with lock:
+            active.append(address)
+            peak.append(len(active))
+        time.sleep(0.05 if address.endswith("0") else 0.01)
+        with lock:
+            active.remove(address)
+        return (float(len(address)), 0.0)
+
+    addresses = [f"Street {i}" for i in range(10)]
+
+    # Act: Geocode the addresses with four workers.
+    results = run_concurrently(fake_geocoder, addresses, workers=4)
+
+    # Assert: Verify the order and that requests ran concurrently.
+    assert results == [(float(len(address)), 0.0) for address in addresses]
+    assert max(peak) > 1
+
+
+def test_retry_policy_backoff_is_capped_and_jittered():
+    """Tests the exponential backoff, its cap and the jitter factor."""
+    # Arrange: A policy starting at one second, capped at five, with a fixed jitter.
+    policy = RetryPolicy(retries=4, base_seconds=1.0, max_seconds=5.0, jitter=lambda: 0.5)
+
+    # Act: Compute the delays of four retries.
+    delays = [policy.delay(retry) for retry in range(1, 5)]
+
+    # Assert: Verify 0.5 * (1, 2, 4, capped 5) seconds.
+    assert delays == [0.5, 1.0, 2.0, 2.5]
+
+
+def test_retry_policy_honors_retry_after():
+    """Tests that a Retry-After from the service replaces the backoff."""
+    policy = RetryPolicy(max_seconds=5.0, jitter=lambda: 1.0)
+
+    assert policy.delay(1, retry_after=12) == 12.0
+
+
+def test_circuit_breaker_pauses_after_consecutive_failures():
+    """Tests that the circuit opens at the threshold and lets one trial through."""
+    # Arrange: A breaker opening after two failures for ten seconds.
+    clock = FakeClock()
+    breaker = CircuitBreaker(threshold=2, cooldown_seconds=10, clock=clock, sleep=clock.sleep)
+
+    # Act & Assert: One failure keeps the circuit closed, the second opens it.
+    breaker.record_failure()
+    assert breaker.wait() == 0.0
+    breaker.record_failure()
+    assert breaker.is_open
+
+    # Act & Assert: The next caller waits for the cooldown and becomes the trial.
+    assert breaker.wait() == 10.0
+    breaker.record_success()
+    assert not breaker.is_open
+    assert breaker.wait() == 0.0
+
+
+def test_circuit_breaker_reopens_when_the_trial_fails():
+    """Tests that a failed trial request opens the circuit again."""
+    # Arrange: An open circuit whose cooldown has passed.
+    clock = FakeClock()
+    breaker = CircuitBreaker(threshold=1, cooldown_seconds=5, clock=clock, sleep=clock.sleep)
+    breaker.record_failure()
+    breaker.wait()
+
+    # Act: The trial request fails.
+    breaker.record_failure()
+
+    # Assert: Verify the next caller waits another cooldown.
+    assert breaker.wait() == 5.0
+
+
+def test_circuit_breaker_honors_retry_after():
+    """Tests that a Retry-After pauses all workers even below the threshold."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(threshold=5, cooldown_seconds=30, clock=clock, sleep=clock.sleep)
+
+    breaker.record_failure(retry_after=3)
+
+    assert breaker.wait() == 3.0
+
+
+def test_create_circuit_breaker_from_env():
+    """Tests that the breaker is configured from .env and can be disabled."""
+    env = {"GEOCODE_BREAKER_THRESHOLD": "3", "GEOCODE_BREAKER_COOLDOWN_SECONDS": "12"}
+    with patch.dict(os.environ, env):
+        breaker = create_circuit_breaker_from_env()
+    with patch.dict(os.environ, {"GEOCODE_BREAKER_THRESHOLD": "0"}):
+        disabled = create_circuit_breaker_from_env()
+
+    assert (breaker.threshold, breaker.cooldown_seconds) == (3, 12.0)
+    assert disabled is None
@@ -8,7 +8,10 @@ handling of empty input, and cases with missing coordinates.
 import pytest
 import pandas as pd
 import os
-from src.gpx_generator import create_gpx_file
+import gpxpy
+import numpy as np
+from src.gpx_generator import create_gpx_file, create_gpx_file_from_csv, write_gpx_stream
+from src.gpx_track_reader import Track
 
 
 def test_create_gpx_file(tmp_path):
@@ -120,3 +123,145 @@ def test_create_gpx_file_missing_coordinates(tmp_path):
         assert "<name>Hotel 1</name>" in gpx_content
         # Verify the second hotel (with missing coordinates) is NOT present.
         assert 'lon="-74.006"' not in gpx_content
+
+
+def test_create_gpx_file_custom_description_fields(tmp_path):
+    """Tests that the description fields and labels can be configured.
+
+    It verifies that only the requested columns appear, in the given order
+    and with the given labels, and that columns absent from the input are skipped.
+    """
+    # Arrange: Prepare a DataFrame and a custom description configuration.
+    hotels = pd.DataFrame(
+        {
+            "Betrieb": ["Hotel 1"],
+            "Latitude": [48.8584],
+            "Longitude": [2.2945],
+            "Telefon": ["123-456"],
+            "Website": [None],
+            "Stadt": ["Aalen"],
+        }
+    )
+    output_file = tmp_path / "test_fields.gpx"
+    fields = [("Stadt", "Ort"), ("Website", "Web"), ("Telefon", "Tel."), ("Hm", "Hm")]
+
+    # Act: Call the function under test with the custom fields.
+    create_gpx_file(hotels, output_file, description_fields=fields)
+
+    # Assert: Verify the description uses the configured labels and order.
+    with open(output_file, "r") as f:
+        assert "<desc>Ort: Aalen, Tel.: 123-456</desc>" in f.read()
+
+
+def test_write_gpx_stream_matches_gpxpy_output(tmp_path):
+    """Tests that the streaming writer produces byte-identical output to gpxpy.
+
+    It covers chunked input, a row without coordinates, characters that need
+    XML escaping and a coordinate of exactly zero.
+    """
+    # Arrange: Prepare hotel data with edge cases, split into chunks.
+    hotels = pd.DataFrame(
+        {
+            "Betrieb": ["Hotel 1", "Hotel & <Spa>", "Hotel 3", "Hotel 4"],
+            "Latitude": [48.8584, 0.0, None, 47.1],
+            "Longitude": [2.2945, 10.5, 9.0, -74.006],
+            "Straße": ["Main St", 'Broad "way"', None, None],
+            "Telefon": ["123-456", None, None, None],
+            "Website": ["hotel1.com", None, None, None],
+            "Entfernung": ["10km", "direkt", None, None],
+            "Hm": [None, "50m", None, None],
+        }
+    )
+    expected_file = tmp_path / "expected.gpx"
+    streamed_file = tmp_path / "streamed.gpx"
+    create_gpx_file(hotels, expected_file)
+
+    # Act: Stream the same rows in chunks of two.
+    count = write_gpx_stream([hotels.iloc[:2], hotels.iloc[2:]], streamed_file)
+
+    # Assert: Verify the files are identical and three waypoints were written.
+    assert count == 3
+    assert streamed_file.read_bytes() == expected_file.read_bytes()
+
+
+def test_create_gpx_file_from_csv_streams_chunks(tmp_path):
+    """Tests that a geocoded CSV is converted in chunks with identical output."""
+    # Arrange: Write a geocoded CSV file with more rows than the chunk size.
+    hotels = pd.DataFrame(
+        {
+            "Betrieb": [f"Hotel {i}" for i in range(7)],
+            "Latitude": [48.0 + i / 10 for i in range(7)],
+            "Longitude": [9.0 + i / 10 for i in range(7)],
+            "Straße": [f"Street {i}" for i in range(7)],
+            "Telefon": [None] * 7,
+            "Website": [None] * 7,
+            "Entfernung": ["direkt"] * 7,
+            "Hm": [None] * 7,
+        }
+    )
+    csv_file = tmp_path / "hotelswithcoor.csv"
+    hotels.to_csv(csv_file, sep=";", index=False)
+    expected_file = tmp_path / "expected.gpx"
+    streamed_file = tmp_path / "streamed.gpx"
+    create_gpx_file(pd.read_csv(csv_file, sep=";"), expected_file)
+
+    # Act: Stream the CSV in chunks of three rows.
+    count = create_gpx_file_from_csv(csv_file, streamed_file, chunksize=3)
+
+    # Assert: Verify all rows were written and the output is identical.
+    assert count == 7
+    assert streamed_file.read_bytes() == expected_file.read_bytes()
+
+
+def test_create_gpx_file_from_csv_keeps_text_columns(tmp_path):
+    """Tests that numeric-looking text columns keep their CSV spelling in descriptions.
+
+    Inferred dtypes would turn "50" next to a missing value into 50.0 and
+    drop the leading zero of a phone number.
+    """
+    # Arrange: A geocoded CSV with a missing Hm value and a phone number.
+    csv_file = tmp_path / "hotelswithcoor.csv"
+    csv_file.write_text(
+        "Betrieb;Latitude;Longitude;Telefon;Hm\n"
+        "Hotel 1;48.0;9.0;07361123;50\n"
+        "Hotel 2;48.1;9.1;;\n"
+    )
+    gpx_file = tmp_path / "hotels.gpx"
+
+    # Act: Convert the CSV.
+    create_gpx_file_from_csv(csv_file, gpx_file)
+
+    # Assert: The values appear as written in the CSV.
+    assert "<desc>Telefon: 07361123, Hm: 50</desc>" in gpx_file.read_text()
+
+
+def test_create_gpx_file_with_track(tmp_path):
+    """Tests that a track is written after the waypoints, also when streaming.
+
+    Missing elevations are left out, and both writers produce identical files.
+    """
+    # Arrange: One hotel and a track with two segments.
+    hotels = pd.DataFrame({"Betrieb": ["Hotel 1"], "Latitude": [48.5], "Longitude": [9.5]})
+    track = Track(
+        "Route",
+        np.array([48.0, 48.1, 48.2]),
+        np.array([9.0, 9.1, 9.2]),
+        np.array([400.0, np.nan, 420.0]),
+        np.array([0, 2]),
+    )
+    output_file = tmp_path / "route_and_hotels.gpx"
+    streamed_file = tmp_path / "streamed.gpx"
+
+    # Act: Write the file with both writers.
+    create_gpx_file(hotels, output_file, track=track)
+    write_gpx_stream([hotels], streamed_file, track=track)
+
+    # Assert: Verify the waypoint, the track and the identical output.
+    with open(output_file) as f:
+        gpx = gpxpy.parse(f)
+    assert [waypoint.name for waypoint in gpx.waypoints] == ["Hotel 1"]
+    assert gpx.tracks[0].name == "Route"
+    segments = gpx.tracks[0].segments
+    assert [len(segment.points) for segment in segments] == [2, 1]
+    assert [point.elevation for point in segments[0].points] == [400.0, None]
+    assert streamed_file.read_bytes() == output_file.read_bytes()
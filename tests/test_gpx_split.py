@@ -0,0 +1,104 @@
+"""Tests for the per-partition GPX split.
+
+This module contains unit tests for `partition_file_name`,
+`write_gpx_task` and `write_partitioned_gpx_files` defined in
+`src.gpx_split`, covering file naming, single files, serial and process
+pool output, track slices and a missing column.
+"""
+
+import pytest
+import gpxpy
+import numpy as np
+import pandas as pd
+from src.gpx_split import partition_file_name, write_gpx_task, write_partitioned_gpx_files
+from src.gpx_track_reader import Track
+
+
+@pytest.fixture
+def hotels():
+    """Hotels of two stages along a route on the equator, one without a stage."""
+    return pd.DataFrame({
+        "Etappe": [1, 1, 2, None],
+        "Betrieb": ["Hotel A", "Hotel B", "Hotel C", "Hotel D"],
+        "Latitude": [0.0, 0.0, 0.0, 0.0],
+        "Longitude": [0.01, 0.03, 0.07, 0.09],
+        "Route km": [1.1, 3.3, 7.8, 10.0],
+    })
+
+
+@pytest.fixture
+def track():
+    """A straight route along the equator with a point every 0.01 degrees."""
+    longitudes = np.linspace(0.0, 0.1, 11)
+    return Track("Route", np.zeros(11), longitudes, np.full(11, np.nan), np.array([0]))
+
+
+def test_partition_file_name():
+    """Tests that the partition value is appended to the output file name."""
+    # Act & Assert: Plain values and values with unsafe characters.
+    assert partition_file_name("data/hotels.gpx", "Etappe", 3) == "data/hotels_Etappe_3.gpx"
+    assert partition_file_name("hotels.gpx", "Stadt", "Bad Urach/Nord") == "hotels_Stadt_Bad_Urach_Nord.gpx"
+
+
+def test_write_gpx_task(tmp_path, hotels, track):
+    """Tests that one GPX file is written with its track simplified to the limits."""
+    # Act: Write all hotels with the track reduced to two points.
+    output_file, written = write_gpx_task(hotels, str(tmp_path / "hotels.gpx"), None, track, (None, 2))
+
+    # Assert: Verify the waypoints and the simplified track.
+    assert (output_file, written) == (str(tmp_path / "hotels.gpx"), 4)
+    with open(output_file) as f:
+        gpx = gpxpy.parse(f)
+    assert [w.name for w in gpx.waypoints] == ["Hotel A", "Hotel B", "Hotel C", "Hotel D"]
+    assert len(gpx.tracks[0].segments[0].points) == 2
+
+
+def test_write_partitioned_gpx_files(tmp_path, hotels):
+    """Tests one file per stage, skipping rows without a stage."""
+    # Act: Split the hotels by stage.
+    partitions = write_partitioned_gpx_files(hotels, str(tmp_path / "hotels.gpx"))
+
+    # Assert: Verify the files and their waypoints.
+    assert partitions == [
+        (1.0, str(tmp_path / "hotels_Etappe_1.0.gpx"), 2),
+        (2.0, str(tmp_path / "hotels_Etappe_2.0.gpx"), 1),
+    ]
+    with open(partitions[0][1]) as f:
+        assert [w.name for w in gpxpy.parse(f).waypoints] == ["Hotel A", "Hotel B"]
+
+
+def test_write_partitioned_gpx_files_with_track_slices(tmp_path, hotels, track):
+    """Tests that every file gets the track between its lowest and highest route km.
+
+    Files written by the process pool must match the serial output.
+    """
+    # Arrange: Split by stage serially as the reference.
+    hotels = hotels.dropna(subset=["Etappe"]).astype({"Etappe": int})
+    serial_dir = tmp_path / "serial"
+    parallel_dir = tmp_path / "parallel"
+    serial_dir.mkdir()
+    parallel_dir.mkdir()
+    serial = write_partitioned_gpx_files(hotels, str(serial_dir / "hotels.gpx"), track=track)
+
+    # Act: Split with two worker processes.
+    parallel = write_partitioned_gpx_files(
+        hotels, str(parallel_dir / "hotels.gpx"), track=track, workers=2
+    )
+
+    # Assert: Verify the track slices and the identical files.
+    with open(serial[0][1]) as f:
+        gpx = gpxpy.parse(f)
+    assert gpx.tracks[0].name == "Route (Etappe 1)"
+    assert [p.longitude for p in gpx.tracks[0].segments[0].points] == [0.0, 0.01, 0.02, 0.03]
+    with open(serial[1][1]) as f:
+        points = gpxpy.parse(f).tracks[0].segments[0].points
+    assert [p.longitude for p in points] == [0.07, 0.08]
+    for (_, serial_file, _), (_, parallel_file, _) in zip(serial, parallel):
+        with open(serial_file, "rb") as a, open(parallel_file, "rb") as b:
+            assert a.read() == b.read()
+
+
+def test_write_partitioned_gpx_files_missing_column(tmp_path, hotels):
+    """Tests that an unknown split column raises a ValueError."""
+    with pytest.raises(ValueError):
+        write_partitioned_gpx_files(hotels, str(tmp_path / "hotels.gpx"), column="Region")
@@ -0,0 +1,111 @@
+"""Tests for the GPX track reader.
+
+This module contains unit tests for `read_track` and `dedupe_track` defined
+in `src.gpx_track_reader`, covering namespaced GPX input, multiple segments,
+missing elevations, empty segments and removal of consecutive duplicate
+points.
+"""
+
+import pytest
+import numpy as np
+import gpxpy
+from src.gpx_track_reader import dedupe_track, read_track
+from src.track_simplify import simplify_track
+
+TRACK_GPX = """<?xml version="1.0"?>
+<gpx xmlns="http://www.topografix.com/GPX/1/1" version="1.1" creator="test">
+  <metadata><name>Metadata name</name></metadata>
+  <wpt lat="1.0" lon="1.0"><name>Not a track point</name></wpt>
+  <trk>
+    <name>Test Route</name>
+    <trkseg>
+      <trkpt lat="48.0" lon="9.0"><ele>400</ele></trkpt>
+      <trkpt lat="48.0" lon="9.0"><ele>400</ele></trkpt>
+      <trkpt lat="48.1" lon="9.1"><ele>410.5</ele></trkpt>
+    </trkseg>
+    <trkseg>
+      <trkpt lat="48.1" lon="9.1"></trkpt>
+      <trkpt lat="48.2" lon="9.2"><ele>420</ele></trkpt>
+      <trkpt lat="48.2" lon="9.2"><ele>420</ele></trkpt>
+    </trkseg>
+  </trk>
+</gpx>
+"""
+
+
+@pytest.fixture
+def track_file(tmp_path):
+    """Writes the sample track to a temporary GPX file."""
+    path = tmp_path / "track.gpx"
+    path.write_text(TRACK_GPX)
+    return str(path)
+
+
+def test_read_track(track_file):
+    """Tests that track points, elevations, segments and the name are read.
+
+    It verifies that waypoints are ignored and missing elevations become NaN.
+    """
+    # Act: Read the track without deduplication.
+    track = read_track(track_file)
+
+    # Assert: Verify the arrays and metadata.
+    assert track.name == "Test Route"
+    np.testing.assert_array_equal(track.latitudes, [48.0, 48.0, 48.1, 48.1, 48.2, 48.2])
+    np.testing.assert_array_equal(track.longitudes, [9.0, 9.0, 9.1, 9.1, 9.2, 9.2])
+    np.testing.assert_array_equal(track.elevations, [400, 400, 410.5, np.nan, 420, 420])
+    np.testing.assert_array_equal(track.segment_starts, [0, 3])
+
+
+def test_read_track_dedupe(track_file):
+    """Tests that consecutive duplicates are removed within segments only.
+
+    The first point of the second segment repeats the last point of the first
+    segment and must be kept because it starts a new segment.
+    """
+    # Act: Read the track with deduplication.
+    track = read_track(track_file, dedupe=True)
+
+    # Assert: Verify the remaining points and the adjusted segment starts.
+    np.testing.assert_array_equal(track.latitudes, [48.0, 48.1, 48.1, 48.2])
+    np.testing.assert_array_equal(track.elevations, [400, 410.5, np.nan, 420])
+    np.testing.assert_array_equal(track.segment_starts, [0, 2])
+
+
+def test_read_track_skips_empty_segments(tmp_path):
+    """Tests that empty <trkseg> elements start no segment and can be simplified.
+
+    A trailing empty segment used to start a segment past the last point.
+    """
+    # Arrange: A track with an empty segment in the middle and at the end.
+    path = tmp_path / "track.gpx"
+    path.write_text(
+        TRACK_GPX.replace("</trkseg>\n    <trkseg>", "</trkseg><trkseg/>\n    <trkseg>")
+        .replace("</trkseg>\n  </trk>", "</trkseg><trkseg></trkseg>\n  </trk>")
+    )
+
+    # Act: Read and simplify the track.
+    track = read_track(str(path), dedupe=True)
+    simplified, _ = simplify_track(track, max_points=10)
+
+    # Assert: Only the two segments with points remain.
+    np.testing.assert_array_equal(track.segment_starts, [0, 2])
+    np.testing.assert_array_equal(simplified.segment_starts, [0, 2])
+
+
+def test_read_track_matches_gpxpy_on_route_file():
+    """Tests that the bundled route file is read exactly as gpxpy reads it."""
+    # Arrange: Parse the route with gpxpy as the reference.
+    path = "data/alb-crossing-gesamtroute.gpx"
+    with open(path) as f:
+        points = gpxpy.parse(f).tracks[0].segments[0].points
+
+    # Act: Read the route with the streaming reader.
+    track = read_track(path)
+    deduped = dedupe_track(track)
+
+    # Assert: Verify identical coordinates and fewer points after deduplication.
+    np.testing.assert_array_equal(track.latitudes, [p.latitude for p in points])
+    np.testing.assert_array_equal(track.longitudes, [p.longitude for p in points])
+    np.testing.assert_array_equal(track.elevations, [p.elevation for p in points])
+    assert len(deduped.latitudes) < len(track.latitudes)
@@ -0,0 +1,62 @@
+"""Tests for incremental geocoding.
+
+This module contains unit tests for `row_keys` and `load_previous_results`
+defined in `src.incremental`.
+"""
+
+import pytest
+import pandas as pd
+from src.incremental import load_previous_results, row_keys
+
+
+def test_row_keys_are_stable_and_address_based():
+    """Tests that row keys depend only on Betrieb, Straße and Stadt.
+
+    It verifies that other columns do not change the key while any change in
+    an address field does.
+    """
+    # Arrange: Two frames with identical addresses but different extra columns.
+    first = pd.DataFrame({
+        "Betrieb": ["Hotel A", "Hotel B"],
+        "Straße": ["Street A", None],
+        "Stadt": ["City A", "City B"],
+        "Telefon": ["1", "2"],
+    })
+    second = first.assign(Telefon=["3", "4"])
+    changed = first.assign(Straße=["Street X", None])
+
+    # Act: Compute the keys.
+    keys = row_keys(first)
+
+    # Assert: Verify stability and sensitivity to address changes.
+    assert list(keys) == list(row_keys(second))
+    assert keys[0] != row_keys(changed)[0]
+    assert keys[1] == row_keys(changed)[1]
+    assert keys[0] != keys[1]
+
+
+def test_load_previous_results(tmp_path):
+    """Tests that only previously geocoded rows are loaded for reuse."""
+    # Arrange: A previous output with one geocoded and one failed row.
+    path = tmp_path / "previous.csv"
+    previous = pd.DataFrame({
+        "Betrieb": ["Hotel A", "Hotel B"],
+        "Straße": ["Street A", "Street B"],
+        "Stadt": ["City A", "City B"],
+        "Latitude": [1.0, None],
+        "Longitude": [2.0, None],
+        "Geocode Template": ["{Straße}, {Stadt}", None],
+    })
+    previous.to_csv(path, sep=";", index=False)
+
+    # Act: Load the previous results.
+    results = load_previous_results(str(path))
+
+    # Assert: Verify only the geocoded row is reusable.
+    assert results == {row_keys(previous)[0]: (1.0, 2.0, "{Straße}, {Stadt}")}
+
+
+def test_load_previous_results_missing_file(tmp_path):
+    """Tests that a missing previous output yields no reusable rows."""
+    assert load_previous_results(str(tmp_path / "missing.csv")) == {}
+    assert load_previous_results(None) == {}
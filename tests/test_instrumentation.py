@@ -0,0 +1,75 @@
+"""Tests for the instrumentation module.
+
+This module contains unit tests for `Profiler` and `profiled` defined in
+`src.instrumentation`, covering stage timers, counters, request
+statistics, the JSON report and the measurements of a geocoding session.
+"""
+
+import json
+import os
+import pstats
+from unittest.mock import MagicMock
+from src.geocoding import GeocoderSession
+from src.instrumentation import Profiler, get_profiler, profiled
+
+
+def test_profiler_report():
+    """Tests that timers, counters and request timings are aggregated."""
+    # Arrange: A profiler with two calls of one stage and three requests.
+    profiler = Profiler()
+
+    # Act: Record measurements.
+    with profiler.stage("geocode"):
+        pass
+    profiler.add_time("geocode", 2.0)
+    profiler.count("requests", 3)
+    for seconds in (0.1, 0.3, 0.2):
+        profiler.record_request(seconds)
+    report = profiler.report()
+
+    # Assert: Verify the aggregated values.
+    assert report["stages"]["geocode"]["calls"] == 2
+    assert report["stages"]["geocode"]["seconds"] >= 2.0
+    assert report["counters"] == {"requests": 3}
+    assert report["requests"]["count"] == 3
+    assert report["requests"]["max_seconds"] == 0.3
+    assert report["requests"]["p50_seconds"] == 0.2
+
+
+def test_profiled_writes_report_and_cprofile_dump(tmp_path):
+    """Tests that a profiled run writes the JSON report and a readable cProfile dump."""
+    # Arrange: Output paths for both files.
+    report_file = tmp_path / "report.json"
+    cprofile_file = tmp_path / "run.prof"
+
+    # Act: Profile a small run.
+    with profiled(str(report_file), str(cprofile_file)):
+        with get_profiler().stage("work"):
+            sum(range(1000))
+
+    # Assert: Verify both files.
+    report = json.loads(report_file.read_text())
+    assert report["stages"]["work"]["calls"] == 1
+    assert report["total_seconds"] >= report["stages"]["work"]["seconds"]
+    assert pstats.Stats(str(cprofile_file)).total_calls > 0
+
+
+def test_session_counts_requests_and_rate_limit_waits():
+    """Tests that a geocoding session reports requests, misses and waiting time."""
+    # Arrange: A backend that finds one of two addresses and a limiter that waits 0.5 s.
+    backend = MagicMock()
+    backend.geocode.side_effect = [(1.0, 2.0), None]
+    limiter = MagicMock()
+    limiter.acquire.return_value = 0.5
+    session = GeocoderSession(backend, rate_limiter=limiter)
+
+    # Act: Geocode within a profiled run.
+    with profiled() as profiler:
+        session.geocode("Found")
+        session.geocode("Missing")
+
+    # Assert: Verify the counters, the request timings and the waiting time.
+    report = profiler.report()
+    assert report["counters"] == {"requests": 2, "not_found": 1}
+    assert report["requests"]["count"] == 2
+    assert report["stages"]["geocode.rate_limit_wait"] == {"seconds": 1.0, "calls": 2}
@@ -4,37 +4,48 @@ This module contains unit tests for the functions defined in `src.main`,
 including CSV loading and the main execution flow.
 """
 
+import logging
 import pytest
 import pandas as pd
 import os
+import subprocess
+import sys
 from unittest.mock import patch, MagicMock
 import numpy as np # Import numpy
-from src.main import load_hotels_from_csv, run_main
+import gpxpy
+from src.main import geocode_hotels, load_hotels_from_csv, run_main
+from src.geocoding import GeocoderSession
+from src.geocoding_engine import GeocodingUnavailableError, TransientGeocodingError
 
-@patch('src.main.pd.read_csv')
-def test_load_hotels_from_csv_success(mock_read_csv):
-    """Tests that load_hotels_from_csv successfully loads a CSV file.
+def test_load_hotels_from_csv_success(tmp_path):
+    """Tests that load_hotels_from_csv loads a CSV file normalized to the hotel schema.
 
-    It mocks pandas.read_csv to control its return value and verifies
-    that the function calls read_csv with the correct arguments and returns
-    the expected DataFrame.
+    It writes a small hotel CSV with a title row and a repeated header and
+    verifies that only the hotel rows are returned, with typed columns.
     """
-    # Arrange: Set up the mock DataFrame and the mock's return value.
-    mock_df = pd.DataFrame({'col1': [1, 2], 'col2': [3, 4]})
-    mock_read_csv.return_value = mock_df
-    file_path = "dummy.csv"
+    # Arrange: Write a CSV as extracted from the PDF.
+    file_path = tmp_path / "hotels.csv"
+    file_path.write_text(
+        "Gastgeber;;\n"
+        "Etappe;Stadt;Betrieb\n"
+        "1;Aalen;Hotel A\n"
+        "Etappe;Stadt;Betrieb\n"
+        "2;Bopfingen;Hotel B\n",
+        encoding="utf-8",
+    )
 
     # Act: Call the function under test.
-    result_df = load_hotels_from_csv(file_path)
+    result_df = load_hotels_from_csv(str(file_path))
 
-    # Assert: Verify the mock was called correctly and the result is as expected.
-    mock_read_csv.assert_called_once_with(file_path, sep=";")
-    pd.testing.assert_frame_equal(result_df, mock_df)
+    # Assert: Verify the hotel rows and the stage type.
+    assert list(result_df.columns) == ["Etappe", "Stadt", "Betrieb"]
+    assert result_df["Betrieb"].tolist() == ["Hotel A", "Hotel B"]
+    assert result_df["Etappe"].tolist() == ["1", "2"]
 
-def test_load_hotels_from_csv_file_not_found(capsys):
+def test_load_hotels_from_csv_file_not_found(caplog):
     """Tests that load_hotels_from_csv handles FileNotFoundError correctly.
 
-    It verifies that the function returns None and prints an error message
+    It verifies that the function returns None and logs an error message
     when the specified CSV file does not exist.
     """
     # Arrange: Define a non-existent file path.
@@ -43,23 +54,22 @@ def test_load_hotels_from_csv_file_not_found(capsys):
     # Act: Call the function under test.
     result_df = load_hotels_from_csv(file_path)
 
-    # Assert: Verify the function returns None and the correct error message is printed.
+    # Assert: Verify the function returns None and the correct error message is logged.
     assert result_df is None
-    captured = capsys.readouterr()
-    assert f"Error: The file {file_path} was not found." in captured.out
+    assert f"The file {file_path} was not found." in caplog.text
+    assert caplog.records[-1].levelname == "ERROR"
 
 @patch('src.main.load_dotenv')
 @patch('src.main.os.getenv')
 @patch('src.main.load_hotels_from_csv')
-@patch('src.main.get_gps_coordinates')
-@patch('src.main.create_gpx_file')
+@patch('src.gpx_generator.create_gpx_file')
 def test_main_execution_flow(
     mock_create_gpx_file,
-    mock_get_gps_coordinates,
     mock_load_hotels_from_csv,
     mock_os_getenv,
     mock_load_dotenv,
-    capsys
+    caplog,
+    tmp_path
 ):
     """Tests the complete execution flow of the run_main function.
 
@@ -70,11 +80,13 @@ def test_main_execution_flow(
     """
     # Arrange: Set up mock return values and side effects for all external dependencies.
     # Mock environment variables that run_main will try to retrieve.
-    mock_os_getenv.side_effect = lambda key: {
+    mock_os_getenv.side_effect = lambda key, default=None: {
         "GPX_FILE": "output.gpx",
         "CSV_FILE": "input.csv",
         "CSV_W_COOR_FILE": "output_w_coor.csv",
-    }.get(key)
+        "GEOCODE_JOURNAL_FILE": str(tmp_path / "journal.jsonl"),
+        "NOT_FOUND_REPORT_FILE": str(tmp_path / "not_found.txt"),
+    }.get(key, default)
 
     # Mock the initial DataFrame that load_hotels_from_csv would return.
     # It includes NaN values for Latitude and Longitude, explicitly typed as float64
@@ -94,22 +106,24 @@ def test_main_execution_flow(
     # This allows us to verify that to_csv is called with the correct arguments.
     initial_hotels_df.to_csv = MagicMock()
 
-    # Mock geocoding responses for get_gps_coordinates.
-    # The side_effect list simulates different geocoding scenarios for each hotel:
+    # Mock the injected geocoder session and its geocoding responses.
+    # Rows are geocoded concurrently, so responses are keyed by address:
     # - Hotel A: Full address geocodes successfully.
     # - Hotel B: Full address fails, but street+city geocodes successfully.
     # - Hotel C: Full address fails, street+city fails, but business+city geocodes successfully.
-    mock_get_gps_coordinates.side_effect = [
-        (10.0, 20.0),  # Hotel A: Full address success
-        None,          # Hotel B: Full address fail
-        (30.0, 40.0),  # Hotel B: Street+City success
-        None,          # Hotel C: Full address fail
-        None,          # Hotel C: Street+City fail
-        (50.0, 60.0),  # Hotel C: Business+City success
-    ]
+    geocode_responses = {
+        "Hotel A, Street A, City A, Germany": (10.0, 20.0),  # Hotel A: Full address success
+        "Street B, City B, Germany": (30.0, 40.0),  # Hotel B: Street+City success
+        "Hotel C, City C, Germany": (50.0, 60.0),  # Hotel C: Business+City success
+    }
+    backend = MagicMock()
+    backend.geocode.side_effect = geocode_responses.get
+    session = GeocoderSession(backend, workers=4)
+
+    caplog.set_level(logging.DEBUG, logger="src")
 
     # Act: Execute the main function.
-    run_main()
+    run_main(session=session)
 
     # Assert: Verify that all mocked functions were called correctly and the outputs are as expected.
     # Verify that dotenv was loaded.
@@ -122,9 +136,10 @@ def test_main_execution_flow(
     mock_load_hotels_from_csv.assert_called_once_with("input.csv")
 
     # Verify geocoding calls for each address variation.
-    mock_get_gps_coordinates.assert_any_call("Hotel A, Street A, City A, Germany")
-    mock_get_gps_coordinates.assert_any_call("Street B, City B, Germany")
-    mock_get_gps_coordinates.assert_any_call("Hotel C, City C, Germany")
+    backend.geocode.assert_any_call("Hotel A, Street A, City A, Germany")
+    backend.geocode.assert_any_call("Street B, City B, Germany")
+    backend.geocode.assert_any_call("Hotel C, City C, Germany")
+    assert backend.geocode.call_count == 6
 
     # Verify that the to_csv method on the DataFrame was called exactly once.
     initial_hotels_df.to_csv.assert_called_once()
@@ -146,18 +161,338 @@ def test_main_execution_flow(
         "Stadt": ["City A", "City B", "City C"],
         "Latitude": [10.0, 30.0, 50.0],
         "Longitude": [20.0, 40.0, 60.0],
-    })
+        "Geocode Template": [
+            "{Betrieb}, {Straße}, {Stadt}, Germany",
+            "{Straße}, {Stadt}, Germany",
+            "{Betrieb}, {Stadt}, Germany",
+        ],
+    }).astype({"Geocode Template": object})
     # Assert that the DataFrame modified in-place by run_main matches the expected output.
     pd.testing.assert_frame_equal(initial_hotels_df, expected_output_df)
 
     # Verify that the GPX file creation function was called with the final DataFrame and correct filename.
-    mock_create_gpx_file.assert_called_once_with(initial_hotels_df, "output.gpx")
-
-    # Verify key messages printed to the console using capsys.
-    captured = capsys.readouterr()
-    assert "Hotels loaded from CSV:" in captured.out
-    assert "Geocoded: Hotel A, Street A, City A, Germany (10.0, 20.0)" in captured.out
-    assert "Geocoded: Street B, City B, Germany (30.0, 40.0)" in captured.out
-    assert "Geocoded: Hotel C, City C, Germany (50.0, 60.0)" in captured.out
-    assert "Hotels with GPS coordinates:3 out of 3" in captured.out
-    assert "GPX file 'output.gpx' created successfully." in captured.out
+    mock_create_gpx_file.assert_called_once_with(initial_hotels_df, "output.gpx", track=None)
+
+    # Verify the key log messages.
+    assert "Hotels loaded from CSV:" in caplog.text
+    assert "Geocoded: Hotel A, Street A, City A, Germany (10.0, 20.0)" in caplog.text
+    assert "Geocoded: Street B, City B, Germany (30.0, 40.0)" in caplog.text
+    assert "Geocoded: Hotel C, City C, Germany (50.0, 60.0)" in caplog.text
+    assert "Hotels with GPS coordinates:3 out of 3" in caplog.text
+    assert "GPX file 'output.gpx' created successfully." in caplog.text
+
+
+@patch('src.main.load_dotenv')
+@patch('src.gpx_generator.create_gpx_file')
+def test_main_incremental_only_geocodes_changed_rows(mock_create_gpx_file, mock_load_dotenv, tmp_path, caplog):
+    """Tests that incremental mode reuses coordinates from the previous output.
+
+    The previous output holds one unchanged hotel and one hotel whose street
+    has since changed; only the changed and the new hotel must be geocoded.
+    """
+    # Arrange: Write the new input and the previous output files.
+    csv_file = tmp_path / "hotels.csv"
+    csv_w_coor_file = tmp_path / "hotelswithcoor.csv"
+    pd.DataFrame({
+        "Betrieb": ["Hotel A", "Hotel B", "Hotel C"],
+        "Straße": ["Street A", "New Street B", "Street C"],
+        "Stadt": ["City A", "City B", "City C"],
+    }).to_csv(csv_file, sep=";", index=False)
+    pd.DataFrame({
+        "Betrieb": ["Hotel A", "Hotel B"],
+        "Straße": ["Street A", "Street B"],
+        "Stadt": ["City A", "City B"],
+        "Latitude": [1.0, 2.0],
+        "Longitude": [1.5, 2.5],
+        "Geocode Template": ["{Betrieb}, {Straße}, {Stadt}, Germany"] * 2,
+    }).to_csv(csv_w_coor_file, sep=";", index=False)
+
+    backend = MagicMock()
+    backend.geocode.return_value = (9.0, 9.5)
+    session = GeocoderSession(backend)
+    env = {
+        "CSV_FILE": str(csv_file),
+        "CSV_W_COOR_FILE": str(csv_w_coor_file),
+        "GPX_FILE": str(tmp_path / "hotels.gpx"),
+        "GEOCODE_INCREMENTAL": "1",
+        "ADDRESS_TEMPLATES": "",
+    }
+
+    caplog.set_level(logging.DEBUG, logger="src")
+
+    # Act: Run the main function in incremental mode.
+    with patch.dict(os.environ, env):
+        run_main(session=session)
+
+    # Assert: Verify only the changed and new rows reached the geocoder.
+    assert sorted(call.args[0] for call in backend.geocode.call_args_list) == [
+        "Hotel B, New Street B, City B, Germany",
+        "Hotel C, Street C, City C, Germany",
+    ]
+    result = pd.read_csv(csv_w_coor_file, sep=";")
+    assert list(result["Latitude"]) == [1.0, 9.0, 9.0]
+    assert list(result["Longitude"]) == [1.5, 9.5, 9.5]
+    assert "Reused coordinates for 1 unchanged hotels, geocoding 2 new or changed hotels." in caplog.text
+    assert "Hotels with GPS coordinates:3 out of 3" in caplog.text
+
+
+@patch('src.main.load_dotenv')
+@patch('src.gpx_generator.create_gpx_file')
+def test_main_resume_after_interruption(mock_create_gpx_file, mock_load_dotenv, tmp_path, caplog):
+    """Tests that --resume continues an interrupted run from its journal.
+
+    The first run is interrupted while geocoding the third hotel. The resumed
+    run must not request the two hotels recorded in the journal again, and
+    the journal is removed once the output has been written.
+    """
+    # Arrange: Write the input file and a backend that fails on Hotel C.
+    csv_file = tmp_path / "hotels.csv"
+    csv_w_coor_file = tmp_path / "hotelswithcoor.csv"
+    pd.DataFrame({
+        "Betrieb": ["Hotel A", "Hotel B", "Hotel C"],
+        "Straße": ["Street A", "Street B", "Street C"],
+        "Stadt": ["City A", "City B", "City C"],
+    }).to_csv(csv_file, sep=";", index=False)
+    env = {
+        "CSV_FILE": str(csv_file),
+        "CSV_W_COOR_FILE": str(csv_w_coor_file),
+        "GPX_FILE": str(tmp_path / "hotels.gpx"),
+        "ADDRESS_TEMPLATES": "{Betrieb}, {Stadt}",
+        "GEOCODE_JOURNAL_FILE": "",
+        "GEOCODE_INCREMENTAL": "",
+        "GEOCODE_CHECKPOINT_EVERY": "1",
+        "GEOCODE_BATCH_SIZE": "1",
+    }
+
+    def interrupted_geocode(address):
+        if address == "Hotel C, City C":
+            raise KeyboardInterrupt
+        return (1.0, 2.0) if address == "Hotel A, City A" else None
+
+    first_backend = MagicMock()
+    first_backend.geocode.side_effect = interrupted_geocode
+    second_backend = MagicMock()
+    second_backend.geocode.return_value = (5.0, 6.0)
+
+    caplog.set_level(logging.DEBUG, logger="src")
+
+    with patch.dict(os.environ, env):
+        # Act: Run until the interruption, then resume.
+        with pytest.raises(KeyboardInterrupt):
+            run_main(session=GeocoderSession(first_backend))
+        assert not csv_w_coor_file.exists()
+        run_main(session=GeocoderSession(second_backend), resume=True)
+
+    # Assert: Verify only the interrupted hotel was requested again.
+    second_backend.geocode.assert_called_once_with("Hotel C, City C")
+    result = pd.read_csv(csv_w_coor_file, sep=";")
+    assert list(result["Latitude"].fillna(0)) == [1.0, 0, 5.0]
+    assert not os.path.exists(f"{csv_w_coor_file}.journal")
+    assert "Resumed 2 hotels from" in caplog.text
+    assert "Could absolutely not geocode: Hotel B, City B" in caplog.text
+    assert "Hotels with GPS coordinates:2 out of 3" in caplog.text
+
+
+def test_run_main_corridor(tmp_path, caplog):
+    """Tests that corridor mode drops far hotels from the GPX file only.
+
+    The CSV output keeps every hotel together with its route columns, while
+    the GPX file only contains the hotel within the buffer. The summary
+    reports the dropped hotels per reason.
+    """
+    # Arrange: A straight route along the equator and three hotels.
+    route_file = tmp_path / "route.gpx"
+    route_file.write_text(
+        '<?xml version="1.0"?><gpx version="1.1" creator="test"><trk><trkseg>'
+        '<trkpt lat="0.0" lon="0.0"></trkpt><trkpt lat="0.0" lon="0.1"></trkpt>'
+        "</trkseg></trk></gpx>"
+    )
+    csv_file = tmp_path / "hotels.csv"
+    csv_w_coor_file = tmp_path / "hotelswithcoor.csv"
+    gpx_file = tmp_path / "hotels.gpx"
+    pd.DataFrame({
+        "Betrieb": ["Near", "Far", "Unknown"],
+        "Straße": ["Street A", "Street B", "Street C"],
+        "Stadt": ["City A", "City B", "City C"],
+    }).to_csv(csv_file, sep=";", index=False)
+    env = {
+        "CSV_FILE": str(csv_file),
+        "CSV_W_COOR_FILE": str(csv_w_coor_file),
+        "GPX_FILE": str(gpx_file),
+        "ADDRESS_TEMPLATES": "{Betrieb}",
+        "GEOCODE_JOURNAL_FILE": "",
+        "GEOCODE_INCREMENTAL": "",
+        "ROUTE_GPX_FILE": str(route_file),
+        "CORRIDOR_BUFFER_KM": "2",
+    }
+    backend = MagicMock()
+    backend.geocode.side_effect = {"Near": (0.01, 0.05), "Far": (0.1, 0.05)}.get
+
+    caplog.set_level(logging.DEBUG, logger="src")
+
+    with patch.dict(os.environ, env):
+        # Act: Run the pipeline in corridor mode.
+        run_main(session=GeocoderSession(backend))
+
+    # Assert: Verify the CSV, the GPX waypoints and the summary.
+    result = pd.read_csv(csv_w_coor_file, sep=";")
+    assert list(result["Route Distance km"].fillna(-1)) == [1.11, 11.12, -1]
+    assert list(result["Route km"].fillna(-1)) == [5.6, 5.6, -1]
+    with open(gpx_file) as f:
+        waypoints = gpxpy.parse(f).waypoints
+    assert [waypoint.name for waypoint in waypoints] == ["Near"]
+    assert "Corridor of 2 km: kept 1 out of 3 hotels" in caplog.text
+    assert "  1 dropped: more than 2 km from the route" in caplog.text
+    assert "  1 dropped: no coordinates" in caplog.text
+
+
+def test_geocode_hotels_summary(tmp_path, caplog):
+    """Tests that geocode_hotels returns its counters in a GeocodeSummary.
+
+    The addresses that were not found are written to the report next to
+    the output file, and the table is only logged in full at DEBUG level.
+    """
+    # Arrange: One hotel found, one not found and one without a city.
+    hotels_df = pd.DataFrame({
+        "Betrieb": ["Hotel A", "Hotel B", "Hotel C"],
+        "Stadt": ["City A", "City B", None],
+    })
+    backend = MagicMock()
+    backend.geocode.side_effect = lambda address: (1.0, 2.0) if address == "Hotel A, City A" else None
+    csv_w_coor_file = str(tmp_path / "hotelswithcoor.csv")
+    env = {
+        "ADDRESS_TEMPLATES": "{Betrieb}, {Stadt}",
+        "GEOCODE_JOURNAL_FILE": "",
+        "GEOCODE_INCREMENTAL": "",
+        "NOT_FOUND_REPORT_FILE": "",
+    }
+    caplog.set_level(logging.INFO, logger="src")
+
+    # Act: Geocode at INFO level.
+    with patch.dict(os.environ, env):
+        result_df, summary = geocode_hotels(
+            hotels_df, GeocoderSession(backend), csv_w_coor_file=csv_w_coor_file
+        )
+
+    # Assert: Verify the columns, the counters, the report and the log.
+    report_file = f"{csv_w_coor_file}.not_found.txt"
+    assert list(result_df["Latitude"].fillna(0)) == [1.0, 0, 0]
+    assert summary.found == 1
+    assert summary.skipped == 1
+    assert summary.not_found.count == 2
+    with open(report_file, encoding="utf-8") as f:
+        assert f.read() == "Hotel B, City B\nrow 2 (missing address fields)\n"
+    assert summary.lines()[0] == "Hotels with GPS coordinates:1 out of 3"
+    assert f"Hotels not found: 2, listed in '{report_file}'" in caplog.text
+    assert "Could absolutely not geocode" not in caplog.text
+    assert "Geocode Template" not in caplog.text
+
+
+def test_geocode_hotels_reports_same_address_when_resumed(tmp_path):
+    """Tests that a hotel not found is reported under the same address with and without --resume."""
+    # Arrange: A hotel that no template finds, and a journal file.
+    hotels_df = pd.DataFrame({"Betrieb": ["Hotel B"], "Stadt": ["City B"]})
+    backend = MagicMock()
+    backend.geocode.return_value = None
+    csv_w_coor_file = str(tmp_path / "hotelswithcoor.csv")
+    report_file = f"{csv_w_coor_file}.not_found.txt"
+    env = {
+        "ADDRESS_TEMPLATES": "{Betrieb}, {Stadt}|{Stadt}",
+        "GEOCODE_JOURNAL_FILE": "",
+        "GEOCODE_INCREMENTAL": "",
+        "NOT_FOUND_REPORT_FILE": "",
+    }
+
+    with patch.dict(os.environ, env):
+        # Act: Geocode, then resume from the journal of that run.
+        geocode_hotels(hotels_df.copy(), GeocoderSession(backend), csv_w_coor_file=csv_w_coor_file)
+        with open(report_file, encoding="utf-8") as f:
+            fresh_report = f.read()
+        geocode_hotels(
+            hotels_df.copy(), GeocoderSession(MagicMock()), resume=True, csv_w_coor_file=csv_w_coor_file
+        )
+        with open(report_file, encoding="utf-8") as f:
+            resumed_report = f.read()
+
+    # Assert: Both reports list the first address that was tried.
+    assert fresh_report == resumed_report == "Hotel B, City B\n"
+
+
+def test_geocode_hotels_stops_on_unavailable_service(tmp_path):
+    """Tests that a transient failure does not fall through to the next template.
+
+    The hotel must not be reported as not found; instead the run stops and
+    the rows resolved so far stay in the checkpoint journal for --resume.
+    """
+    # Arrange: Hotel A is found, requests for Hotel B keep timing out.
+    hotels_df = pd.DataFrame({
+        "Betrieb": ["Hotel A", "Hotel B"],
+        "Stadt": ["City A", "City B"],
+    })
+
+    def geocode(address):
+        if address.startswith("Hotel B"):
+            raise TransientGeocodingError("timed out")
+        return (1.0, 2.0)
+
+    backend = MagicMock()
+    backend.geocode.side_effect = geocode
+    csv_w_coor_file = str(tmp_path / "hotelswithcoor.csv")
+    env = {
+        "ADDRESS_TEMPLATES": "{Betrieb}, {Stadt}|{Stadt}",
+        "GEOCODE_JOURNAL_FILE": "",
+        "GEOCODE_INCREMENTAL": "",
+        "GEOCODE_BATCH_SIZE": "1",
+        "NOT_FOUND_REPORT_FILE": "",
+    }
+
+    # Act: Geocode until the service gives up.
+    with patch.dict(os.environ, env):
+        with pytest.raises(GeocodingUnavailableError):
+            geocode_hotels(hotels_df, GeocoderSession(backend), csv_w_coor_file=csv_w_coor_file)
+
+    # Assert: Verify no fallback request, an empty report and the journal.
+    assert [call.args[0] for call in backend.geocode.call_args_list] == [
+        "Hotel A, City A", "Hotel B, City B",
+    ]
+    with open(f"{csv_w_coor_file}.not_found.txt", encoding="utf-8") as f:
+        assert f.read() == ""
+    with open(f"{csv_w_coor_file}.journal", encoding="utf-8") as f:
+        assert "Hotel A, City A" in f.read()
+
+
+def test_main_module_logs_summary(tmp_path):
+    """Tests that `python -m src.main` logs its summary at the default INFO level.
+
+    Under `-m` the module runs as `__main__`, so its logger must still be
+    part of the `src` hierarchy that `configure_logging` sets up.
+    """
+    # Arrange: Two hotels and an offline gazetteer that knows one of them.
+    csv_file = tmp_path / "hotels.csv"
+    csv_file.write_text("Etappe;Stadt;Betrieb\n1;Aalen;Hotel A\n1;Ulm;Hotel B\n", encoding="utf-8")
+    gazetteer = tmp_path / "gazetteer.csv"
+    gazetteer.write_text("Address;Latitude;Longitude\nHotel A, Aalen;48.8;10.1\n", encoding="utf-8")
+    env = {
+        key: value for key, value in os.environ.items()
+        if not key.startswith(("GEOCODE", "GPX_", "ROUTE_", "CORRIDOR_", "LOG_", "NOT_FOUND"))
+    }
+    env.update({
+        "CSV_FILE": str(csv_file),
+        "CSV_W_COOR_FILE": str(tmp_path / "hotelswithcoor.csv"),
+        "GPX_FILE": str(tmp_path / "hotels.gpx"),
+        "GEOCODER_BACKEND": "gazetteer",
+        "GAZETTEER_FILE": str(gazetteer),
+        "ADDRESS_TEMPLATES": "{Betrieb}, {Stadt}",
+    })
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    # Act: Run the module in a fresh interpreter.
+    result = subprocess.run(
+        [sys.executable, "-m", "src.main"], cwd=root, env=env, capture_output=True, text=True
+    )
+
+    # Assert: Verify the summary lines on stderr.
+    assert result.returncode == 0, result.stderr
+    assert "Hotels with GPS coordinates:1 out of 2" in result.stderr
+    assert "Hotels not found: 1" in result.stderr
+    assert "created successfully" in result.stderr
@@ -6,12 +6,15 @@ errors, and exceptions during the conversion process.
 """
 
 import pytest
+import logging
 import os
 from unittest.mock import patch, MagicMock
 import pandas as pd
-from src.pdf2csv import convert_pdf_to_csv
+from concurrent.futures import ThreadPoolExecutor
+from src.pdf2csv import _read_pages, convert_pdf_to_csv, page_shards
+from src.pdf_cache import PdfTableCache
 
-@patch('src.pdf2csv.tabula.read_pdf')
+@patch('tabula.read_pdf')
 def test_convert_pdf_to_csv_success(mock_read_pdf, tmp_path):
     """Tests that convert_pdf_to_csv successfully converts a PDF to CSV.
 
@@ -61,7 +64,7 @@ def test_convert_pdf_to_csv_file_not_found(tmp_path, capsys):
     captured = capsys.readouterr()
     assert f"Error: The PDF file '{pdf_path}' was not found." in captured.out
 
-@patch('src.pdf2csv.tabula.read_pdf')
+@patch('tabula.read_pdf')
 def test_convert_pdf_to_csv_tabula_exception(mock_read_pdf, tmp_path, capsys):
     """Tests that convert_pdf_to_csv handles exceptions from tabula.read_pdf.
 
@@ -83,7 +86,7 @@ def test_convert_pdf_to_csv_tabula_exception(mock_read_pdf, tmp_path, capsys):
     captured = capsys.readouterr()
     assert "An error occurred during PDF to CSV conversion: Tabula error" in captured.out
 
-@patch('src.pdf2csv.tabula.read_pdf')
+@patch('tabula.read_pdf')
 def test_convert_pdf_to_csv_overwrites_existing_file(mock_read_pdf, tmp_path):
     """Tests that convert_pdf_to_csv overwrites an existing CSV file.
 
@@ -123,7 +126,7 @@ def test_convert_pdf_to_csv_file_not_found(tmp_path, capsys):
     captured = capsys.readouterr()
     assert f"Error: The PDF file '{pdf_path}' was not found." in captured.out
 
-@patch('src.pdf2csv.tabula.read_pdf')
+@patch('tabula.read_pdf')
 def test_convert_pdf_to_csv_tabula_exception(mock_read_pdf, tmp_path, capsys):
     # Arrange
     pdf_path = tmp_path / "test.pdf"
@@ -140,7 +143,7 @@ def test_convert_pdf_to_csv_tabula_exception(mock_read_pdf, tmp_path, capsys):
     captured = capsys.readouterr()
     assert "An error occurred during PDF to CSV conversion: Tabula error" in captured.out
 
-@patch('src.pdf2csv.tabula.read_pdf')
+@patch('tabula.read_pdf')
 def test_convert_pdf_to_csv_overwrites_existing_file(mock_read_pdf, tmp_path):
     # Arrange
     pdf_path = tmp_path / "test.pdf"
@@ -160,3 +163,160 @@ def test_convert_pdf_to_csv_overwrites_existing_file(mock_read_pdf, tmp_path):
         content = f.read()
         assert content == "col1;col2\nnew;100\n"
 
+
+
+def test_page_shards():
+    """Tests that pages are split into consecutive tabula page ranges."""
+    # Act & Assert: A partial last shard and a single shard.
+    assert page_shards(25, 10) == ["1-10", "11-20", "21-25"]
+    assert page_shards(3, 10) == ["1-3"]
+
+
+@patch('src.pdf2csv.ProcessPoolExecutor', ThreadPoolExecutor)
+@patch('src.pdf2csv.count_pdf_pages', return_value=25)
+@patch('tabula.read_pdf')
+def test_convert_pdf_to_csv_shards_pages(mock_read_pdf, mock_count_pdf_pages, tmp_path):
+    """Tests that a long PDF is read in page ranges and written in page order.
+
+    The process pool is replaced by a thread pool so that the mocked tabula
+    is used by the workers.
+    """
+    # Arrange: Return one table per shard, named after its page range.
+    pdf_path = tmp_path / "test.pdf"
+    csv_path = tmp_path / "output.csv"
+    pdf_path.write_text("dummy pdf content")
+    mock_read_pdf.side_effect = lambda path, pages, multiple_tables: [
+        pd.DataFrame({"Pages": [pages]})
+    ]
+
+    # Act: Convert with three workers and ten pages per shard.
+    convert_pdf_to_csv(str(pdf_path), str(csv_path), workers=3, pages_per_shard=10)
+
+    # Assert: Verify every shard was read once and the output order.
+    assert sorted(call.kwargs["pages"] for call in mock_read_pdf.call_args_list) == [
+        "1-10", "11-20", "21-25"
+    ]
+    assert csv_path.read_text() == "Pages\n1-10\n11-20\n21-25\n"
+
+
+@patch('tabula.read_pdf')
+def test_convert_pdf_to_csv_normalizes_hotel_tables(mock_read_pdf, tmp_path):
+    """Tests that hotel tables are written as one table without repeated page headers."""
+    # Arrange: A title table followed by two pages of hotels.
+    pdf_path = tmp_path / "test.pdf"
+    csv_path = tmp_path / "output.csv"
+    pdf_path.write_text("dummy pdf content")
+    mock_read_pdf.return_value = [
+        pd.DataFrame({"Gastgeber am Alb-Crossing": ["Etappe"], "Unnamed: 1": ["Betrieb"]}),
+        pd.DataFrame({"Etappe": [1], "Betrieb": ["Hotel A"]}),
+        pd.DataFrame({"Etappe": [2], "Betrieb": ["Hotel B"]}),
+    ]
+
+    # Act: Call the function under test.
+    convert_pdf_to_csv(str(pdf_path), str(csv_path), workers=1)
+
+    # Assert: Verify a single header and both hotels.
+    assert csv_path.read_text() == "Etappe;Betrieb\n1;Hotel A\n2;Hotel B\n"
+
+
+@patch('src.pdf2csv.page_digests', return_value=None)
+@patch('tabula.read_pdf')
+def test_convert_pdf_to_csv_uses_file_cache(mock_read_pdf, mock_page_digests, tmp_path, caplog):
+    """Tests that an unchanged PDF is not extracted again when cached as a whole."""
+    # Arrange: A PDF and a cache directory.
+    caplog.set_level(logging.INFO, logger="src")
+    pdf_path = tmp_path / "test.pdf"
+    csv_path = tmp_path / "output.csv"
+    pdf_path.write_text("dummy pdf content")
+    cache = PdfTableCache(str(tmp_path / "cache"))
+    mock_read_pdf.return_value = [pd.DataFrame({"col1": ["a"]})]
+
+    # Act: Convert twice.
+    convert_pdf_to_csv(str(pdf_path), str(csv_path), workers=1, cache=cache)
+    csv_path.unlink()
+    convert_pdf_to_csv(str(pdf_path), str(csv_path), workers=1, cache=cache)
+
+    # Assert: tabula ran once and the second CSV comes from the cache.
+    mock_read_pdf.assert_called_once()
+    assert csv_path.read_text() == "col1\na\n"
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert "PDF table cache: 1 hits, 1 misses" in caplog.messages
+
+
+@patch('src.pdf2csv._shares_jvm', return_value=True)
+@patch('src.pdf2csv.page_digests')
+@patch('tabula.read_pdf')
+def test_convert_pdf_to_csv_extracts_only_changed_pages(
+    mock_read_pdf, mock_page_digests, mock_shares_jvm, tmp_path
+):
+    """Tests that only pages with a new digest are extracted again, one call per page."""
+    # Arrange: Name each table after its page; the second page changes between runs.
+    pdf_path = tmp_path / "test.pdf"
+    csv_path = tmp_path / "output.csv"
+    pdf_path.write_text("dummy pdf content")
+    cache = PdfTableCache(str(tmp_path / "cache"))
+    mock_read_pdf.side_effect = lambda path, pages, multiple_tables: [
+        pd.DataFrame({"Page": [f"{pages}-{mock_page_digests.return_value[int(pages) - 1]}"]})
+    ]
+
+    # Act: Convert, then convert again after the second page changed.
+    mock_page_digests.return_value = ["a", "b", "c"]
+    convert_pdf_to_csv(str(pdf_path), str(csv_path), workers=1, cache=cache)
+    mock_read_pdf.reset_mock()
+    mock_page_digests.return_value = ["a", "x", "c"]
+    convert_pdf_to_csv(str(pdf_path), str(csv_path), workers=1, cache=cache)
+
+    # Assert: Only page 2 was read again and the pages stay in order.
+    assert [call.kwargs["pages"] for call in mock_read_pdf.call_args_list] == ["2"]
+    assert csv_path.read_text() == "Page\n1-a\n2-x\n3-c\n"
+
+
+@patch('src.pdf2csv._shares_jvm', return_value=False)
+@patch('src.pdf2csv.page_digests')
+@patch('tabula.read_pdf')
+def test_convert_pdf_to_csv_without_jpype_extracts_whole_file_on_cold_cache(
+    mock_read_pdf, mock_page_digests, mock_shares_jvm, tmp_path
+):
+    """Tests that a cold page cache without jpype is filled by one call, not one JVM per page."""
+    # Arrange: A three-page PDF with nothing cached.
+    pdf_path = tmp_path / "test.pdf"
+    csv_path = tmp_path / "output.csv"
+    pdf_path.write_text("dummy pdf content")
+    cache = PdfTableCache(str(tmp_path / "cache"))
+    mock_page_digests.return_value = ["a", "b", "c"]
+    mock_read_pdf.return_value = [pd.DataFrame({"col1": ["a"]})]
+
+    # Act: Convert twice.
+    convert_pdf_to_csv(str(pdf_path), str(csv_path), workers=1, cache=cache)
+    convert_pdf_to_csv(str(pdf_path), str(csv_path), workers=1, cache=cache)
+
+    # Assert: The whole file was read once and then came from the cache.
+    assert [call.kwargs["pages"] for call in mock_read_pdf.call_args_list] == ["all"]
+    assert csv_path.read_text() == "col1\na\n"
+
+
+@patch('src.pdf2csv.ProcessPoolExecutor', ThreadPoolExecutor)
+@patch('src.pdf2csv._shares_jvm', return_value=True)
+@patch('src.pdf2csv.page_digests', return_value=[str(page) for page in range(1, 6)])
+@patch('tabula.read_pdf')
+def test_convert_pdf_to_csv_reads_missing_pages_in_chunks(
+    mock_read_pdf, mock_page_digests, mock_shares_jvm, tmp_path
+):
+    """Tests that missing pages are handed to the workers in chunks, not page by page.
+
+    Each worker process reads its chunk with one JVM.
+    """
+    # Arrange: Name each table after its page.
+    pdf_path = tmp_path / "test.pdf"
+    csv_path = tmp_path / "output.csv"
+    pdf_path.write_text("dummy pdf content")
+    cache = PdfTableCache(str(tmp_path / "cache"))
+    mock_read_pdf.side_effect = lambda path, pages, multiple_tables: [pd.DataFrame({"Page": [pages]})]
+
+    # Act: Convert five pages with two workers and two pages per chunk.
+    with patch('src.pdf2csv._read_pages', wraps=_read_pages) as mock_read_pages:
+        convert_pdf_to_csv(str(pdf_path), str(csv_path), workers=2, pages_per_shard=2, cache=cache)
+
+    # Assert: The workers got the chunks, and the pages are written in order.
+    assert sorted(call.args[1] for call in mock_read_pages.call_args_list) == [[1, 2], [3, 4], [5]]
+    assert csv_path.read_text() == "Page\n1\n2\n3\n4\n5\n"
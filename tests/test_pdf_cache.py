@@ -0,0 +1,111 @@
+"""Tests for the PDF table cache module.
+
+This module contains unit tests for `PdfTableCache`, `file_digest` and
+`page_digests` defined in `src.pdf_cache`, covering round trips,
+option-dependent keys, unreadable entries and page resources.
+"""
+
+import pandas as pd
+import pytest
+from src.pdf_cache import PdfTableCache, file_digest, page_digests
+
+
+def write_one_page_pdf(path, font, form_drawing):
+    """Writes a one-page PDF whose content stream uses a font and a form XObject."""
+    from pypdf import PdfWriter
+    from pypdf.generic import DictionaryObject, NameObject, StreamObject
+
+    writer = PdfWriter()
+    page = writer.add_blank_page(200, 200)
+    contents = StreamObject()
+    contents.set_data(b"BT /F1 12 Tf (Hotel A) Tj ET /Fm1 Do")
+    form = StreamObject()
+    form.set_data(form_drawing)
+    form.update({NameObject("/Type"): NameObject("/XObject"), NameObject("/Subtype"): NameObject("/Form")})
+    page[NameObject("/Contents")] = writer._add_object(contents)
+    page[NameObject("/Resources")] = DictionaryObject({
+        NameObject("/Font"): DictionaryObject({
+            NameObject("/F1"): DictionaryObject({
+                NameObject("/Type"): NameObject("/Font"),
+                NameObject("/Subtype"): NameObject("/Type1"),
+                NameObject("/BaseFont"): NameObject(font),
+            }),
+        }),
+        NameObject("/XObject"): DictionaryObject({NameObject("/Fm1"): writer._add_object(form)}),
+    })
+    writer.write(str(path))
+
+
+def test_pdf_table_cache_round_trip(tmp_path):
+    """Tests that stored tables are returned unchanged and counted as hits."""
+    # Arrange: A cache with one entry.
+    cache = PdfTableCache(str(tmp_path / "cache"))
+    tables = [pd.DataFrame({"Etappe": [1], "Betrieb": ["Hotel A"]})]
+    key = cache.key("digest")
+    cache.put(key, tables)
+
+    # Act: Read the entry and a missing one.
+    cached = cache.get(key)
+    missing = cache.get(cache.key("other"))
+
+    # Assert: Verify the tables and the statistics.
+    pd.testing.assert_frame_equal(cached[0], tables[0])
+    assert missing is None
+    assert cache.stats_summary() == "PDF table cache: 1 hits, 1 misses"
+
+
+def test_pdf_table_cache_keys_depend_on_options_and_scope(tmp_path):
+    """Tests that other extraction options or a page scope give other keys."""
+    # Arrange: Two caches with different options.
+    cache = PdfTableCache(str(tmp_path), {"multiple_tables": True})
+    other = PdfTableCache(str(tmp_path), {"multiple_tables": False})
+
+    # Act & Assert: Keys differ by options and scope, and are stable.
+    assert cache.key("digest") == cache.key("digest")
+    assert cache.key("digest") != other.key("digest")
+    assert cache.key("digest") != cache.key("digest", scope="page")
+
+
+def test_pdf_table_cache_ignores_corrupt_entries(tmp_path):
+    """Tests that an unreadable entry is a miss instead of an error."""
+    # Arrange: Write garbage into an entry.
+    cache = PdfTableCache(str(tmp_path))
+    key = cache.key("digest")
+    (tmp_path / f"{key}.pkl").write_bytes(b"not a pickle")
+
+    # Act & Assert: The entry is treated as missing.
+    assert cache.get(key) is None
+
+
+def test_file_digest_changes_with_content(tmp_path):
+    """Tests that the file digest follows the file content."""
+    # Arrange: A file that is changed after hashing.
+    path = tmp_path / "test.pdf"
+    path.write_bytes(b"one")
+    before = file_digest(str(path))
+
+    # Act: Change the content.
+    path.write_bytes(b"two")
+
+    # Assert: The digest changes.
+    assert file_digest(str(path)) != before
+
+
+def test_page_digests_cover_resources(tmp_path):
+    """Tests that page digests change with fonts and XObjects, not only the content stream."""
+    # Arrange: Pages with the same content stream but other resources.
+    pytest.importorskip("pypdf")
+    write_one_page_pdf(tmp_path / "original.pdf", "/Helvetica", b"0 0 m 10 10 l S")
+    write_one_page_pdf(tmp_path / "same.pdf", "/Helvetica", b"0 0 m 10 10 l S")
+    write_one_page_pdf(tmp_path / "font.pdf", "/Courier", b"0 0 m 10 10 l S")
+    write_one_page_pdf(tmp_path / "form.pdf", "/Helvetica", b"0 0 m 20 20 l S")
+
+    # Act: Hash the pages.
+    original, same, font, form = (
+        page_digests(str(tmp_path / f"{name}.pdf")) for name in ("original", "same", "font", "form")
+    )
+
+    # Assert: Only an unchanged page keeps its digest.
+    assert original == same
+    assert font != original
+    assert form != original
@@ -0,0 +1,156 @@
+"""Tests for the address query plan.
+
+This module contains unit tests for `build_query_plan`, `execute_query_plan`
+and `get_address_templates` defined in `src.query_plan`, covering template
+fallback, deduplication of requests across rows and rounds, and rows with
+missing address fields.
+"""
+
+import pytest
+import os
+import pandas as pd
+from unittest.mock import patch
+from src.query_plan import (
+    DEFAULT_ADDRESS_TEMPLATES,
+    build_query_plan,
+    execute_query_plan,
+    get_address_templates,
+)
+
+
+class RecordingGeocoder:
+    """A fake batch geocoder that records every batch it receives."""
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.batches = []
+
+    def geocode_many(self, addresses):
+        self.batches.append(list(addresses))
+        return [self.responses.get(address) for address in addresses]
+
+
+def test_execute_query_plan_falls_back_and_records_winner():
+    """Tests that each row is resolved by the first template that geocodes.
+
+    It verifies the winning template index and the addresses tried per row,
+    including a row that cannot be geocoded at all.
+    """
+    # Arrange: Three hotels resolved by different templates and one unresolved.
+    hotels = pd.DataFrame({
+        "Betrieb": ["Hotel A", "Hotel B", "Hotel C", "Hotel D"],
+        "Straße": ["Street A", "Street B", "Street C", "Street D"],
+        "Stadt": ["City A", "City B", "City C", "City D"],
+    })
+    geocoder = RecordingGeocoder({
+        "Hotel A, Street A, City A, Germany": (1.0, 1.0),
+        "Street B, City B, Germany": (2.0, 2.0),
+        "Hotel C, City C, Germany": (3.0, 3.0),
+    })
+
+    # Act: Build and execute the plan.
+    plan = build_query_plan(hotels, DEFAULT_ADDRESS_TEMPLATES)
+    results = execute_query_plan(plan, geocoder.geocode_many)
+
+    # Assert: Verify coordinates, winning templates and one batch per template.
+    assert [(coordinates, winner) for coordinates, winner, _ in results] == [
+        ((1.0, 1.0), 0),
+        ((2.0, 2.0), 1),
+        ((3.0, 3.0), 2),
+        (None, None),
+    ]
+    assert results[3][2] == [
+        "Hotel D, Street D, City D, Germany",
+        "Street D, City D, Germany",
+        "Hotel D, City D, Germany",
+    ]
+    assert [len(batch) for batch in geocoder.batches] == [4, 3, 2]
+
+
+def test_execute_query_plan_deduplicates_requests():
+    """Tests that shared addresses are requested once across rows and rounds.
+
+    Two hotels share a street, and one hotel's first address equals another
+    hotel's fallback address; only distinct addresses reach the geocoder.
+    """
+    # Arrange: Hotels whose fallback addresses overlap.
+    hotels = pd.DataFrame({
+        "Betrieb": ["Hotel A", "Hotel B", "Hotel C"],
+        "Straße": ["Main St", "Main St", "Main St"],
+        "Stadt": ["Town", "Town", "Town"],
+    })
+    templates = ["{Betrieb}, {Straße}, {Stadt}", "{Straße}, {Stadt}"]
+    geocoder = RecordingGeocoder({"Main St, Town": (5.0, 5.0)})
+
+    # Act: Execute the plan.
+    results = execute_query_plan(build_query_plan(hotels, templates), geocoder.geocode_many)
+
+    # Assert: Verify all rows resolved with four requests instead of six.
+    assert [coordinates for coordinates, _, _ in results] == [(5.0, 5.0)] * 3
+    assert geocoder.batches == [
+        ["Hotel A, Main St, Town", "Hotel B, Main St, Town", "Hotel C, Main St, Town"],
+        ["Main St, Town"],
+    ]
+
+
+def test_build_query_plan_skips_templates_with_missing_fields():
+    """Tests that templates are skipped for rows lacking one of their fields."""
+    # Arrange: A hotel without a street.
+    hotels = pd.DataFrame({"Betrieb": ["Hotel A"], "Straße": [None], "Stadt": ["City A"]})
+    geocoder = RecordingGeocoder({"Hotel A, City A, Germany": (1.0, 2.0)})
+
+    # Act: Build and execute the plan.
+    plan = build_query_plan(hotels, DEFAULT_ADDRESS_TEMPLATES)
+    results = execute_query_plan(plan, geocoder.geocode_many)
+
+    # Assert: Verify only the business+city address was requested.
+    assert plan == [[None, None, "Hotel A, City A, Germany"]]
+    assert results == [((1.0, 2.0), 2, ["Hotel A, City A, Germany"])]
+
+
+def test_get_address_templates_from_env():
+    """Tests that ADDRESS_TEMPLATES overrides the default templates."""
+    with patch.dict(os.environ, {"ADDRESS_TEMPLATES": "{Betrieb}, {Stadt} | {Stadt}"}):
+        assert get_address_templates() == ["{Betrieb}, {Stadt}", "{Stadt}"]
+    with patch.dict(os.environ, {"ADDRESS_TEMPLATES": ""}):
+        assert get_address_templates() == DEFAULT_ADDRESS_TEMPLATES
+
+
+def test_execute_query_plan_reports_rows_as_they_resolve():
+    """Tests that on_row_resolved is called per final row after each batch.
+
+    With a batch size of one, resolved rows must be reported before the next
+    request is sent, and rows are only reported once they are final.
+    """
+    # Arrange: Two hotels; the second needs the fallback template.
+    hotels = pd.DataFrame({
+        "Betrieb": ["Hotel A", "Hotel B"],
+        "Straße": ["Street A", "Street B"],
+        "Stadt": ["City A", "City B"],
+    })
+    templates = ["{Betrieb}, {Stadt}", "{Straße}, {Stadt}"]
+    events = []
+
+    def geocode_many(addresses):
+        events.append(("request", addresses))
+        return [(1.0, 1.0) if address != "Hotel B, City B" else None for address in addresses]
+
+    def on_row_resolved(row_index, coordinates, template_index, attempts):
+        events.append(("resolved", row_index, template_index))
+
+    # Act: Execute the plan one address at a time.
+    execute_query_plan(
+        build_query_plan(hotels, templates),
+        geocode_many,
+        on_row_resolved=on_row_resolved,
+        batch_size=1,
+    )
+
+    # Assert: Verify the interleaving of requests and resolved rows.
+    assert events == [
+        ("request", ["Hotel A, City A"]),
+        ("resolved", 0, 0),
+        ("request", ["Hotel B, City B"]),
+        ("request", ["Street B, City B"]),
+        ("resolved", 1, 1),
+    ]
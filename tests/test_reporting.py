@@ -0,0 +1,132 @@
+"""Tests for the reporting module.
+
+This module contains unit tests for `configure_logging`, `JsonFormatter`,
+`ProgressIndicator` and `NotFoundReport` defined in `src.reporting`.
+"""
+
+import io
+import json
+import logging
+import os
+from unittest.mock import patch
+from src.reporting import (
+    NotFoundReport,
+    ProgressIndicator,
+    configure_logging,
+    get_not_found_report_path,
+)
+
+
+def test_configure_logging_json():
+    """Tests that LOG_FORMAT=json writes one JSON object per record."""
+    # Arrange: Configure JSON logging into a buffer.
+    stream = io.StringIO()
+    with patch.dict(os.environ, {"LOG_LEVEL": "INFO", "LOG_FORMAT": "json"}):
+        configure_logging(stream=stream)
+
+    try:
+        # Act: Log below and at the configured level.
+        logging.getLogger("src.main").debug("Geocoded: Hotel A")
+        logging.getLogger("src.main").info("Hotels loaded from CSV: %d", 3)
+
+        # Assert: Verify only the INFO record was written, as JSON.
+        lines = stream.getvalue().splitlines()
+        assert len(lines) == 1
+        entry = json.loads(lines[0])
+        assert entry["level"] == "INFO"
+        assert entry["logger"] == "src.main"
+        assert entry["message"] == "Hotels loaded from CSV: 3"
+    finally:
+        configure_logging("WARNING", "text", stream=io.StringIO())
+
+
+def test_configure_logging_replaces_its_handler():
+    """Tests that configuring logging twice does not duplicate the output."""
+    # Act: Configure logging twice.
+    configure_logging("INFO", "text", stream=io.StringIO())
+    logger = configure_logging("WARNING", "text", stream=io.StringIO())
+
+    # Assert: Verify a single handler with the last level.
+    assert len([h for h in logger.handlers if getattr(h, "is_src_handler", False)]) == 1
+    assert logger.level == logging.WARNING
+
+
+def test_progress_indicator_status_line():
+    """Tests the rate, ETA and cache hit rate of the status line."""
+    # Arrange: A progress indicator with a controllable clock.
+    now = [100.0]
+    stream = io.StringIO()
+    progress = ProgressIndicator(1000, stream=stream, enabled=True, clock=lambda: now[0])
+
+    # Act: Finish 500 rows in 10 seconds, 30 of 40 lookups from the cache.
+    now[0] = 110.0
+    progress.update(500, cache_hits=30, lookups=40)
+
+    # Assert: Verify the line, which is redrawn in place.
+    assert progress.status_line() == "Geocoding 500/1000 rows, 50 rows/s, ETA 0:00:10, cache 75% hits"
+    assert stream.getvalue().startswith("\rGeocoding 500/1000 rows")
+    assert "\n" not in stream.getvalue()
+
+
+def test_progress_indicator_throttles_and_closes():
+    """Tests that the line is redrawn at most once per interval and ended on close."""
+    # Arrange: A progress indicator with a frozen clock.
+    stream = io.StringIO()
+    progress = ProgressIndicator(3, stream=stream, enabled=True, interval=1.0, clock=lambda: 0.0)
+
+    # Act: Two quick updates, the last row and close.
+    progress.update()
+    progress.update()
+    progress.update()
+    progress.close()
+
+    # Assert: Verify the first and the final update were drawn.
+    assert stream.getvalue().count("\r") == 2
+    assert stream.getvalue().endswith("\n")
+
+
+def test_progress_indicator_disabled_without_terminal():
+    """Tests that nothing is written when the stream is not a terminal."""
+    # Arrange: A non-interactive stream.
+    stream = io.StringIO()
+    progress = ProgressIndicator(2, stream=stream)
+
+    # Act: Finish all rows.
+    progress.update(2)
+    progress.close()
+
+    # Assert: Verify the stream stays empty.
+    assert not progress.enabled
+    assert stream.getvalue() == ""
+
+
+def test_not_found_report(tmp_path):
+    """Tests that the addresses are written as they are added."""
+    # Arrange: A report next to the output file.
+    with patch.dict(os.environ, {"NOT_FOUND_REPORT_FILE": ""}):
+        path = get_not_found_report_path(str(tmp_path / "hotelswithcoor.csv"))
+    report = NotFoundReport(path)
+
+    # Act: Add two addresses.
+    report.add("Hotel B, City B")
+    report.add("row 2 (missing address fields)")
+    report.close()
+
+    # Assert: Verify the path, the count and the file.
+    assert path == str(tmp_path / "hotelswithcoor.csv.not_found.txt")
+    assert report.count == 2
+    with open(path, encoding="utf-8") as f:
+        assert f.read() == "Hotel B, City B\nrow 2 (missing address fields)\n"
+
+
+def test_not_found_report_without_path():
+    """Tests that a report without a path only counts the addresses."""
+    # Arrange: A report without a file.
+    report = NotFoundReport(None)
+
+    # Act: Add an address.
+    report.add("Hotel B, City B")
+    report.close()
+
+    # Assert: Verify the count.
+    assert report.count == 1
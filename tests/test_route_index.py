@@ -0,0 +1,257 @@
+"""Tests for the route index.
+
+This module contains unit tests for `RouteIndex`, `add_route_columns` and
+`filter_corridor` defined in `src.route_index`, covering distances and
+along-route km against a straight synthetic track, missing coordinates,
+segment breaks, the corridor filter, track slices and the grid and tree
+searches against a brute-force comparison on the bundled route.
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+from src.gpx_track_reader import Track
+from src.route_index import (
+    RouteIndex,
+    add_route_columns,
+    filter_corridor,
+    haversine_km,
+    slice_track,
+    track_km,
+)
+
+# 1 degree along a great circle in km for the mean Earth radius
+KM_PER_DEGREE = 111.19508
+
+
+@pytest.fixture
+def straight_route():
+    """A route along the equator from longitude 0 to 0.1 with 101 points."""
+    longitudes = np.linspace(0.0, 0.1, 101)
+    return RouteIndex(np.zeros_like(longitudes), longitudes)
+
+
+def test_haversine_km():
+    """Tests the great-circle distance for one degree of latitude."""
+    # Act & Assert: One degree north is about 111.195 km.
+    assert haversine_km(0.0, 0.0, 1.0, 0.0) == pytest.approx(KM_PER_DEGREE, rel=1e-6)
+
+
+def test_nearest_on_straight_route(straight_route):
+    """Tests distance and along-route km for points beside and beyond a route.
+
+    Points off either end of the route are measured to the end point.
+    """
+    # Arrange: One point beside the middle, one past each end.
+    latitudes = [0.01, 0.0, 0.0]
+    longitudes = [0.05, -0.02, 0.13]
+
+    # Act: Query the index.
+    distance_km, route_km = straight_route.nearest(latitudes, longitudes)
+
+    # Assert: Verify the distances and route positions.
+    assert straight_route.length_km == pytest.approx(0.1 * KM_PER_DEGREE, rel=1e-6)
+    np.testing.assert_allclose(
+        distance_km, [0.01 * KM_PER_DEGREE, 0.02 * KM_PER_DEGREE, 0.03 * KM_PER_DEGREE], rtol=1e-6
+    )
+    np.testing.assert_allclose(
+        route_km, [0.05 * KM_PER_DEGREE, 0.0, 0.1 * KM_PER_DEGREE], rtol=1e-6, atol=1e-9
+    )
+
+
+def test_nearest_far_point_uses_full_search(straight_route):
+    """Tests that a point far outside the grid search radius is still resolved."""
+    # Act: Query a point 1 degree (about 111 km) north of the route.
+    distance_km, route_km = straight_route.nearest([1.0], [0.05])
+
+    # Assert: The nearest point is the middle of the route.
+    assert distance_km[0] == pytest.approx(KM_PER_DEGREE, rel=1e-3)
+    assert route_km[0] == pytest.approx(0.05 * KM_PER_DEGREE, rel=1e-3)
+
+
+def test_nearest_missing_coordinates(straight_route):
+    """Tests that points without coordinates get NaN."""
+    # Act: Query with a missing latitude.
+    distance_km, route_km = straight_route.nearest([np.nan, 0.0], [0.05, 0.05])
+
+    # Assert: Only the valid point is resolved.
+    assert np.isnan(distance_km[0]) and np.isnan(route_km[0])
+    assert distance_km[1] == pytest.approx(0.0, abs=1e-9)
+
+
+def test_segment_break_is_not_a_segment():
+    """Tests that no segment joins the last point of one <trkseg> to the next.
+
+    The gap between the two segments would otherwise pass right by the query point.
+    """
+    # Arrange: Two segments with a gap between longitude 0.01 and 0.09.
+    latitudes = [0.0, 0.0, 0.0, 0.0]
+    longitudes = [0.0, 0.01, 0.09, 0.1]
+    index = RouteIndex(latitudes, longitudes, segment_starts=[0, 2])
+
+    # Act: Query a point in the middle of the gap.
+    distance_km, _ = index.nearest([0.0], [0.05])
+
+    # Assert: The nearest route point is the end of the first segment.
+    assert distance_km[0] == pytest.approx(0.04 * KM_PER_DEGREE, rel=1e-6)
+
+
+def test_nearest_matches_brute_force_on_route_file():
+    """Tests the grid search against comparing every point with every segment."""
+    # Arrange: Index the bundled route and scatter points around it.
+    index = RouteIndex.from_gpx("data/alb-crossing-gesamtroute.gpx")
+    rng = np.random.default_rng(0)
+    picks = rng.integers(0, len(index._latitudes), 300)
+    latitudes = index._latitudes[picks] + rng.normal(0, 0.02, len(picks))
+    longitudes = index._longitudes[picks] + rng.normal(0, 0.02, len(picks))
+
+    # Act: Query the index and the brute-force search.
+    distance_km, route_km = index.nearest(latitudes, longitudes)
+    px, py = index._project(latitudes, longitudes)
+    _, segment, t = index._nearest_brute_force(px, py)
+    expected_distance, expected_route_km = index._route_positions(latitudes, longitudes, segment, t)
+
+    # Assert: Both searches agree.
+    np.testing.assert_allclose(distance_km, expected_distance)
+    np.testing.assert_allclose(route_km, expected_route_km)
+
+
+def test_nearest_far_points_match_brute_force_on_route_file():
+    """Tests the tree search for points kilometres away from the route.
+
+    Such points are beyond the grid search radius, as in regional lodging lists.
+    """
+    # Arrange: Scatter points over the whole region of the bundled route.
+    index = RouteIndex.from_gpx("data/alb-crossing-gesamtroute.gpx")
+    rng = np.random.default_rng(2)
+    latitudes = rng.uniform(index._latitudes.min() - 0.3, index._latitudes.max() + 0.3, 500)
+    longitudes = rng.uniform(index._longitudes.min() - 0.3, index._longitudes.max() + 0.3, 500)
+
+    # Act: Query the index and the brute-force search.
+    distance_km, route_km = index.nearest(latitudes, longitudes)
+    px, py = index._project(latitudes, longitudes)
+    _, segment, t = index._nearest_brute_force(px, py)
+    expected_distance, expected_route_km = index._route_positions(latitudes, longitudes, segment, t)
+
+    # Assert: Both searches agree, also for points far from the route.
+    assert (expected_distance > 5).sum() > 100
+    np.testing.assert_allclose(distance_km, expected_distance)
+    np.testing.assert_allclose(route_km, expected_route_km)
+
+
+def test_add_route_columns(straight_route):
+    """Tests that rounded route columns are added to the DataFrame."""
+    # Arrange: One hotel beside the route and one without coordinates.
+    hotels = pd.DataFrame({"Latitude": [0.01, np.nan], "Longitude": [0.05, np.nan]})
+
+    # Act: Add the route columns.
+    add_route_columns(hotels, straight_route)
+
+    # Assert: Verify the rounded values.
+    assert hotels.loc[0, "Route Distance km"] == 1.11
+    assert hotels.loc[0, "Route km"] == 5.6
+    assert hotels.loc[1, ["Route Distance km", "Route km"]].isna().all()
+
+
+def test_within_matches_nearest_on_route_file():
+    """Tests the corridor search against the distances from `nearest`.
+
+    Points are prefiltered by corridor cells and searched no farther than the
+    buffer, which must accept exactly the points whose distance is within it.
+    """
+    # Arrange: Index the bundled route and scatter points around it.
+    index = RouteIndex.from_gpx("data/alb-crossing-gesamtroute.gpx")
+    rng = np.random.default_rng(1)
+    picks = rng.integers(0, len(index._latitudes), 2000)
+    latitudes = index._latitudes[picks] + rng.normal(0, 0.05, len(picks))
+    longitudes = index._longitudes[picks] + rng.normal(0, 0.05, len(picks))
+    expected_distance, _ = index.nearest(latitudes, longitudes)
+
+    for buffer_km in (0.5, 3.0):
+        # Act: Filter the points with the corridor.
+        inside, distance_km = index.within(latitudes, longitudes, buffer_km)
+
+        # Assert: The same points are accepted with the same distances.
+        np.testing.assert_array_equal(inside, expected_distance <= buffer_km)
+        np.testing.assert_allclose(distance_km[inside], expected_distance[inside])
+        assert np.isnan(distance_km[~inside]).all()
+
+
+def test_filter_corridor(straight_route):
+    """Tests that hotels outside the corridor or without coordinates are dropped."""
+    # Arrange: Hotels 1.1 km and 3.3 km from the route and one without coordinates.
+    hotels = pd.DataFrame({
+        "Betrieb": ["Near", "Far", "Unknown"],
+        "Latitude": [0.01, 0.03, np.nan],
+        "Longitude": [0.05, 0.05, np.nan],
+    })
+
+    # Act: Keep the hotels within 2 km.
+    kept, dropped = filter_corridor(hotels, straight_route, 2.0)
+
+    # Assert: Verify the kept rows and the drop reasons.
+    assert list(kept["Betrieb"]) == ["Near"]
+    assert dropped == {"more than 2 km from the route": 1, "no coordinates": 1}
+
+
+def test_filter_corridor_reuses_route_columns(straight_route):
+    """Tests that the distances of `add_route_columns` are reused for the filter."""
+    # Arrange: Enrich the hotels, then overwrite one distance.
+    hotels = pd.DataFrame({"Betrieb": ["Near", "Far"], "Latitude": [0.01, 0.03], "Longitude": [0.05, 0.05]})
+    add_route_columns(hotels, straight_route)
+    hotels.loc[1, "Route Distance km"] = 1.5
+
+    # Act: Keep the hotels within 2 km.
+    kept, dropped = filter_corridor(hotels, straight_route, 2.0)
+
+    # Assert: The column decides, not a new search of the route.
+    assert list(kept["Betrieb"]) == ["Near", "Far"]
+    assert dropped == {"more than 2 km from the route": 0, "no coordinates": 0}
+
+
+def test_filter_corridor_checks_rounded_distances_at_the_edge(straight_route):
+    """Tests that hotels whose rounded distance equals the buffer are measured exactly.
+
+    Both hotels have a rounded distance of 2.0 km, but only one is within 2 km.
+    """
+    # Arrange: Hotels 1.996 km and 2.004 km from the route, with route columns.
+    hotels = pd.DataFrame({
+        "Betrieb": ["Inside", "Outside"],
+        "Latitude": [1.996 / KM_PER_DEGREE, 2.004 / KM_PER_DEGREE],
+        "Longitude": [0.05, 0.05],
+    })
+    add_route_columns(hotels, straight_route)
+
+    # Act: Keep the hotels within 2 km.
+    kept, dropped = filter_corridor(hotels, straight_route, 2.0)
+
+    # Assert: The rounded column says 2.0 for both, but only the inside hotel is kept.
+    assert list(hotels["Route Distance km"]) == [2.0, 2.0]
+    assert list(kept["Betrieb"]) == ["Inside"]
+    assert dropped["more than 2 km from the route"] == 1
+
+
+def test_slice_track():
+    """Tests slicing a track by route km across a segment break.
+
+    The slice covers the whole range and keeps the break between segments.
+    """
+    # Arrange: Two segments; the gap between them does not count as distance.
+    track = Track(
+        "Route",
+        np.zeros(6),
+        np.array([0.0, 0.01, 0.02, 0.5, 0.51, 0.52]),
+        np.full(6, np.nan),
+        np.array([0, 3]),
+    )
+    step = 0.01 * KM_PER_DEGREE
+
+    # Act: Slice from halfway along the first step of the first segment.
+    km = track_km(track)
+    sliced = slice_track(track, 0.5 * step, 3.5 * step)
+
+    # Assert: Verify the distances and the slice.
+    np.testing.assert_allclose(km, np.array([0, 1, 2, 2, 3, 4]) * step, rtol=1e-6)
+    np.testing.assert_array_equal(sliced.longitudes, [0.0, 0.01, 0.02, 0.5, 0.51, 0.52])
+    np.testing.assert_array_equal(sliced.segment_starts, [0, 3])
+    assert list(slice_track(track, 2.5 * step, 2.5 * step).longitudes) == [0.5, 0.51]
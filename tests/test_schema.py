@@ -0,0 +1,133 @@
+"""Tests for the schema normalization module.
+
+This module contains unit tests for `normalize_hotel_table`,
+`tables_to_raw` and `normalize_hotels_csv` defined in `src.schema`,
+covering junk and repeated header rows, two-stage hotels, merged columns
+and dtypes.
+"""
+
+import logging
+import pandas as pd
+from src.schema import normalize_hotel_table, normalize_hotels_csv, tables_to_raw
+
+HEADER = ["Etappe", "Stadt", "Betrieb", None, "Entfernung zum Weg länger als 500m km Hm", None]
+
+
+def make_raw(rows):
+    """Builds a raw table of text cells from lists of cells."""
+    return pd.DataFrame(rows, dtype=object)
+
+
+def test_normalize_hotel_table_drops_junk_and_repeated_headers():
+    """Tests that title rows, empty rows, repeated headers and footers are dropped."""
+    # Arrange: A title, two pages with headers, an empty row and a legend.
+    raw = make_raw([
+        ["Gastgeber am Alb-Crossing", None, None, None, None, None],
+        HEADER,
+        ["1", "Aalen", "Hotel A", None, "direkt", None],
+        [None, None, None, None, None, None],
+        HEADER,
+        ["2", "Bopfingen", "Hotel B", None, "1,2 km", "40 Hm"],
+        ["Zeichenerklärung:", None, None, None, None, None],
+    ])
+
+    # Act: Normalize the table.
+    hotels = normalize_hotel_table(raw)
+
+    # Assert: Only the hotels remain, the empty column is gone and the merged header is split.
+    assert list(hotels.columns) == ["Etappe", "Stadt", "Betrieb", "Entfernung", "Hm"]
+    assert hotels["Betrieb"].tolist() == ["Hotel A", "Hotel B"]
+    assert hotels["Hm"].isna().tolist() == [True, False]
+    assert hotels["Etappe"].tolist() == ["1", "2"]
+
+
+def test_normalize_hotel_table_keeps_two_stage_hotels(caplog):
+    """Tests that a hotel between two stages is kept and only rows without a Betrieb are dropped."""
+    # Arrange: A hotel at stage "4 u. 5" and a footer row.
+    caplog.set_level(logging.WARNING, logger="src")
+    raw = make_raw([
+        ["Etappe", "Stadt", "Betrieb"],
+        ["4", "Erpfingen", "Hotel A"],
+        ["4 u. 5", "Willmandingen", "Landhotel Sonnenbühl"],
+        ["Stand: 2024", None, None],
+    ])
+
+    # Act: Normalize the table.
+    hotels = normalize_hotel_table(raw)
+
+    # Assert: Both hotels remain with their stage text, and the dropped footer is logged.
+    assert hotels["Etappe"].tolist() == ["4", "4 u. 5"]
+    assert caplog.messages == ["Dropped 1 rows without a Betrieb (legends, footers)."]
+
+
+def test_normalize_hotel_table_splits_merged_cells():
+    """Tests that distance and climb merged into one cell are split into two columns.
+
+    Without an empty header cell after the merged header, the `Hm` column
+    is added.
+    """
+    # Arrange: A merged header without a spare column.
+    raw = make_raw([
+        ["Etappe", "Betrieb", "Entfernung zum Weg länger als 500m km Hm", "Latitude"],
+        ["3", "Hotel C", "5,2 km 53 Hm", "48.5"],
+        ["3", "Hotel D", "direkt", None],
+    ])
+
+    # Act: Normalize the table.
+    hotels = normalize_hotel_table(raw)
+
+    # Assert: Verify the split values and the coordinate type.
+    assert list(hotels.columns) == ["Etappe", "Betrieb", "Entfernung", "Hm", "Latitude"]
+    assert hotels["Entfernung"].tolist() == ["5,2 km", "direkt"]
+    assert hotels["Hm"].tolist()[0] == "53 Hm"
+    assert pd.isna(hotels["Hm"].tolist()[1])
+    assert hotels["Latitude"].dtype == "float64"
+
+
+def test_normalize_hotel_table_keeps_unnamed_column_with_values():
+    """Tests that an unnamed column is kept when it holds values."""
+    # Arrange: An unnamed column marking camping sites.
+    raw = make_raw([
+        ["Etappe", "Betrieb", None],
+        ["1", "Camping", "X"],
+    ])
+
+    # Act: Normalize the table.
+    hotels = normalize_hotel_table(raw)
+
+    # Assert: The column keeps its pandas-style name.
+    assert list(hotels.columns) == ["Etappe", "Betrieb", "Unnamed: 2"]
+
+
+def test_tables_to_raw_includes_headers():
+    """Tests that the headers of tabula tables are kept as rows, unnamed ones as empty cells."""
+    # Arrange: Two tables, one with an unnamed column.
+    tables = [
+        pd.DataFrame({"Etappe": [1], "Betrieb": ["Hotel A"]}),
+        pd.DataFrame({"Etappe": [2], "Unnamed: 1": [None]}),
+    ]
+
+    # Act: Stack the tables.
+    raw = tables_to_raw(tables)
+
+    # Assert: Verify the header rows and the text cells.
+    assert raw.iloc[0].tolist() == ["Etappe", "Betrieb"]
+    assert raw.iloc[1].tolist() == ["1", "Hotel A"]
+    assert raw.iloc[2].tolist() == ["Etappe", None]
+
+
+def test_normalize_hotels_csv(tmp_path):
+    """Tests that a comma-separated extract is written as a clean semicolon-separated CSV."""
+    # Arrange: A comma-separated file with a quoted cell and a repeated header.
+    input_path = tmp_path / "raw.csv"
+    output_path = tmp_path / "hotels.csv"
+    input_path.write_text(
+        'Etappe,Betrieb\n1,"Camping, Zelt"\nEtappe,Betrieb\n2,Hotel B\n', encoding="utf-8"
+    )
+
+    # Act: Normalize the file.
+    count = normalize_hotels_csv(str(input_path), str(output_path), sep=",")
+
+    # Assert: Verify the count and the written file.
+    assert count == 2
+    assert output_path.read_text(encoding="utf-8") == "Etappe;Betrieb\n1;Camping, Zelt\n2;Hotel B\n"
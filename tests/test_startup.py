@@ -0,0 +1,65 @@
+"""Tests for the import cost of the command line entry points.
+
+This module runs fresh interpreters with `-X importtime` and checks that
+heavy dependencies are only imported on the code paths that need them,
+and that the cold start of the entry points stays within a time budget.
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Import time allowed for `--help` of an entry point after interpreter startup (site).
+STARTUP_BUDGET_US = 150_000
+
+
+def import_times(*args):
+    """Runs Python with -X importtime; returns {module: self time in µs} after site."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        if name.strip() == "site":
+            # Everything up to here is interpreter and site-packages startup
+            times = {}
+            continue
+        times[name.strip()] = int(self_us)
+    return times
+
+
+@pytest.mark.parametrize("module", ["src.cli", "src.main", "src.batch"])
+def test_help_starts_within_budget(module):
+    """Tests that `--help` of an entry point imports no heavy dependency and stays within the budget."""
+    # Act: Measure a cold start of the entry point.
+    times = import_times("-m", module, "--help")
+
+    # Assert: Verify the imported modules and the total import time.
+    heavy = {"pandas", "numpy", "geopy", "gpxpy", "tabula"} & set(times)
+    assert not heavy
+    assert sum(times.values()) < STARTUP_BUDGET_US
+
+
+@pytest.mark.parametrize("module, dependency", [
+    ("src.pdf2csv", "tabula"),
+    ("src.geocoder_backends", "geopy"),
+])
+def test_heavy_dependency_is_imported_lazily(module, dependency):
+    """Tests that importing a module does not import its heavy dependency."""
+    # Act: Import the module in a fresh interpreter.
+    times = import_times("-c", f"import {module}")
+
+    # Assert: The dependency is only imported when it is used.
+    assert module in times
+    assert dependency not in times
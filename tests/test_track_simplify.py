@@ -0,0 +1,133 @@
+"""Tests for the track simplification module.
+
+This module contains unit tests for `simplify_track` and `max_deviation_m`
+defined in `src.track_simplify`, covering tolerances, point budgets,
+multi-segment tracks and a comparison with a recursive Douglas-Peucker.
+"""
+
+import pytest
+import numpy as np
+from src.gpx_track_reader import Track
+from src.track_simplify import (
+    _project_m,
+    _segment_distances,
+    douglas_peucker_ranks,
+    max_deviation_m,
+    simplify_track,
+)
+
+
+def make_track(latitudes, longitudes, segment_starts=(0,)):
+    """Builds a track without elevations."""
+    latitudes = np.asarray(latitudes, dtype=float)
+    return Track(
+        "Test",
+        latitudes,
+        np.asarray(longitudes, dtype=float),
+        np.full(len(latitudes), np.nan),
+        np.asarray(segment_starts, dtype=np.intp),
+    )
+
+
+def recursive_douglas_peucker(x, y, lo, hi, tolerance_m, kept):
+    """Reference implementation: keeps the farthest point and recurses."""
+    if hi - lo < 2:
+        return
+    interior = np.arange(lo + 1, hi)
+    distances = _segment_distances(x[interior], y[interior], x[lo], y[lo], x[hi], y[hi])
+    farthest = int(np.argmax(distances))
+    if distances[farthest] > tolerance_m:
+        split = lo + 1 + farthest
+        kept.add(split)
+        recursive_douglas_peucker(x, y, lo, split, tolerance_m, kept)
+        recursive_douglas_peucker(x, y, split, hi, tolerance_m, kept)
+
+
+@pytest.fixture
+def random_walk():
+    """A 2000-point random walk with steps of about 5 m."""
+    rng = np.random.default_rng(0)
+    heading = np.cumsum(rng.normal(0, 0.3, 2000))
+    return make_track(
+        48.0 + np.cumsum(np.sin(heading)) * 0.00005,
+        9.0 + np.cumsum(np.cos(heading)) * 0.00005,
+    )
+
+
+def test_simplify_track_keeps_only_significant_bend():
+    """Tests that collinear points are removed and a bend beyond the tolerance is kept.
+
+    The duplicate point and the points on the straight line carry no shape.
+    """
+    # Arrange: A straight line with a duplicate point and a 1.1 km bend at the end.
+    track = make_track([0.0, 0.0, 0.0, 0.0, 0.0, 0.01], [0.0, 0.01, 0.01, 0.02, 0.03, 0.04])
+
+    # Act: Simplify with a tolerance of 100 m.
+    simplified, deviation_m = simplify_track(track, tolerance_m=100)
+
+    # Assert: Only the ends and the corner remain, without deviation.
+    np.testing.assert_array_equal(simplified.longitudes, [0.0, 0.03, 0.04])
+    assert deviation_m == pytest.approx(0.0, abs=1e-6)
+
+
+@pytest.mark.parametrize("tolerance_m", [1.0, 5.0, 20.0])
+def test_simplify_track_matches_recursive_douglas_peucker(random_walk, tolerance_m):
+    """Tests the vectorized simplification against a recursive implementation."""
+    # Arrange: Run the reference implementation.
+    x, y = _project_m(random_walk.latitudes, random_walk.longitudes)
+    last = len(x) - 1
+    kept = {0, last}
+    recursive_douglas_peucker(x, y, 0, last, tolerance_m, kept)
+    expected = np.array(sorted(kept))
+
+    # Act: Simplify with the same tolerance.
+    simplified, deviation_m = simplify_track(random_walk, tolerance_m=tolerance_m)
+
+    # Assert: The same points are kept and the deviation stays within the tolerance.
+    np.testing.assert_array_equal(simplified.latitudes, random_walk.latitudes[expected])
+    assert deviation_m <= tolerance_m
+    assert deviation_m == pytest.approx(max_deviation_m(random_walk, expected))
+
+
+def test_simplify_track_point_budget(random_walk):
+    """Tests that a point budget is met exactly with a Douglas-Peucker result.
+
+    The 100 points kept must be the result for the tolerance just below the
+    rank of the 101st point.
+    """
+    # Arrange: Find the tolerance that keeps exactly 100 points.
+    ranks, _ = douglas_peucker_ranks(random_walk)
+    tolerance_m = np.sort(ranks)[::-1][100]
+
+    # Act: Simplify to 100 points.
+    simplified, deviation_m = simplify_track(random_walk, max_points=100)
+
+    # Assert: Verify the budget, the end points and the tolerance result.
+    assert len(simplified.latitudes) == 100
+    assert simplified.latitudes[0] == random_walk.latitudes[0]
+    assert simplified.latitudes[-1] == random_walk.latitudes[-1]
+    expected, expected_deviation_m = simplify_track(random_walk, tolerance_m=tolerance_m)
+    np.testing.assert_array_equal(simplified.latitudes, expected.latitudes)
+    assert deviation_m == pytest.approx(expected_deviation_m)
+
+
+def test_simplify_track_keeps_segment_ends():
+    """Tests that every segment is simplified on its own and keeps its end points."""
+    # Arrange: Two straight segments of three points each.
+    track = make_track(
+        [0.0, 0.0, 0.0, 1.0, 1.0, 1.0], [0.0, 0.01, 0.02, 0.0, 0.01, 0.02], segment_starts=[0, 3]
+    )
+
+    # Act: Simplify with a budget smaller than the number of segment ends.
+    simplified, _ = simplify_track(track, max_points=2)
+
+    # Assert: Both segments keep their first and last point.
+    np.testing.assert_array_equal(simplified.latitudes, [0.0, 0.0, 1.0, 1.0])
+    np.testing.assert_array_equal(simplified.longitudes, [0.0, 0.02, 0.0, 0.02])
+    np.testing.assert_array_equal(simplified.segment_starts, [0, 2])
+
+
+def test_simplify_track_requires_a_limit(random_walk):
+    """Tests that a tolerance or a point budget is required."""
+    with pytest.raises(ValueError):
+        simplify_track(random_walk)